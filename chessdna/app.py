@@ -1,33 +1,46 @@
+import io
+import mmap
 import os
-import sys
 import tempfile
 from pathlib import Path
 import time
-import uuid
-import json
+import traceback
+import secrets
 
 import asyncio
-import anyio
-from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from functools import cache, partial
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, File, Form, UploadFile, HTTPException
-from fastapi.responses import HTMLResponse, FileResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import HTMLResponse, FileResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
+from jinja2 import FileSystemBytecodeCache
+from markupsafe import escape
+from pydantic_core import from_json, to_json
 from starlette.requests import Request
 
-from .core.analyze import analyze_pgn_text
-from .core.settings import default_stockfish_path
+from .core import chesscom, lichess
+from .core.analysis_cache import AnalysisCache
+from .core.analyze import AnalyzeReport, analyze_pgn_text
+from .core.engine_pool import close_pools, get_pool
+from .core.http_cache import cache_dir as http_cache_dir
+from .core.pgn_utils import GamePreview, preview_games, split_pgn_games
+from .core.uci import UciEngine
+from .core.settings import default_stockfish_path, resolve_engine_path
+from .forms import SourceForm
 from .routes_downloads import download_file
+from .static_files import CachedStatic, make_static_url
+from .store import KVStore, LRUStore, private_temp_dir
 
 
-# Ensure subprocess support in engine analysis (python-chess uses asyncio internally).
-if sys.platform == "win32":
-    try:
-        asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
-    except Exception:
-        pass
+# No event-loop policy override: engine analysis talks to the UCI engine through
+# a plain subprocess pipe (core.uci.UciEngine) in a worker thread, so it does not
+# need asyncio subprocess support (Proactor) on Windows. The HTTP side keeps
+# whatever loop the server picks: uvicorn creates its loop before importing this
+# module, so a policy set here would not apply anyway. On Linux/macOS use
+# `uvicorn --loop uvloop` (uvloop ships with uvicorn[standard]).
 
 
 @asynccontextmanager
@@ -44,22 +57,129 @@ async def lifespan(app: FastAPI):
     except Exception:
         fetch_hours = 48.0
 
-    _cleanup_tmp_dir(REPORT_TMP_DIR, max_age_hours=report_hours, suffixes=(".json", ".html"))
-    _cleanup_tmp_dir(FETCH_TMP_DIR, max_age_hours=fetch_hours, suffixes=(".pgn", ".json"))
+    try:
+        sweep_hours = float(os.environ.get("CHESSDNA_TMP_SWEEP_INTERVAL_HOURS", "1"))
+    except Exception:
+        sweep_hours = 1.0
+
+    # Run the sweep in a worker thread so the app starts serving immediately,
+    # even when the temp dirs hold thousands of stale artifacts.
+    loop = asyncio.get_running_loop()
+    startup_sweep = loop.run_in_executor(
+        IO_EXECUTOR,
+        partial(_housekeeping, report_hours=report_hours, fetch_hours=fetch_hours),
+    )
+    # Start the default engine(s) in the background so the first analysis
+    # doesn't pay for the engine start-up (NNUE load, hash allocation).
+    try:
+        warm_engines = int(os.environ.get("CHESSDNA_WARM_ENGINES", "1"))
+    except Exception:
+        warm_engines = 1
+    warmup = loop.run_in_executor(IO_EXECUTOR, partial(_warm_default_engine, warm_engines))
+    # Keep sweeping while the server runs, not only once per process.
+    sweeper = asyncio.create_task(
+        _periodic_housekeeping(max(60.0, sweep_hours * 3600.0), report_hours=report_hours, fetch_hours=fetch_hours)
+    )
 
     yield
 
+    sweeper.cancel()
+    try:
+        await sweeper
+    except asyncio.CancelledError:
+        pass
+
+    for fut in (startup_sweep, warmup):
+        try:
+            await fut
+        except Exception:
+            pass
+
+    close_pools()
+
+
+def _warm_default_engine(n: int) -> None:
+    """Pre-spawn `n` engines of the default binary into its pool (best-effort)."""
+    if n <= 0:
+        return
+    path = resolve_engine_path(default_stockfish_path())
+    if path:
+        get_pool(path).warm(n)
+
 
 app = FastAPI(title="ChessDNA", version="0.1.0", lifespan=lifespan)
 
 BASE_DIR = Path(__file__).resolve().parent
 TEMPLATES = Jinja2Templates(directory=str(BASE_DIR / "templates"))
+# Production: don't stat template sources on every lookup (e.g. the
+# `{% include %}` in report.html) and keep compiled bytecode on disk so other
+# workers / restarts skip parsing. Set CHESSDNA_DEV=1 to hot-reload templates.
+TEMPLATE_DEV = bool(os.environ.get("CHESSDNA_DEV"))
+TEMPLATES.env.auto_reload = TEMPLATE_DEV
+TEMPLATES.env.cache_size = 400
+try:
+    # No directory argument: Jinja uses a per-user 0700 temp directory and
+    # refuses one owned by someone else (a shared /tmp path could be
+    # pre-created by another local user to plant bytecode).
+    TEMPLATES.env.bytecode_cache = FileSystemBytecodeCache()
+except Exception:
+    # Best-effort: without a writable temp dir we just compile in memory.
+    pass
+
+static_dir = BASE_DIR / "static"
+static_dir.mkdir(exist_ok=True)
+# Templates link assets as {{ static_url("...") }} -> cache-busted, long-cached URLs.
+TEMPLATES.env.globals["static_url"] = make_static_url(static_dir)
+
+# Resolve templates once at import instead of per request.
+INDEX_TPL = TEMPLATES.get_template("index.html")
+ERROR_TPL = TEMPLATES.get_template("error.html")
+REPORT_TPL = TEMPLATES.get_template("report.html")
+
+
+def _live(tpl):
+    """tpl itself, or under CHESSDNA_DEV a fresh lookup so auto_reload sees edits."""
+    return TEMPLATES.get_template(tpl.name) if TEMPLATE_DEV else tpl
+
+
+def _new_token() -> str:
+    """Short URL/filename-safe id for preview tokens and report ids (96 random bits, 16 chars)."""
+    return secrets.token_urlsafe(12)
+
+
+def _render(tpl, context: dict[str, object], *, status_code: int = 200) -> HTMLResponse:
+    """Render a pre-resolved template into an HTMLResponse."""
+    return HTMLResponse(_live(tpl).render(context), status_code=status_code)
+
+
+# error.html pre-rendered once with sentinels: validation errors (no traceback)
+# are served by plain string substitution instead of a Jinja render.
+_ERROR_SENTINELS = {
+    "hint": "__CHESSDNA_HINT__",
+    "error": "__CHESSDNA_ERROR__",
+    # User input: substituted last so it can never expand another sentinel.
+    "engine_path": "__CHESSDNA_ENGINE_PATH__",
+}
+ERROR_SHELL = ERROR_TPL.render({**_ERROR_SENTINELS, "trace": ""})
+
+
+def _error_shell(error: str, *, hint: str, engine_path: str, status_code: int = 400) -> HTMLResponse:
+    """Fast path for error.html without a traceback."""
+    # Under CHESSDNA_DEV re-render the shell so error.html edits show up.
+    body = _live(ERROR_TPL).render({**_ERROR_SENTINELS, "trace": ""}) if TEMPLATE_DEV else ERROR_SHELL
+    for key, value in (("hint", hint), ("error", error), ("engine_path", engine_path)):
+        body = body.replace(_ERROR_SENTINELS[key], escape(str(value)))
+    return HTMLResponse(body, status_code=status_code)
+
 
-# In-memory report store (MVP). Maps report_id -> {json_path, html_path}
-REPORT_STORE: dict[str, dict[str, str]] = {}
 REPORT_TMP_DIR = Path(tempfile.gettempdir()) / "chessdna_reports"
 REPORT_TMP_DIR.mkdir(exist_ok=True)
 
+# Persistent artifact index (SQLite/WAL). Maps token -> {kind: path}, where kind is
+# "json"/"html" for reports and "pgn"/"meta" for fetched previews.
+# Kept in a per-user 0700 directory: the index decides which files are served.
+ARTIFACT_STORE = KVStore(private_temp_dir() / "artifacts.sqlite3")
+
 
 def _cleanup_tmp_dir(tmp_dir: Path, *, max_age_hours: float, suffixes: tuple[str, ...]) -> int:
     """Best-effort cleanup for temp artifacts.
@@ -75,100 +195,273 @@ def _cleanup_tmp_dir(tmp_dir: Path, *, max_age_hours: float, suffixes: tuple[str
     deleted = 0
 
     try:
-        for p in tmp_dir.glob("*"):
-            if not p.is_file():
-                continue
-            if suffixes and p.suffix.lower() not in suffixes:
-                continue
-            try:
-                st = p.stat()
-                age = now - float(st.st_mtime)
-                if age > max_age_s:
-                    p.unlink(missing_ok=True)
-                    deleted += 1
-            except Exception:
-                # Best-effort: ignore individual file errors.
-                pass
+        # os.scandir: one directory read, and DirEntry caches type/stat info.
+        with os.scandir(tmp_dir) as it:
+            for e in it:
+                try:
+                    if not e.is_file(follow_symlinks=False):
+                        continue
+                    if suffixes and not e.name.lower().endswith(suffixes):
+                        continue
+                    age = now - float(e.stat(follow_symlinks=False).st_mtime)
+                    if age > max_age_s:
+                        os.unlink(e.path)
+                        deleted += 1
+                except Exception:
+                    # Best-effort: ignore individual file errors.
+                    pass
     except Exception:
         pass
 
     return deleted
 
 
-def _clamp_analyze_settings(time_per_move: float, max_plies: int) -> tuple[float, int, str]:
-    """Clamp user-provided analyze settings to safe MVP ranges.
+def _write_transient(path: str | Path, data: str | bytes) -> None:
+    """Write a write-once temp artifact and ask the kernel to drop its pages.
 
-    Returns (time_per_move, max_plies, warn_msg).
-
-    We intentionally clamp rather than hard-fail: the UI already provides
-    reasonable defaults, and clamping avoids accidental "hang" inputs.
+    Reports and fetched PGNs are rarely read back, so they should not push
+    useful data out of the page cache. The fadvise hint is Linux/POSIX-only
+    and best-effort (dirty pages are dropped once written back).
     """
 
-    warn: list[str] = []
+    if isinstance(data, str):
+        data = data.encode("utf-8")
 
-    # time_per_move: too small is pointless; too large can make web UI feel stuck.
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+    fd = os.open(path, flags, 0o644)
     try:
-        t = float(time_per_move)
-    except Exception:
-        t = 0.05
-        warn.append("time_per_move 非數字，已回復預設 0.05")
+        view = memoryview(data)
+        while view:
+            n = os.write(fd, view)
+            view = view[n:]
+        _drop_page_cache(fd)
+    finally:
+        os.close(fd)
+
+
+def _drop_page_cache(fd: int) -> None:
+    """Best-effort POSIX_FADV_DONTNEED for a written artifact (no-op where unsupported)."""
+    if hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        except OSError:
+            pass
+
 
-    t2 = max(0.01, min(t, 1.0))
-    if t2 != t:
-        warn.append(f"time_per_move 已限制為 {t2:.2f}s（範圍 0.01~1.00）")
+def _housekeeping(*, report_hours: float, fetch_hours: float) -> None:
+    """Sweep stale temp artifacts and their index entries (best-effort)."""
+
+    _cleanup_tmp_dir(REPORT_TMP_DIR, max_age_hours=report_hours, suffixes=(".json", ".html", ".tmp"))
+    _cleanup_tmp_dir(FETCH_TMP_DIR, max_age_hours=fetch_hours, suffixes=(".pgn", ".json"))
+    _cleanup_tmp_dir(ANALYSIS_CACHE_DIR, max_age_hours=report_hours, suffixes=(".json", ".tmp"))
+    _cleanup_tmp_dir(http_cache_dir(), max_age_hours=report_hours, suffixes=(".json", ".meta", ".tmp"))
 
-    # max_plies: protect server from huge workloads (MVP).
     try:
-        m = int(max_plies)
+        ARTIFACT_STORE.sweep(report_hours * 3600.0, kinds=("json", "html"))
+        ARTIFACT_STORE.sweep(fetch_hours * 3600.0, kinds=("pgn", "meta"))
     except Exception:
-        m = 200
-        warn.append("max_plies 非數字，已回復預設 200")
+        pass
 
-    m2 = max(10, min(m, 800))
-    if m2 != m:
-        warn.append(f"max_plies 已限制為 {m2}（範圍 10~800）")
 
-    return t2, m2, "；".join(warn)
+async def _periodic_housekeeping(interval_s: float, *, report_hours: float, fetch_hours: float) -> None:
+    """Re-run _housekeeping every interval_s seconds (in a worker thread) until cancelled."""
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(interval_s)
+        try:
+            await loop.run_in_executor(
+                IO_EXECUTOR,
+                partial(_housekeeping, report_hours=report_hours, fetch_hours=fetch_hours),
+            )
+        except Exception:
+            pass
 
 
-# In-memory fetched PGN store (MVP). Maps token -> {"platform": str, "previews": [...], "games": [pgn_str...]}
+# In-memory fetched PGN store (MVP). Maps token -> {"platform": str, "previews": [...], ...} plus either
+# {"pgn_path": str, "offsets": [(start, end), ...]} (games stay on disk, sliced via mmap on selection)
+# or the legacy {"games": [pgn_str...]}.
 # Best-effort persistence: we also write the fetched concatenated PGN to a temp file
 # so the preview_token can sometimes survive a server restart.
-FETCH_STORE: dict[str, dict[str, object]] = {}
+# Capped LRU: evicted tokens are reloaded from those temp files on next use.
+try:
+    FETCH_STORE_MAX_ENTRIES = int(os.environ.get("CHESSDNA_FETCH_STORE_MAX", "256"))
+except Exception:
+    FETCH_STORE_MAX_ENTRIES = 256
+FETCH_STORE: LRUStore = LRUStore(FETCH_STORE_MAX_ENTRIES)
 FETCH_TMP_DIR = Path(tempfile.gettempdir()) / "chessdna_fetch"
 FETCH_TMP_DIR.mkdir(exist_ok=True)
 
 
-# startup housekeeping moved to FastAPI lifespan
+# Per-game reports keyed by (engine, settings, PGN): re-selecting a game that was
+# already analyzed is a JSON read instead of an engine run. Swept like reports.
+ANALYSIS_CACHE_DIR = REPORT_TMP_DIR / "cache"
+ANALYSIS_CACHE = AnalysisCache(ANALYSIS_CACHE_DIR)
 
-static_dir = BASE_DIR / "static"
-static_dir.mkdir(exist_ok=True)
-app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
 
+# Dedicated threads for blocking engine analysis: caps concurrent analyze jobs at
+# one per CPU (matching the engine pool size) instead of sharing anyio's default
+# thread limiter with everything else.
+ANALYZE_EXECUTOR = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="chessdna-analyze")
 
-def _make_prefill(
+# Separate, larger pool for I/O-class blocking work (online fetches, PGN
+# split/preview, temp file writes, housekeeping), so long analyze jobs never
+# queue /preview fetches behind them (and vice versa).
+try:
+    IO_THREADS = int(os.environ.get("CHESSDNA_IO_THREADS", "32"))
+except Exception:
+    IO_THREADS = 32
+IO_EXECUTOR = ThreadPoolExecutor(max_workers=max(1, IO_THREADS), thread_name_prefix="chessdna-io")
+
+
+def _analyze_with_pool(
+    src: str,
     *,
-    platform: str = "auto",
-    lichess_user: str = "",
-    chesscom_user: str = "",
-    fetch_max: int = 10,
-    player_name: str = "",
-    engine_path: str = "",
-    time_per_move: float = 0.05,
-    max_plies: int = 200,
-) -> dict[str, object]:
-    return {
-        "platform": platform,
-        "lichess_user": lichess_user,
-        "chesscom_user": chesscom_user,
-        "fetch_max": fetch_max,
-        "player_name": player_name,
-        "engine_path": engine_path,
-        "time_per_move": time_per_move,
-        "max_plies": max_plies,
-    }
+    engine_path: str,
+    time_per_move: float,
+    max_plies: int,
+    player_name: str | None,
+    max_engines: int | None = None,
+) -> AnalyzeReport:
+    """Run analyze_pgn_text on engines borrowed from the shared pool.
+
+    One engine is always borrowed (waiting if the pool is busy); any further
+    engines that are free right now are borrowed too (up to max_engines in
+    total), so positions get evaluated in parallel.
+
+    Falls back to analyze_pgn_text's own engine handling (spawn or degrade to
+    engine-less) when the engine path is missing or the pool cannot spawn.
+    """
 
+    pool = None
+    borrowed: list[UciEngine] = []  # [main engine, *extra engines]
+    try:
+        if resolve_engine_path(engine_path):
+            pool = get_pool(engine_path)
+            borrowed.append(pool.acquire())
+            limit = pool.size if max_engines is None else max(1, min(max_engines, pool.size))
+            while len(borrowed) < limit:
+                e = pool.try_acquire()
+                if e is None:
+                    break
+                borrowed.append(e)
+    except Exception:
+        # Hand back whatever was borrowed, else the pool's capacity shrinks for good.
+        for e in borrowed:
+            pool.release(e)
+        pool = None
+        borrowed = []
 
+    broken = False
+    try:
+        return analyze_pgn_text(
+            src,
+            engine_path=engine_path,
+            time_per_move=time_per_move,
+            max_plies=max_plies,
+            player_name=player_name,
+            engine=borrowed[0] if borrowed else None,
+            extra_engines=borrowed[1:],
+        )
+    except Exception:
+        broken = True
+        raise
+    finally:
+        for e in borrowed:
+            pool.release(e, broken=broken)
+
+
+def _analyze_game_cached(
+    game: str,
+    *,
+    engine_path: str,
+    time_per_move: float,
+    max_plies: int,
+    player_name: str | None,
+    max_engines: int | None = None,
+) -> AnalyzeReport:
+    """_analyze_with_pool for one game, served from ANALYSIS_CACHE when already analyzed."""
+    key = AnalysisCache.key(
+        game,
+        engine_path=engine_path,
+        time_per_move=time_per_move,
+        max_plies=max_plies,
+        player_name=player_name,
+    )
+    if key is not None:
+        cached = ANALYSIS_CACHE.get(key)
+        if cached is not None:
+            return cached
+
+    report = _analyze_with_pool(
+        game,
+        engine_path=engine_path,
+        time_per_move=time_per_move,
+        max_plies=max_plies,
+        player_name=player_name,
+        max_engines=max_engines,
+    )
+    if key is not None:
+        ANALYSIS_CACHE.put(key, report)
+    return report
+
+
+async def _blocking(fn, /, *args, **kwargs):
+    """Run a blocking call (network / disk / PGN parsing) on IO_EXECUTOR."""
+    return await asyncio.get_running_loop().run_in_executor(IO_EXECUTOR, partial(fn, *args, **kwargs))
+
+
+async def _analyze_games(games: list[str], **kwargs) -> AnalyzeReport:
+    """Analyze games concurrently (one executor job per game) and merge the reports.
+
+    Each job borrows its own engine(s) from the pool; the pool size is split
+    evenly between the games so one game cannot grab every engine up front.
+    Games analyzed before with the same engine/settings come from ANALYSIS_CACHE.
+    Threads (not processes) are enough: the engines are separate processes.
+    """
+    loop = asyncio.get_running_loop()
+    share = max(1, (os.cpu_count() or 1) // max(1, len(games)))
+    jobs = [
+        loop.run_in_executor(ANALYZE_EXECUTOR, partial(_analyze_game_cached, g, max_engines=share, **kwargs))
+        for g in games
+    ]
+    return AnalyzeReport.merge(await asyncio.gather(*jobs))
+
+
+# Uploaded PGNs are copied in fixed-size chunks into a spooled temp file
+# (kept in memory up to 1 MiB, then rolled over to disk).
+UPLOAD_CHUNK_SIZE = 64 * 1024
+UPLOAD_SPOOL_MAX_SIZE = 1024 * 1024
+
+
+async def _read_upload_text(upload: UploadFile) -> str:
+    """Read an uploaded PGN as text without buffering the raw bytes.
+
+    `await upload.read()` would materialize the whole upload as `bytes` and then
+    decode it into a second full-size `str`. Streaming the chunks through a
+    spooled temp file keeps only the decoded text in memory.
+    """
+
+    with tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_MAX_SIZE) as tmp:
+        while chunk := await upload.read(UPLOAD_CHUNK_SIZE):
+            tmp.write(chunk)
+        return await _blocking(_decode_spooled, tmp)
+
+
+def _decode_spooled(tmp) -> str:
+    """Decode a spooled upload as UTF-8 (may read from a disk-backed spool)."""
+    tmp.seek(0)
+    with io.TextIOWrapper(tmp, encoding="utf-8", errors="replace") as f:
+        return f.read()
+
+
+def _has_upload(upload: UploadFile | None) -> bool:
+    """True if the form actually carried a file (browsers send an empty part when none is chosen)."""
+    return upload is not None and bool(upload.filename or upload.size)
+
+
+# startup housekeeping moved to FastAPI lifespan
+
+app.mount("/static", CachedStatic(directory=str(static_dir), html=False, check_dir=True), name="static")
 
 
 @app.get("/sw.js", include_in_schema=False)
@@ -182,21 +475,232 @@ def service_worker():
     )
 
 
-@app.get("/", response_class=HTMLResponse)
-def index(request: Request):
-    return TEMPLATES.TemplateResponse(
-        request,
-        "index.html",
+def _render_index_page() -> str:
+    """The landing page; it has no per-request data."""
+    return _live(INDEX_TPL).render(
         {
-            "request": request,
             "default_engine": default_stockfish_path(),
             "default_time": 0.05,
             "preview_token": "",
             "preview_platform": "",
             "games": [],
-            "prefill": _make_prefill(engine_path=default_stockfish_path()),
-        },
+            "prefill": SourceForm(engine_path=default_stockfish_path()).prefill(),
+        }
+    )
+
+
+# Rendered once per process; CHESSDNA_DEV renders it per request instead.
+_index_page = cache(_render_index_page)
+
+
+@app.get("/", response_class=HTMLResponse)
+def index(request: Request):
+    return HTMLResponse(_render_index_page() if TEMPLATE_DEV else _index_page())
+
+
+def _join_games(raw_games: list[str]) -> tuple[bytes, list[tuple[int, int]]]:
+    """Concatenate per-game PGN into one blob; return (blob, [(start, end), ...]) byte ranges."""
+    chunks: list[bytes] = []
+    offsets: list[tuple[int, int]] = []
+    pos = 0
+    for g in raw_games:
+        b = g.encode("utf-8")
+        offsets.append((pos, pos + len(b)))
+        chunks.append(b)
+        chunks.append(b"\n")
+        pos += len(b) + 1
+    return b"".join(chunks), offsets
+
+
+def _persist_fetch(
+    token: str,
+    *,
+    platform: str,
+    fetch_max: int,
+    previews: list[GamePreview],
+    raw_games: list[str],
+) -> tuple[str, list[tuple[int, int]]]:
+    """Write {token}.pgn + {token}.json sidecar and index them (blocking; run off the loop).
+
+    Returns (pgn_path, game byte ranges) for the FETCH_STORE entry.
+    """
+    pgn_path = FETCH_TMP_DIR / f"{token}.pgn"
+    meta_path = FETCH_TMP_DIR / f"{token}.json"
+    pgn_bytes, offsets = _join_games(raw_games)
+    _write_transient(pgn_path, pgn_bytes)
+    _write_transient(
+        meta_path,
+        to_json(
+            {
+                "platform": platform,
+                "created_at": time.time(),
+                "fetch_max": fetch_max,
+                "previews": [asdict(p) for p in previews],
+                "game_offsets": offsets,
+            }
+        ),
     )
+    ARTIFACT_STORE.put(token, "pgn", pgn_path)
+    ARTIFACT_STORE.put(token, "meta", meta_path)
+    return str(pgn_path), offsets
+
+
+def _save_report_json(report: AnalyzeReport) -> tuple[str, str]:
+    """Create a report_id and write + index its JSON artifact. Returns (report_id, json_path)."""
+    report_id = _new_token()
+    json_path = str(REPORT_TMP_DIR / f"{report_id}.json")
+
+    # Serialize straight to UTF-8 bytes (no intermediate str + re-encode).
+    _write_transient(json_path, to_json(report, indent=2))
+    ARTIFACT_STORE.put(report_id, "json", json_path)
+    return report_id, json_path
+
+
+# Jinja output events per streamed chunk (a few KB of HTML each).
+REPORT_STREAM_BUFFER = 64
+
+
+def _report_stream_error(exc: Exception) -> bytes:
+    """Closing HTML fragment for a report page whose rendering failed mid-stream."""
+    return (
+        '<div style="margin:12px 0;padding:10px 12px;border:1px solid rgba(239,68,68,.35);'
+        'background:rgba(239,68,68,.10);border-radius:12px;color:#fecaca;font-size:13px;">'
+        f"報告產生中斷 (Report rendering failed): <code>{escape(repr(exc))}</code>"
+        ' · <a href="/">← 回首頁</a></div></div></body></html>'
+    ).encode("utf-8")
+
+
+def _stream_report_html(report: AnalyzeReport, *, report_id: str, json_path: str, warn_msg: str = ""):
+    """Render report.html incrementally: yield UTF-8 chunks and tee them to the HTML artifact.
+
+    The first bytes go out after the first template block instead of after the
+    whole per-ply table, and neither side holds the full page in memory. If the
+    client disconnects early, the rest is still rendered into the file (on
+    IO_EXECUTOR) so the download link keeps working. Sync generator: Starlette
+    iterates it in a worker thread.
+    """
+    html_path = REPORT_TMP_DIR / f"{report_id}.html"
+    tmp_path = html_path.with_name(f"{html_path.name}.tmp")
+    stream = _live(REPORT_TPL).stream(
+        {
+            "report": report,
+            "debug_path": json_path,
+            "report_id": report_id,
+            "inline_warn": warn_msg,
+        }
+    )
+    stream.enable_buffering(REPORT_STREAM_BUFFER)
+
+    complete = False
+    handed_off = False
+    f = open(tmp_path, "wb")
+    try:
+        try:
+            for chunk in stream:
+                data = chunk.encode("utf-8")
+                f.write(data)
+                yield data
+        except GeneratorExit:
+            # Client went away: finish the file anyway so the download link works.
+            # close() runs on the event loop thread, so render the rest elsewhere.
+            try:
+                IO_EXECUTOR.submit(_finish_report_html, f, tmp_path, html_path, report_id, rest=stream)
+                handed_off = True
+            except RuntimeError:
+                # Executor already shut down (server stopping): drop the file.
+                pass
+            raise
+        except Exception as e:
+            # The 200 and the first chunks are already out: end the page with a
+            # visible error instead of a silently truncated one. The partial
+            # HTML artifact is dropped.
+            yield _report_stream_error(e)
+            return
+        complete = True
+    finally:
+        if not handed_off:
+            _finish_report_html(f, tmp_path, html_path, report_id, complete=complete)
+
+
+def _finish_report_html(f, tmp_path: Path, html_path: Path, report_id: str, *, complete: bool = True, rest=()) -> None:
+    """Write any remaining chunks, then publish (complete) or drop the HTML artifact."""
+    try:
+        for chunk in rest:
+            f.write(chunk.encode("utf-8"))
+    except Exception:
+        complete = False
+    finally:
+        f.flush()
+        _drop_page_cache(f.fileno())
+        f.close()
+        if complete:
+            os.replace(tmp_path, html_path)
+            ARTIFACT_STORE.put(report_id, "html", str(html_path))
+        else:
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+
+
+def _reload_token(token: str, *, max_games: int) -> dict | None:
+    """Rebuild a FETCH_STORE entry from the temp files written by /preview.
+
+    Prefers the sidecar's previews + byte ranges (no PGN parsing; games are sliced
+    from the file on selection); falls back to re-parsing the PGN when the sidecar
+    predates them.
+    """
+    # Prefer the artifact index; fall back to the conventional temp path.
+    paths = ARTIFACT_STORE.get(token)
+    p = Path(paths.get("pgn") or (FETCH_TMP_DIR / f"{token}.pgn"))
+    if not p.exists():
+        return None
+
+    # A missing sidecar is just an OSError here (no separate exists() stat).
+    meta: dict = {}
+    try:
+        meta_p = Path(paths.get("meta") or (FETCH_TMP_DIR / f"{token}.json"))
+        meta = from_json(meta_p.read_bytes())
+    except Exception:
+        meta = {}
+    platform = str(meta.get("platform") or "").strip()
+
+    previews_raw = meta.get("previews")
+    offsets = meta.get("game_offsets")
+    if isinstance(previews_raw, list) and isinstance(offsets, list) and len(previews_raw) == len(offsets):
+        return {
+            "platform": platform,
+            "previews": [GamePreview(**d) for d in previews_raw[:max_games]],
+            "pgn_path": str(p),
+            "offsets": [(int(lo), int(hi)) for lo, hi in offsets[:max_games]],
+        }
+
+    src = p.read_text(encoding="utf-8", errors="replace")
+    previews, games = preview_games(src, max_games=max_games)
+    return {"platform": platform, "previews": previews, "games": games}
+
+
+def _selected_games(store: dict, selected: list[int]) -> list[str]:
+    """Return the non-empty PGN text of the selected games (preview indices) of a FETCH_STORE entry.
+
+    Out-of-range indices are ignored.
+    """
+    offsets = store.get("offsets")
+    if offsets is None:
+        games = store.get("games") or []
+        n = len(games)
+        return [g for i in selected if 0 <= i < n and (g := games[i].strip())]
+
+    n = len(offsets)
+    picked = [offsets[i] for i in selected if 0 <= i < n]
+    if not picked:
+        return []
+    with open(store["pgn_path"], "rb") as f:
+        # mmap refuses empty files (e.g. truncated since the preview).
+        if os.fstat(f.fileno()).st_size == 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return [g for lo, hi in picked if (g := mm[lo:hi].decode("utf-8", errors="replace").strip())]
 
 
 @app.post("/preview", response_class=HTMLResponse)
@@ -214,144 +718,35 @@ async def preview(
 ):
     """Fetch recent games and show a selectable list (MVP UX step)."""
 
-    lichess_user = (lichess_user or "").strip()
-    chesscom_user = (chesscom_user or "").strip()
-
-    raw_fetch_max = fetch_max
-    try:
-        fetch_max = int(fetch_max)
-    except Exception:
-        fetch_max = 10
-    fetch_max = max(1, min(fetch_max, 50))
-
-    inline_warn = ""
-    try:
-        if int(raw_fetch_max) != int(fetch_max):
-            inline_warn = f"fetch_max 已限制為 {fetch_max}（MVP 安全上限 50）"
-    except Exception:
-        # raw_fetch_max might be non-numeric; keep quiet.
-        pass
-
-    player_name = (player_name or "").strip()
-    engine_path = (engine_path or "").strip() or default_stockfish_path()
-
     # Accept numbers as strings (preview is just a UX step; don't 422 on bad input).
-    try:
-        time_per_move_f = float(time_per_move)
-    except Exception:
-        time_per_move_f = 0.05
-    try:
-        max_plies_i = int(max_plies)
-    except Exception:
-        max_plies_i = 200
-
-    time_per_move_f, max_plies_i, warn2 = _clamp_analyze_settings(time_per_move_f, max_plies_i)
-    if warn2:
-        inline_warn = (inline_warn + "；" if inline_warn else "") + warn2
-
-    req_platform = (platform or "auto").strip().lower()
-    if req_platform not in ("auto", "lichess", "chesscom"):
-        req_platform = "auto"
-
-    # If user explicitly selects a platform, require its username.
-    # Also guard the auto case server-side (client JS blocks this, but don't rely on it).
-    if req_platform == "auto" and (not lichess_user) and (not chesscom_user):
-        return TEMPLATES.TemplateResponse(
-            request,
-            "index.html",
-            {
-                "request": request,
-                "default_engine": default_stockfish_path(),
-                "default_time": 0.05,
-                "preview_token": "",
-                "games": [],
-                "inline_warn": inline_warn,
-                "inline_err": "要列出對局，請先輸入 Lichess 或 Chess.com username。",
-                "prefill": _make_prefill(
-                    platform=req_platform,
-                    lichess_user=lichess_user,
-                    chesscom_user=chesscom_user,
-                    fetch_max=fetch_max,
-                    player_name=player_name,
-                    engine_path=engine_path,
-                    time_per_move=time_per_move_f,
-                    max_plies=max_plies_i,
-                ),
-            },
-            status_code=400,
-        )
-
-    if req_platform == "lichess" and not lichess_user:
-        return TEMPLATES.TemplateResponse(
-            request,
-            "index.html",
-            {
-                "request": request,
-                "default_engine": default_stockfish_path(),
-                "default_time": 0.05,
-                "preview_token": "",
-                "games": [],
-                "inline_warn": inline_warn,
-                "inline_err": "你選了 Lichess，但沒有輸入 Lichess username。",
-                "prefill": _make_prefill(
-                    platform=req_platform,
-                    lichess_user=lichess_user,
-                    chesscom_user=chesscom_user,
-                    fetch_max=fetch_max,
-                    player_name=player_name,
-                    engine_path=engine_path,
-                    time_per_move=time_per_move_f,
-                    max_plies=max_plies_i,
-                ),
-            },
-            status_code=400,
-        )
+    form = SourceForm.from_form(
+        platform=platform,
+        lichess_user=lichess_user,
+        chesscom_user=chesscom_user,
+        fetch_max=fetch_max,
+        player_name=player_name,
+        engine_path=engine_path,
+        time_per_move=time_per_move,
+        max_plies=max_plies,
+    )
+    if err := form.validate(require_user=True):
+        return _render(INDEX_TPL, {"request": request, **form.error_template_ctx(err)}, status_code=400)
 
-    if req_platform == "chesscom" and not chesscom_user:
-        return TEMPLATES.TemplateResponse(
-            request,
-            "index.html",
-            {
-                "request": request,
-                "default_engine": default_stockfish_path(),
-                "default_time": 0.05,
-                "preview_token": "",
-                "games": [],
-                "inline_warn": inline_warn,
-                "inline_err": "你選了 Chess.com，但沒有輸入 Chess.com username。",
-                "prefill": _make_prefill(
-                    platform=req_platform,
-                    lichess_user=lichess_user,
-                    chesscom_user=chesscom_user,
-                    fetch_max=fetch_max,
-                    player_name=player_name,
-                    engine_path=engine_path,
-                    time_per_move=time_per_move_f,
-                    max_plies=max_plies_i,
-                ),
-            },
-            status_code=400,
-        )
+    req_platform = form.platform
+    lichess_user, chesscom_user, fetch_max = form.lichess_user, form.chesscom_user, form.fetch_max
 
     src = ""
     used_platform = ""
     try:
         if req_platform == "lichess" or (req_platform == "auto" and lichess_user):
-            from .core.lichess import fetch_user_games_pgn as fetch_lichess
-
-            src = fetch_lichess(lichess_user, max_games=fetch_max).strip()
+            src = (await _blocking(lichess.fetch_user_games_pgn, lichess_user, max_games=fetch_max)).strip()
             used_platform = "lichess"
         elif req_platform == "chesscom" or (req_platform == "auto" and chesscom_user):
-            from .core.chesscom import fetch_user_games_pgn as fetch_chesscom
-
-            src = fetch_chesscom(chesscom_user, max_games=fetch_max).strip()
+            src = (await _blocking(chesscom.fetch_user_games_pgn, chesscom_user, max_games=fetch_max)).strip()
             used_platform = "chesscom"
     except Exception as e:
-        import traceback
-
-        return TEMPLATES.TemplateResponse(
-            request,
-            "error.html",
+        return _render(
+            ERROR_TPL,
             {
                 "request": request,
                 "error": repr(e),
@@ -363,47 +758,35 @@ async def preview(
         )
 
     if not src:
-        return TEMPLATES.TemplateResponse(
-            request,
-            "error.html",
-            {
-                "request": request,
-                "error": "ValueError('Empty PGN from online fetch')",
-                "trace": "",
-                "engine_path": default_stockfish_path(),
-                "hint": "抓不到棋譜：請確認 username 是否正確，且帳號對局是公開的。",
-            },
-            status_code=400,
+        return _error_shell(
+            "ValueError('Empty PGN from online fetch')",
+            hint="抓不到棋譜：請確認 username 是否正確，且帳號對局是公開的。",
+            engine_path=default_stockfish_path(),
         )
 
-    from .core.pgn_utils import preview_games
+    previews, raw_games = await _blocking(preview_games, src, max_games=fetch_max)
 
-    previews, raw_games = preview_games(src, max_games=fetch_max)
+    token = _new_token()
+    entry: dict[str, object] = {"platform": used_platform, "previews": previews}
 
-    token = uuid.uuid4().hex
-    FETCH_STORE[token] = {"platform": used_platform, "previews": previews, "games": raw_games}
-
-    # Persist raw PGN (+ minimal metadata) for best-effort reload after restart.
+    # Persist the split games (+ previews and per-game byte ranges) so a reload
+    # after restart can slice the file instead of re-parsing the PGN.
     try:
-        (FETCH_TMP_DIR / f"{token}.pgn").write_text(src, encoding="utf-8")
-        (FETCH_TMP_DIR / f"{token}.json").write_text(
-            json.dumps(
-                {
-                    "platform": used_platform,
-                    "created_at": time.time(),
-                    "fetch_max": fetch_max,
-                },
-                ensure_ascii=False,
-                indent=2,
-            ),
-            encoding="utf-8",
+        entry["pgn_path"], entry["offsets"] = await _blocking(
+            _persist_fetch,
+            token,
+            platform=used_platform,
+            fetch_max=fetch_max,
+            previews=previews,
+            raw_games=raw_games,
         )
     except Exception:
-        pass
+        # Temp file not available: keep the game strings in memory instead.
+        entry["games"] = raw_games
+    FETCH_STORE[token] = entry
 
-    return TEMPLATES.TemplateResponse(
-        request,
-        "index.html",
+    return _render(
+        INDEX_TPL,
         {
             "request": request,
             "default_engine": default_stockfish_path(),
@@ -411,17 +794,8 @@ async def preview(
             "preview_token": token,
             "preview_platform": used_platform,
             "games": previews,
-            "inline_warn": inline_warn,
-            "prefill": _make_prefill(
-                platform=req_platform,
-                lichess_user=lichess_user,
-                chesscom_user=chesscom_user,
-                fetch_max=fetch_max,
-                player_name=player_name,
-                engine_path=engine_path,
-                time_per_move=time_per_move_f,
-                max_plies=max_plies_i,
-            ),
+            "inline_warn": form.warn,
+            "prefill": form.prefill(),
         },
     )
 
@@ -430,8 +804,8 @@ async def preview(
 def download(report_id: str, kind: str):
     if kind not in ("json", "html"):
         raise HTTPException(status_code=400, detail="kind must be json or html")
-    # Best-effort: after restart, REPORT_STORE is empty, but temp artifacts may still exist.
-    return download_file(REPORT_STORE, report_id, kind, fallback_dir=REPORT_TMP_DIR)
+    # Best-effort: if the index misses (e.g. it was swept), temp artifacts may still exist.
+    return download_file(ARTIFACT_STORE, report_id, kind, fallback_dir=REPORT_TMP_DIR)
 
 
 @app.post("/analyze", response_class=HTMLResponse)
@@ -458,102 +832,68 @@ async def analyze(
 
     preview_token = (preview_token or "").strip()
 
-    # Stability guardrails for MVP: avoid huge fetch/preview payloads.
-    # Note: this also protects the preview_token reload path (after restart).
-    try:
-        fetch_max = int(fetch_max)
-    except Exception:
-        fetch_max = 10
-    fetch_max = max(1, min(fetch_max, 50))
-
-    req_platform = (platform or "auto").strip().lower()
-    if req_platform not in ("auto", "lichess", "chesscom"):
-        req_platform = "auto"
-
-    lichess_user = (lichess_user or "").strip()
-    chesscom_user = (chesscom_user or "").strip()
+    # Note: fetch_max clamping also protects the preview_token reload path (after restart).
+    form = SourceForm.from_form(
+        platform=platform,
+        lichess_user=lichess_user,
+        chesscom_user=chesscom_user,
+        fetch_max=fetch_max,
+        player_name=player_name,
+        engine_path=engine_path,
+        time_per_move=time_per_move,
+        max_plies=max_plies,
+    )
+    req_platform = form.platform
+    lichess_user, chesscom_user, fetch_max = form.lichess_user, form.chesscom_user, form.fetch_max
+    engine_path = form.engine_path
 
     src = ""
+    games: list[str] = []  # per-game PGN, when the source is already split
     if preview_token:
         store = FETCH_STORE.get(preview_token)
         if not store:
-            # Best-effort reload from temp (in case of server restart).
+            # Best-effort reload from disk (in case of server restart).
             try:
-                p = FETCH_TMP_DIR / f"{preview_token}.pgn"
-                if p.exists():
-                    src2 = p.read_text(encoding="utf-8", errors="replace")
-                    from .core.pgn_utils import preview_games
-
-                    previews2, raw_games2 = preview_games(src2, max_games=fetch_max)
-
-                    # Also reload platform info if available.
-                    platform2 = ""
-                    try:
-                        meta_p = FETCH_TMP_DIR / f"{preview_token}.json"
-                        if meta_p.exists():
-                            meta = json.loads(meta_p.read_text(encoding="utf-8", errors="replace"))
-                            platform2 = str(meta.get("platform") or "").strip()
-                    except Exception:
-                        platform2 = ""
-
-                    store = {"platform": platform2, "previews": previews2, "games": raw_games2}
+                store = await _blocking(_reload_token, preview_token, max_games=fetch_max)
+                if store:
                     FETCH_STORE[preview_token] = store
             except Exception:
                 store = None
 
         if not store:
-            return TEMPLATES.TemplateResponse(
-                request,
-                "error.html",
-                {
-                    "request": request,
-                    "error": "ValueError('preview_token expired')",
-                    "trace": "",
-                    "engine_path": engine_path,
-                    "hint": "這個預覽 token 已失效（伺服器重啟或時間過久）。請回到首頁重新抓取棋譜。",
-                },
-                status_code=400,
+            return _error_shell(
+                "ValueError('preview_token expired')",
+                hint="這個預覽 token 已失效（伺服器重啟或時間過久）。請回到首頁重新抓取棋譜。",
+                engine_path=engine_path,
             )
 
-        games = list(store.get("games") or [])
         previews = list(store.get("previews") or [])
 
-        selected = sorted(set(int(x) for x in (game_idx or [])))
+        # game_idx is already validated as list[int] by FastAPI.
+        selected = sorted(set(game_idx or ()))
         if selected:
-            chosen: list[str] = []
-            for i in selected:
-                if 0 <= i < len(games):
-                    chosen.append(str(games[i]).strip())
-            src = "\n\n".join([c for c in chosen if c]).strip()
+            try:
+                games = _selected_games(store, selected)
+            except OSError:
+                # Temp .pgn swept/removed since the preview.
+                games = []
+            src = "\n\n".join(games)
         else:
             # If user is in preview mode, require an explicit selection.
             # Otherwise it is easy to accidentally analyze *all* fetched games.
             #
             # However: if the user also provided an uploaded file or pasted PGN text,
             # we should allow that path to proceed (client-side JS already permits it).
-            has_fallback_pgn = bool((pgn_text or "").strip()) or (pgn is not None)
+            has_fallback_pgn = bool((pgn_text or "").strip()) or _has_upload(pgn)
             if not has_fallback_pgn:
-                return TEMPLATES.TemplateResponse(
-                    request,
-                    "index.html",
+                return _render(
+                    INDEX_TPL,
                     {
                         "request": request,
-                        "default_engine": default_stockfish_path(),
-                        "default_time": 0.05,
+                        **form.error_template_ctx("請至少勾選 1 盤 (Select at least 1 game) 才能開始分析。"),
                         "preview_token": preview_token,
                         "preview_platform": str(store.get("platform") or ""),
                         "games": previews,
-                        "inline_err": "請至少勾選 1 盤 (Select at least 1 game) 才能開始分析。",
-                        "prefill": _make_prefill(
-                            platform=req_platform,
-                            lichess_user=lichess_user,
-                            chesscom_user=chesscom_user,
-                            fetch_max=fetch_max,
-                            player_name=player_name,
-                            engine_path=engine_path,
-                            time_per_move=time_per_move,
-                            max_plies=max_plies,
-                        ),
                     },
                     status_code=400,
                 )
@@ -561,147 +901,65 @@ async def analyze(
     if not src:
         src = (pgn_text or "").strip()
 
-    # req_platform, lichess_user, chesscom_user already normalized above.
-
     # If user explicitly selects a platform, require its username.
     # (Client-side JS already blocks this, but we also guard server-side.)
-    if not src:
-        if req_platform == "lichess" and not lichess_user:
-            return TEMPLATES.TemplateResponse(
-                request,
-                "index.html",
-                {
-                    "request": request,
-                    "default_engine": default_stockfish_path(),
-                    "default_time": 0.05,
-                    "preview_token": "",
-                    "games": [],
-                    "inline_err": "你選了 Lichess，但沒有輸入 Lichess username。",
-                    "prefill": _make_prefill(
-                        platform=req_platform,
-                        lichess_user=lichess_user,
-                        chesscom_user=chesscom_user,
-                        fetch_max=fetch_max,
-                        player_name=player_name,
-                        engine_path=engine_path,
-                        time_per_move=time_per_move,
-                        max_plies=max_plies,
-                    ),
-                },
-                status_code=400,
-            )
-
-        if req_platform == "chesscom" and not chesscom_user:
-            return TEMPLATES.TemplateResponse(
-                request,
-                "index.html",
-                {
-                    "request": request,
-                    "default_engine": default_stockfish_path(),
-                    "default_time": 0.05,
-                    "preview_token": "",
-                    "games": [],
-                    "inline_err": "你選了 Chess.com，但沒有輸入 Chess.com username。",
-                    "prefill": _make_prefill(
-                        platform=req_platform,
-                        lichess_user=lichess_user,
-                        chesscom_user=chesscom_user,
-                        fetch_max=fetch_max,
-                        player_name=player_name,
-                        engine_path=engine_path,
-                        time_per_move=time_per_move,
-                        max_plies=max_plies,
-                    ),
-                },
-                status_code=400,
-            )
+    if not src and (err := form.validate()):
+        return _render(INDEX_TPL, {"request": request, **form.error_template_ctx(err)}, status_code=400)
 
     if not src and req_platform in ("auto", "lichess") and lichess_user:
-        from .core.lichess import fetch_user_games_pgn as fetch_lichess
-
-        src = fetch_lichess(lichess_user, max_games=fetch_max).strip()
+        src = (await _blocking(lichess.fetch_user_games_pgn, lichess_user, max_games=fetch_max)).strip()
 
     if not src and req_platform in ("auto", "chesscom") and chesscom_user:
-        from .core.chesscom import fetch_user_games_pgn as fetch_chesscom
+        src = (await _blocking(chesscom.fetch_user_games_pgn, chesscom_user, max_games=fetch_max)).strip()
 
-        src = fetch_chesscom(chesscom_user, max_games=fetch_max).strip()
-
-    if not src and pgn is not None:
-        src = (await pgn.read()).decode("utf-8", errors="replace").strip()
+    # The multipart body was already spooled by the form parser; only read it
+    # when no other source applies, and drop the spool before the (long) analysis.
+    if not src and _has_upload(pgn):
+        src = (await _read_upload_text(pgn)).strip()
+    if pgn is not None:
+        await pgn.close()
 
     if not src:
-        return TEMPLATES.TemplateResponse(
-            request,
-            "error.html",
-            {
-                "request": request,
-                "error": "ValueError('Missing PGN: please upload a file / paste PGN / or provide online username')",
-                "trace": "",
-                "engine_path": engine_path,
-                "hint": "請上傳 PGN 檔、貼上 PGN 文字，或輸入 Lichess/Chess.com username。",
-            },
-            status_code=400,
+        return _error_shell(
+            "ValueError('Missing PGN: please upload a file / paste PGN / or provide online username')",
+            hint="請上傳 PGN 檔、貼上 PGN 文字，或輸入 Lichess/Chess.com username。",
+            engine_path=engine_path,
         )
 
-    player_name = player_name.strip() or None
+    # MVP stability: potentially expensive settings were clamped by SourceForm.
+    player_name = form.player_name or None
+    time_per_move, max_plies, warn_msg = form.time_per_move, form.max_plies, form.warn
 
-    # MVP stability: clamp potentially expensive settings.
-    time_per_move, max_plies, warn_msg = _clamp_analyze_settings(time_per_move, max_plies)
+    # Canonical absolute path (one pool / cache key per binary however it was
+    # typed). A missing engine keeps the typed path: the report degrades to
+    # "no engine" and shows what the user entered.
+    engine_path = resolve_engine_path(engine_path) or engine_path
 
     try:
-        # Run CPU/IO-heavy engine analysis in a worker thread to avoid
-        # asyncio event-loop/subprocess quirks on Windows.
-        fn = partial(
-            analyze_pgn_text,
-            src,
+        # Run blocking engine analysis (synchronous UCI pipes) in worker threads
+        # so the event loop stays free; games are analyzed in parallel.
+        if not games:
+            games = await _blocking(split_pgn_games, src) or [src]
+        report = await _analyze_games(
+            games,
             engine_path=engine_path,
             time_per_move=time_per_move,
             max_plies=max_plies,
             player_name=player_name,
         )
-        report = await anyio.to_thread.run_sync(fn)
-
-        # Write report artifacts to temp and expose download links.
-        report_id = uuid.uuid4().hex
-        json_path = str(REPORT_TMP_DIR / f"{report_id}.json")
-        html_path = str(REPORT_TMP_DIR / f"{report_id}.html")
 
-        Path(json_path).write_text(report.model_dump_json(indent=2), encoding="utf-8")
-
-        # Render HTML to string for download
-        tpl = TEMPLATES.get_template("report.html")
-        html = tpl.render(
-            {
-                "request": request,
-                "report": report,
-                "debug_path": json_path,
-                "report_id": report_id,
-                "inline_warn": warn_msg,
-            }
-        )
-        Path(html_path).write_text(html, encoding="utf-8")
-
-        REPORT_STORE[report_id] = {"json": json_path, "html": html_path}
-
-        return TEMPLATES.TemplateResponse(
-            request,
-            "report.html",
-            {
-                "request": request,
-                "report": report,
-                "debug_path": json_path,
-                "report_id": report_id,
-                "inline_warn": warn_msg,
-            },
+        # Write report artifacts to temp and expose download links; the HTML is
+        # streamed to the client while it is rendered.
+        report_id, json_path = await _blocking(_save_report_json, report)
+        return StreamingResponse(
+            _stream_report_html(report, report_id=report_id, json_path=json_path, warn_msg=warn_msg),
+            media_type="text/html; charset=utf-8",
         )
 
     except Exception as e:
-        import traceback
-
         # Show a friendly error page instead of a raw 500.
-        return TEMPLATES.TemplateResponse(
-            request,
-            "error.html",
+        return _render(
+            ERROR_TPL,
             {
                 "request": request,
                 "error": repr(e),
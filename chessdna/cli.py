@@ -1,22 +1,30 @@
 import argparse
-import json
 import os
-from dataclasses import asdict
+import sys
 from pathlib import Path
 
 from . import __version__
-from .core.analyze import analyze_pgn_text
-from .core.pgn_utils import pgn_info, preview_games
-from .core.settings import default_stockfish_path
+from .core.settings import VALID_PLATFORMS, default_stockfish_path
 
+# Heavy modules (python-chess, pydantic models, the web app) are imported in the
+# subcommand that needs them, so `chessdna --help` / `--version` start fast.
+# The same goes for stdlib modules only one subcommand uses (json, uuid,
+# dataclasses), and for chessdna.forms (dataclasses pulls in inspect).
 
-def main():
+
+def _open_pgn(path: str | Path):
+    """Open a PGN file as text; python-chess then reads it one game at a time."""
+    return open(path, encoding="utf-8", errors="replace")
+
+
+def main(argv: list[str] | None = None) -> int:
+    """CLI entry point; `argv` defaults to sys.argv[1:]. Returns the exit code."""
     p = argparse.ArgumentParser(prog="chessdna")
     p.add_argument("--version", action="version", version=f"chessdna {__version__}")
     sub = p.add_subparsers(dest="cmd", required=True)
 
     f = sub.add_parser("fetch", help="Fetch recent games from Lichess/Chess.com and save PGN")
-    f.add_argument("--platform", choices=["auto", "lichess", "chesscom"], default="auto")
+    f.add_argument("--platform", choices=sorted(VALID_PLATFORMS), default="auto")
     f.add_argument("--user", required=True)
     f.add_argument("--max", type=int, default=50, help="Max games to fetch (1~50; values outside will be clamped)")
     f.add_argument("--out", default="games.pgn")
@@ -30,6 +38,17 @@ def main():
     )
     a.add_argument("--t", type=float, default=0.05, help="Time per move (seconds)")
     a.add_argument("--max-plies", type=int, default=200)
+    a.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Engine processes searching in parallel (default: CPU count)",
+    )
+    a.add_argument(
+        "--adaptive-time",
+        action="store_true",
+        help="Spend less time on opening plies and more on tactical ones (--t is the base budget)",
+    )
     a.add_argument(
         "--player",
         default="",
@@ -40,6 +59,11 @@ def main():
     i = sub.add_parser("pgninfo", help="Validate/summarize PGN without engine")
     i.add_argument("--pgn", required=True, help="Path to PGN file")
     i.add_argument("--max-games", type=int, default=200)
+    i.add_argument(
+        "--fast",
+        action="store_true",
+        help="Count plies from the raw text without replaying moves (no legality check)",
+    )
     i.add_argument(
         "--json",
         action="store_true",
@@ -74,75 +98,99 @@ def main():
         help="Also run a minimal FastAPI route smoke test (POST /analyze with pasted PGN)",
     )
 
-    args = p.parse_args()
+    args = p.parse_args(argv)
 
     if args.cmd == "fetch":
+        # Imported here (once) so other subcommands don't pay for `requests`.
+        from .core.chesscom import fetch_user_games_pgn as fetch_chesscom
         from .core.http import FetchError
-
-        def fetch_lichess(u: str, *, max_games: int) -> str:
-            from .core.lichess import fetch_user_games_pgn
-
-            return fetch_user_games_pgn(u, max_games=max_games)
-
-        def fetch_chesscom(u: str, *, max_games: int) -> str:
-            from .core.chesscom import fetch_user_games_pgn
-
-            return fetch_user_games_pgn(u, max_games=max_games)
+        from .core.lichess import write_user_games_pgn as write_lichess
 
         max_games = max(1, min(int(args.max), 50))
         if max_games != int(args.max):
             print(f"[WARN] --max clamped to {max_games} (MVP safety limit)")
 
-        pgn = ""
+        def from_lichess() -> int:
+            # Streamed straight into the output file (no in-memory copy).
+            with open(args.out, "wb") as out:
+                return write_lichess(out, args.user, max_games=max_games)
+
+        def from_chesscom() -> None:
+            Path(args.out).write_text(fetch_chesscom(args.user, max_games=max_games), encoding="utf-8")
+
         if args.platform == "lichess":
-            pgn = fetch_lichess(args.user, max_games=max_games)
+            from_lichess()
         elif args.platform == "chesscom":
-            pgn = fetch_chesscom(args.user, max_games=max_games)
+            from_chesscom()
         else:
             # Auto: try Lichess first (fast + single endpoint), then fallback to chess.com.
             try:
-                pgn = fetch_lichess(args.user, max_games=max_games)
-                if not pgn.strip():
+                if not from_lichess():
                     print("[WARN] auto: lichess returned empty PGN; fallback to chess.com")
-                    pgn = fetch_chesscom(args.user, max_games=max_games)
+                    from_chesscom()
             except FetchError as e:
                 print(f"[WARN] auto: lichess fetch failed; fallback to chess.com: {e}")
-                pgn = fetch_chesscom(args.user, max_games=max_games)
+                from_chesscom()
 
-        Path(args.out).write_text(pgn, encoding="utf-8")
         print(f"[OK] wrote {args.out}")
 
     elif args.cmd == "analyze":
-        pgn_text = Path(args.pgn).read_text(encoding="utf-8", errors="replace")
+        from pydantic_core import to_json
+
+        from .core.analyze import analyze_pgn_text, write_report_json
+
         raw_t = args.t
         raw_mx = args.max_plies
         player = (args.player or "").strip() or None
-        report = analyze_pgn_text(
-            pgn_text,
+        kw = dict(
             engine_path=args.engine,
             time_per_move=raw_t,
             max_plies=raw_mx,
             player_name=player,
+            workers=max(1, args.workers),
+            adaptive_time=args.adaptive_time,
         )
+        with _open_pgn(args.pgn) as f:
+            if args.out == "-":
+                report = analyze_pgn_text(f, **kw)
+            else:
+                # Stream games into the file as they are analyzed (O(1 game) memory).
+                # Write-then-rename: a failed or interrupted run leaves no
+                # truncated JSON at --out.
+                out_p = Path(args.out)
+                tmp_p = out_p.with_name(f"{out_p.name}.{os.getpid()}.tmp")
+                try:
+                    with open(tmp_p, "wb") as out:
+                        report = write_report_json(out, f, **kw)
+                    os.replace(tmp_p, out_p)
+                except BaseException:
+                    tmp_p.unlink(missing_ok=True)
+                    raise
         if float(report.time_per_move) != float(raw_t):
             print(f"[WARN] --t clamped to {report.time_per_move} (MVP safety limit)")
         if int(report.max_plies) != int(raw_mx):
             print(f"[WARN] --max-plies clamped to {report.max_plies} (MVP safety limit)")
 
         if args.out == "-":
-            # stdout mode (useful for piping)
-            print(report.model_dump_json(indent=2))
+            # stdout mode (useful for piping): write the UTF-8 bytes directly.
+            sys.stdout.flush()
+            sys.stdout.buffer.write(to_json(report, indent=2) + b"\n")
+            sys.stdout.buffer.flush()
         else:
-            Path(args.out).write_text(report.model_dump_json(indent=2), encoding="utf-8")
             print(f"[OK] wrote {args.out}")
 
     elif args.cmd == "pgninfo":
-        pgn_text = Path(args.pgn).read_text(encoding="utf-8", errors="replace")
-        info = pgn_info(pgn_text, max_games=args.max_games)
+        import json
+        from dataclasses import asdict
+
+        from .core.pgn_utils import pgn_info
+
+        with _open_pgn(args.pgn) as f:
+            info = pgn_info(f, max_games=args.max_games, fast=args.fast)
 
         if args.json:
             print(json.dumps(asdict(info), ensure_ascii=False))
-            return
+            return 0
 
         print(
             "[OK] games={g} plies_min={mn} plies_max={mx} plies_avg={avg}".format(
@@ -154,12 +202,21 @@ def main():
         )
 
     elif args.cmd == "selftest":
+        import uuid
+
+        from pydantic_core import to_json
+
+        from .core.analyze import analyze_pgn_text
+        from .core.pgn_utils import pgn_info, preview_games
+        from .core.settings import resolve_engine_path
+
         pgn_path = Path(args.pgn)
-        if not pgn_path.exists():
+        # Read the (small) selftest PGN once; every stage below reuses the text.
+        try:
+            pgn_text = pgn_path.read_bytes().decode("utf-8", errors="replace")
+        except FileNotFoundError:
             raise SystemExit(f"[ERR] PGN not found: {pgn_path}")
 
-        pgn_text = pgn_path.read_text(encoding="utf-8", errors="replace")
-
         # 1) lightweight parse/summary
         info = pgn_info(pgn_text, max_games=50)
         print(
@@ -192,7 +249,7 @@ def main():
                     r = c.post(
                         "/analyze",
                         data={
-                            "pgn_text": pgn_text,
+                            "pgn_text": "\n\n".join(raw_games),
                             "time_per_move": 0.01,
                             "max_plies": 40,
                             "engine_path": args.engine,
@@ -207,8 +264,6 @@ def main():
 
                     # B) Smoke test: online UX path without real network
                     # Seed FETCH_STORE directly then call /analyze with preview_token + game_idx.
-                    import uuid
-
                     token = "selftest_" + uuid.uuid4().hex
                     FETCH_STORE[token] = {"platform": "", "previews": previews, "games": raw_games}
 
@@ -234,23 +289,25 @@ def main():
 
         if args.no_analyze:
             print("[OK] selftest done (no-analyze)")
-            return
+            return 0
 
-        engine_path = Path(args.engine)
-        if not engine_path.exists():
-            print(f"[SKIP] engine not found: {engine_path}")
+        engine_path = resolve_engine_path(args.engine)
+        if engine_path is None:
+            print(f"[SKIP] engine not found: {args.engine}")
             print("[OK] selftest done (pgninfo only)")
-            return
+            return 0
 
         report = analyze_pgn_text(
             pgn_text,
-            engine_path=str(engine_path),
+            engine_path=engine_path,
             time_per_move=args.t,
             max_plies=args.max_plies,
         )
-        Path(args.out).write_text(report.model_dump_json(indent=2), encoding="utf-8")
+        Path(args.out).write_bytes(to_json(report, indent=2))
         print(f"[OK] wrote {args.out}")
 
+    return 0
+
 
 if __name__ == "__main__":
-    main()
+    raise SystemExit(main())
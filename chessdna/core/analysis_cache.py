@@ -0,0 +1,90 @@
+"""On-disk per-game analysis cache (content-addressed).
+
+Analyzing the same game with the same engine binary and settings gives the same
+report, so each single-game AnalyzeReport is stored as JSON under a hash of
+(engine, settings, PGN). This targets workflow repetition (re-selecting
+overlapping games from one preview list); unique games never hit.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+from pydantic_core import to_json
+
+from .analyze import AnalyzeReport
+from .settings import engine_options, eval_multipv, opening_book_path
+
+
+class AnalysisCache:
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(
+        game_pgn: str,
+        *,
+        engine_path: str,
+        time_per_move: float,
+        max_plies: int,
+        player_name: str | None = None,
+    ) -> str | None:
+        """Cache key for one game, or None if the engine binary is missing.
+
+        The binary's size and mtime are part of the key, so upgrading
+        Stockfish invalidates entries; so are the engine options, the MultiPV
+        line count (CHESSDNA_MULTIPV) and the opening book (CHESSDNA_BOOK).
+        """
+        try:
+            st = os.stat(engine_path)
+        except (OSError, ValueError):
+            return None
+
+        h = hashlib.blake2b(digest_size=16)
+        h.update(
+            f"{os.path.abspath(engine_path)}|{st.st_size}|{st.st_mtime_ns}|{sorted(engine_options().items())}"
+            f"|{eval_multipv()}|{time_per_move}|{max_plies}|{player_name or ''}|{opening_book_path() or ''}\n".encode("utf-8")
+        )
+        h.update(game_pgn.strip().encode("utf-8"))
+        return h.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.json"
+
+    def get(self, key: str) -> AnalyzeReport | None:
+        p = self._path(key)
+        try:
+            report = AnalyzeReport.model_validate_json(p.read_bytes())
+        except (OSError, ValueError):
+            return None
+        # Refresh mtime so age-based sweeps drop the least recently used entries.
+        try:
+            os.utime(p)
+        except OSError:
+            pass
+        return report
+
+    def put(self, key: str, report: AnalyzeReport) -> None:
+        """Store a report (best-effort; write-then-rename so readers never see partial JSON).
+
+        Degraded reports (the engine never produced an evaluation, e.g. the
+        binary exists but can't be started) are not stored.
+        """
+        if not any(p.cpl is not None for g in report.games for p in g.plies):
+            return
+        p = self._path(key)
+        # One tmp file per writer thread: concurrent puts of the same key must
+        # not write into each other's file.
+        tmp = p.with_name(f"{p.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            tmp.write_bytes(to_json(report))
+            os.replace(tmp, p)
+        except OSError:
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
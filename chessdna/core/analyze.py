@@ -1,15 +1,69 @@
 from __future__ import annotations
 
+import array
+import functools
+import heapq
+import io
+import itertools
 import math
-from io import StringIO
-from typing import Literal
-from pathlib import Path
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import BinaryIO, Hashable, Iterator, Literal, Sequence, TextIO
 
 import chess
 import chess.pgn
+import chess.polyglot
 from pydantic import BaseModel, Field
+from pydantic_core import to_json
 
+from .pgn_utils import pgn_stream
+from .settings import engine_options, eval_multipv, opening_book_path, resolve_engine_path
 from .uci import UciEngine
+from ..store import LRUStore
+
+
+# Process-wide transposition table for engine searches:
+# (engine scope, movetime_ms, position key) -> (best_cp, bestmove, pv, top lines)
+# for best-move searches, and the same key + (played uci,) -> played_cp for
+# searchmoves searches. A user's games share opening positions, so most early
+# plies of a batch (and of later requests) are a dict lookup instead of an
+# engine search.
+EVAL_CACHE_MAX_ENTRIES = 50_000
+
+EVAL_CACHE: LRUStore = LRUStore(EVAL_CACHE_MAX_ENTRIES)
+
+
+def _eval_cache_scope(engine_path: str) -> tuple | None:
+    """What an evaluation depends on besides the position and movetime: engine
+    binary, start-up options (Hash, tablebases) and MultiPV."""
+    try:
+        st = os.stat(engine_path)
+    except (OSError, ValueError):
+        return None
+    options = tuple(sorted(engine_options().items()))
+    return (os.path.abspath(engine_path), st.st_size, st.st_mtime_ns, options, eval_multipv())
+
+
+# Opt-in adaptive time per move (CLI --adaptive-time): the first plies are
+# (mostly book) opening moves and get a fraction of the budget; tactical plies
+# (in check, captures, checks) get more, since that's where CPL swings.
+ADAPTIVE_OPENING_PLIES = 8
+ADAPTIVE_OPENING_SCALE = 0.3
+ADAPTIVE_TACTICAL_SCALE = 1.5
+
+
+def _adaptive_movetimes(movetime_ms: int, tactical: Sequence[bool]) -> list[int]:
+    """Per-ply movetime for the adaptive profile."""
+    out: list[int] = []
+    for i, sharp in enumerate(tactical):
+        if i < ADAPTIVE_OPENING_PLIES:
+            scale = ADAPTIVE_OPENING_SCALE
+        elif sharp:
+            scale = ADAPTIVE_TACTICAL_SCALE
+        else:
+            scale = 1.0
+        out.append(max(10, int(movetime_ms * scale)))
+    return out
 
 
 class PlyReport(BaseModel):
@@ -35,6 +89,8 @@ class GameReport(BaseModel):
 
     avg_cpl_white: float | None = None
     avg_cpl_black: float | None = None
+    # Mean of the side's per-ply accuracies (as Lichess aggregates them), not
+    # the accuracy of the average CPL: one blunder among good moves costs less.
     accuracy_white: float | None = None
     accuracy_black: float | None = None
 
@@ -44,7 +100,7 @@ class GameReport(BaseModel):
     # If player_name specified, compute per-game stats for that player only.
     player_side: Literal["white", "black"] | None = None
     player_avg_cpl: float | None = None
-    player_accuracy: float | None = None
+    player_accuracy: float | None = None  # mean per-ply accuracy, like accuracy_white/black
 
     player_inaccuracy: int = 0
     player_mistake: int = 0
@@ -58,7 +114,7 @@ class PlayerOverview(BaseModel):
     games_found: int
 
     avg_cpl: float | None = None
-    accuracy: float | None = None
+    accuracy: float | None = None  # mean per-ply accuracy over all games, like player_accuracy
 
     inaccuracy: int = 0
     mistake: int = 0
@@ -73,6 +129,25 @@ class AnalyzeReport(BaseModel):
     player_name: str | None = None
     player_overview: PlayerOverview | None = None
 
+    @classmethod
+    def merge(cls, reports: Sequence[AnalyzeReport]) -> AnalyzeReport:
+        """Concatenate reports produced with the same settings (e.g. one per game).
+
+        Games keep their order; the player overview is recomputed over all games.
+        """
+        if not reports:
+            raise ValueError("nothing to merge")
+        first = reports[0]
+        games = [g for r in reports for g in r.games]
+        return cls(
+            games=games,
+            engine_path=first.engine_path,
+            time_per_move=first.time_per_move,
+            max_plies=first.max_plies,
+            player_name=first.player_name,
+            player_overview=_player_overview(games, first.player_name) if first.player_name else None,
+        )
+
 
 def _cpl_label(cpl: int) -> str:
     if cpl >= 300:
@@ -84,22 +159,329 @@ def _cpl_label(cpl: int) -> str:
     return "ok"
 
 
-def _lichess_accuracy_from_cpl(cpl: float) -> float:
+def _accuracy_formula(cpl: float) -> float:
     # Commonly used approximation of Lichess accuracy mapping.
     # accuracy = 103.1668 * exp(-0.04354*cpl) - 3.1669
     a = 103.1668 * math.exp(-0.04354 * max(0.0, cpl)) - 3.1669
     return float(max(0.0, min(100.0, a)))
 
 
-def analyze_pgn_text(
-    pgn_text: str,
+# Per-ply CPL is an integer and the formula clamps to 0 from ~80 CPL on, so a
+# small table covers it (bit-identical to calling the formula).
+_ACC_LUT_SIZE = 128
+_ACC_LUT = array.array("d", [_accuracy_formula(i) for i in range(_ACC_LUT_SIZE)])
+
+
+def _lichess_accuracy_from_cpl(cpl: float) -> float:
+    if type(cpl) is int:
+        if cpl <= 0:
+            return _ACC_LUT[0]
+        return _ACC_LUT[cpl] if cpl < _ACC_LUT_SIZE else 0.0
+    # Fractional averages (a few per game): exact formula.
+    return _accuracy_formula(cpl)
+
+
+# (accuracy, label) per integer CPL up to the blunder threshold: the per-ply
+# post-processing is a single table lookup. Everything from 300 CPL on is (0, blunder).
+_PLY_METRICS = tuple((_lichess_accuracy_from_cpl(i), _cpl_label(i)) for i in range(301))
+
+
+def _ply_metrics(cpl: int) -> tuple[float, str]:
+    """(accuracy, label) for one ply's CPL (>= 0)."""
+    return _PLY_METRICS[cpl] if cpl < 300 else _PLY_METRICS[300]
+
+
+# Label -> counter slot, so per-side label counts are one indexed increment.
+_LABEL_SLOT = {"ok": 0, "inaccuracy": 1, "mistake": 2, "blunder": 3}
+
+
+class _OverviewTally:
+    """Running player stats over games (the games themselves need not be kept)."""
+
+    def __init__(self, player_name: str):
+        self.player_name = player_name
+        self.games_total = 0
+        self.games_found = 0
+        self.cpl_sum = 0
+        self.cpl_n = 0
+        self.acc_sum = 0.0
+        self.acc_n = 0
+        self.inacc = self.mis = self.blun = 0
+
+    def add(self, g: GameReport) -> None:
+        self.games_total += 1
+        if g.player_side is None:
+            return
+        self.games_found += 1
+        for p in g.plies:
+            if p.side == g.player_side and p.cpl is not None:
+                self.cpl_sum += int(p.cpl)
+                self.cpl_n += 1
+                if p.accuracy is not None:
+                    self.acc_sum += p.accuracy
+                    self.acc_n += 1
+        self.inacc += g.player_inaccuracy
+        self.mis += g.player_mistake
+        self.blun += g.player_blunder
+
+    def overview(self) -> PlayerOverview:
+        avg = (self.cpl_sum / self.cpl_n) if self.cpl_n else None
+        # Same definition as GameReport.player_accuracy (mean per-ply accuracy),
+        # pooled over all the player's evaluated plies.
+        acc = (self.acc_sum / self.acc_n) if self.acc_n else None
+        return PlayerOverview(
+            player_name=self.player_name,
+            games_total=self.games_total,
+            games_found=self.games_found,
+            avg_cpl=avg,
+            accuracy=acc,
+            inaccuracy=self.inacc,
+            mistake=self.mis,
+            blunder=self.blun,
+        )
+
+
+def _player_overview(games: Sequence[GameReport], player_name: str) -> PlayerOverview:
+    """Aggregate the per-game player stats (games where player_side was found)."""
+    tally = _OverviewTally(player_name)
+    for g in games:
+        tally.add(g)
+    return tally.overview()
+
+
+def _position_key(board: chess.Board) -> int:
+    """64-bit key of a position for EVAL_CACHE: pieces, side to move, castling
+    rights and a capturable en passant square.
+
+    The public Polyglot Zobrist hash (also what the opening book looks up), so
+    it does not depend on python-chess internals.
+    """
+    return chess.polyglot.zobrist_hash(board)
+
+
+# Book moves are only trusted this early; later "book" hits are usually
+# transpositions into lines the book author never meant to cover.
+BOOK_MAX_PLIES = 10
+
+
+@functools.cache
+def _open_book(path: str) -> chess.polyglot.MemoryMappedReader | None:
+    """Open a Polyglot book once per process (None if unreadable)."""
+    try:
+        return chess.polyglot.open_reader(path)
+    except (OSError, ValueError):
+        return None
+
+
+def _in_book(book: chess.polyglot.MemoryMappedReader, board: chess.Board, move: chess.Move) -> bool:
+    return any(entry.move == move for entry in book.find_all(board))
+
+
+def _only_move(board: chess.Board) -> bool:
+    """True if the side to move has exactly one legal move (stops at the second)."""
+    it = board.generate_legal_moves()
+    next(it, None)
+    return next(it, None) is None
+
+
+class _MainlineVisitor(chess.pgn.BaseVisitor):
+    """read_game() visitor collecting what analysis needs: headers + the first
+    `max_plies` mainline moves as (side, san, uci), and optionally each ply's
+    position key (see _position_key), whether it is tactical (for adaptive
+    time) and whether it needs no search: the played move was the only legal
+    one, or (with `book`) a book move within the first BOOK_MAX_PLIES plies.
+
+    With san=False, SAN is left empty and the Move objects are kept instead, so
+    the caller can generate SAN later (see _san_list). Variations are skipped;
+    comments and NAGs are ignored.
+    """
+
+    def __init__(
+        self,
+        max_plies: int,
+        *,
+        keys: bool = False,
+        san: bool = True,
+        tactical: bool = False,
+        forced: bool = False,
+        book: chess.polyglot.MemoryMappedReader | None = None,
+    ):
+        self.max_plies = max_plies
+        self.keys = keys
+        self.san = san
+        self.tactical = tactical
+        self.forced = forced
+        self.book = book
+
+    def begin_game(self) -> None:
+        self.headers = chess.pgn.Headers()  # Seven Tag Roster defaults, like read_game()
+        self.steps: list[tuple[str, str, str]] = []
+        self.hashes: list[int] = []
+        self.moves: list[chess.Move] = []
+        self.sharp: list[bool] = []
+        self.only: list[bool] = []
+
+    def visit_header(self, tagname: str, tagvalue: str) -> None:
+        self.headers[tagname] = tagvalue
+
+    def begin_variation(self):
+        return chess.pgn.SKIP
+
+    def visit_move(self, board: chess.Board, move: chess.Move) -> None:
+        ply = len(self.steps)
+        if ply >= self.max_plies:
+            return
+        side = "white" if board.turn == chess.WHITE else "black"
+        if self.san:
+            self.steps.append((side, board.san(move), move.uci()))
+        else:
+            self.steps.append((side, "", move.uci()))
+            self.moves.append(move)
+        if self.keys:
+            self.hashes.append(_position_key(board))
+        if self.tactical:
+            self.sharp.append(board.is_check() or board.is_capture(move) or board.gives_check(move))
+        if self.forced:
+            self.only.append(
+                _only_move(board)
+                or (self.book is not None and ply < BOOK_MAX_PLIES and _in_book(self.book, board, move))
+            )
+
+    def handle_error(self, error: Exception) -> None:
+        # Like the default GameBuilder: keep what was parsed (moves after an
+        # illegal/ambiguous one are dropped by read_game).
+        pass
+
+    def result(
+        self,
+    ) -> tuple[chess.pgn.Headers, list[tuple[str, str, str]], list[int], list[chess.Move], list[bool], list[bool]]:
+        return self.headers, self.steps, self.hashes, self.moves, self.sharp, self.only
+
+
+# Python-side preparation that overlaps the engine searches: SAN generation
+# (legal-move disambiguation, check/mate suffix; about half of the Python cost
+# per ply) and parsing the next game. Threads block on nothing but the GIL,
+# which the searching threads release while waiting on engine output.
+_PREP_EXECUTOR = ThreadPoolExecutor(max_workers=max(4, os.cpu_count() or 1), thread_name_prefix="chessdna-prep")
+
+
+def _san_list(board: chess.Board, moves: Sequence[chess.Move]) -> list[str]:
+    """SAN of `moves` played in order from `board` (modified in place)."""
+    sans: list[str] = []
+    for move in moves:
+        sans.append(board.san_and_push(move))
+    return sans
+
+
+def _eval_plies(
+    engines: Sequence[UciEngine],
+    moves_uci: list[str],
     *,
-    engine_path: str,
-    time_per_move: float = 0.05,
-    max_plies: int = 200,
-    player_name: str | None = None,
-) -> AnalyzeReport:
-    # Server-side guardrails (MVP stability): clamp potentially expensive knobs.
+    movetime_ms: int | Sequence[int],
+    cache_keys: Sequence[Hashable] | None = None,
+    forced: Sequence[bool] | None = None,
+    executor: ThreadPoolExecutor | None = None,
+) -> list[tuple[int, str, list[str], int]]:
+    """Evaluate every ply of one game: (best_cp, bestmove, pv, played_cp) per ply.
+
+    Each ply is an independent search (position = the moves before it), so with
+    several engines the plies are spread over one thread per engine. Engines stay
+    single-threaded (Stockfish default Threads=1): N engines x 1 thread beats one
+    engine x N threads for many short searches. Pass `executor` (at least one
+    thread per engine) to reuse threads across games.
+
+    `movetime_ms` is one value for every ply or a per-ply list. With
+    `cache_keys` (one per ply), best-move searches go through EVAL_CACHE.
+
+    `forced` marks plies that need no search (only legal move, or a book
+    move): CPL is 0, and the eval is the negated eval of the next position
+    (searched anyway), so no engine call is made for them unless it is the
+    last ply.
+    """
+
+    # Position before each ply = a prefix of the space-joined game: keep one
+    # string plus end offsets (O(N) memory) and slice on demand, instead of
+    # N strings of growing length or a per-ply list slice + join.
+    joined = " ".join(moves_uci)
+    ends = [0]
+    for uci in moves_uci[:-1]:
+        ends.append(ends[-1] + len(uci) + (1 if ends[-1] else 0))
+
+    n = len(moves_uci)
+    skip = [bool(forced and forced[i]) and i + 1 < n for i in range(n)]
+    # Top lines scored per best-move search (read per call, like the cache keys).
+    # A played move among them needs no separate searchmoves search.
+    multipv = eval_multipv()
+
+    def eval_one(engine: UciEngine, i: int) -> tuple[int, str, list[str], int] | None:
+        if skip[i]:
+            return None
+        before = joined[: ends[i]]
+        mt = movetime_ms if isinstance(movetime_ms, int) else movetime_ms[i]
+        key = cache_keys[i] if cache_keys is not None else None
+        hit = EVAL_CACHE.get(key) if key is not None else None
+        if hit is not None:
+            best_cp, bestmove, pv_t, top = hit
+            pv = list(pv_t)
+        else:
+            # Best eval at current position from side-to-move perspective, plus
+            # the scores of the runner-up moves (MultiPV).
+            best_cp, bestmove, pv, top = engine.eval_position_multipv(
+                before, movetime_ms=mt, multipv=multipv
+            )
+            if key is not None:
+                EVAL_CACHE[key] = (best_cp, bestmove, tuple(pv), top)
+        played = moves_uci[i]
+        if played == bestmove:
+            # Played the engine's choice: its eval is the best eval (CPL 0), no second search.
+            return best_cp, bestmove, pv, best_cp
+        if played in top:
+            # Played move was one of the engine's top lines: already scored.
+            return best_cp, bestmove, pv, top[played]
+        played_key = (*key, played) if key is not None else None
+        played_cp = EVAL_CACHE.get(played_key) if played_key is not None else None
+        if played_cp is None:
+            # Played-move eval in the SAME position (avoid perspective flip issues)
+            played_cp, _played_bestmove, _played_pv = engine.eval_position(
+                before,
+                movetime_ms=mt,
+                searchmoves=[played],
+            )
+            if played_key is not None:
+                EVAL_CACHE[played_key] = played_cp
+        return best_cp, bestmove, pv, played_cp
+
+    results: list[tuple[int, str, list[str], int] | None]
+    if len(engines) == 1 or n <= 1:
+        results = [eval_one(engines[0], i) for i in range(n)]
+    else:
+        results = [None] * n
+        next_idx = itertools.count()
+
+        def worker(engine: UciEngine) -> None:
+            while (i := next(next_idx)) < n:
+                results[i] = eval_one(engine, i)
+
+        if executor is not None:
+            for f in [executor.submit(worker, e) for e in engines]:
+                f.result()
+        else:
+            with ThreadPoolExecutor(max_workers=len(engines), thread_name_prefix="chessdna-eval") as ex:
+                for f in [ex.submit(worker, e) for e in engines]:
+                    f.result()
+
+    # Forced / book plies, back to front so runs of them chain.
+    for i in range(n - 1, -1, -1):
+        if skip[i]:
+            next_cp, _next_best, next_pv, _next_played = results[i + 1]  # type: ignore[misc]
+            played = moves_uci[i]
+            results[i] = (-next_cp, played, [played, *next_pv], -next_cp)
+
+    return results  # type: ignore[return-value]
+
+
+def _clamp_settings(time_per_move: float, max_plies: int) -> tuple[float, int]:
+    """Server-side guardrails (MVP stability): clamp potentially expensive knobs."""
     try:
         time_per_move = float(time_per_move)
     except Exception:
@@ -111,61 +493,173 @@ def analyze_pgn_text(
     except Exception:
         max_plies = 200
     max_plies = max(10, min(max_plies, 800))
+    return time_per_move, max_plies
 
-    pgn_io = StringIO(pgn_text)
 
-    games: list[GameReport] = []
+def analyze_pgn_text(
+    pgn_text: str | TextIO,
+    *,
+    engine_path: str,
+    time_per_move: float = 0.05,
+    max_plies: int = 200,
+    player_name: str | None = None,
+    engine: UciEngine | None = None,
+    extra_engines: Sequence[UciEngine] = (),
+    workers: int = 1,
+    adaptive_time: bool = False,
+) -> AnalyzeReport:
+    """Analyze every game in `pgn_text` (PGN text, or an open text file read game by game).
+
+    If `engine` is given (e.g. borrowed from an EnginePool) it is used as-is and
+    left running; otherwise an engine is spawned from `engine_path` for this
+    call and quit afterwards, plus `workers - 1` more so up to `workers` cores
+    search at once (CLI). `extra_engines` (caller-owned) are used alongside to
+    evaluate positions in parallel.
+
+    adaptive_time=True spends less time on opening plies and more on tactical
+    ones instead of a fixed `time_per_move` (see _adaptive_movetimes).
+    """
+    time_per_move, max_plies = _clamp_settings(time_per_move, max_plies)
+    games = list(
+        analyze_pgn_iter(
+            pgn_text,
+            engine_path=engine_path,
+            time_per_move=time_per_move,
+            max_plies=max_plies,
+            player_name=player_name,
+            engine=engine,
+            extra_engines=extra_engines,
+            workers=workers,
+            adaptive_time=adaptive_time,
+        )
+    )
+    return AnalyzeReport.model_construct(
+        games=games,
+        engine_path=engine_path,
+        time_per_move=time_per_move,
+        max_plies=max_plies,
+        player_name=player_name,
+        player_overview=_player_overview(games, player_name) if player_name else None,
+    )
+
 
-    engine: UciEngine | None = None
+def analyze_pgn_iter(
+    pgn_text: str | TextIO,
+    *,
+    engine_path: str,
+    time_per_move: float = 0.05,
+    max_plies: int = 200,
+    player_name: str | None = None,
+    engine: UciEngine | None = None,
+    extra_engines: Sequence[UciEngine] = (),
+    workers: int = 1,
+    adaptive_time: bool = False,
+) -> Iterator[GameReport]:
+    """Like analyze_pgn_text, but yield each GameReport as soon as it is analyzed.
+
+    Only the current game is held in memory. Engines owned by this call are
+    quit when the generator finishes or is closed.
+    """
+    time_per_move, max_plies = _clamp_settings(time_per_move, max_plies)
+
+    pgn_io = pgn_stream(pgn_text) or io.StringIO()
+
+    owns_engine = engine is None
     # If Stockfish (or other UCI engine) is not available, degrade gracefully:
     # still parse PGN + SAN/ply list so Web/CLI can run without hard dependency.
-    try:
-        if engine_path and Path(engine_path).is_file():
-            engine = UciEngine(engine_path)
-    except Exception:
-        engine = None
+    owned_extra: list[UciEngine] = []
+    if owns_engine:
+        try:
+            if resolve_engine_path(engine_path):
+                engine = UciEngine(engine_path)
+        except Exception:
+            engine = None
+        # Best-effort: fewer workers if some engines fail to start.
+        while engine is not None and len(owned_extra) < int(workers) - 1:
+            try:
+                owned_extra.append(UciEngine(engine_path))
+            except Exception:
+                break
+
+    engines: list[UciEngine] = [engine, *owned_extra, *extra_engines] if engine is not None else []
+    movetime_ms = max(10, int(time_per_move * 1000))
+    cache_scope = _eval_cache_scope(engines[0].path) if engines else None
+    # One engine thread each, kept for the whole run rather than per game.
+    eval_pool = (
+        ThreadPoolExecutor(max_workers=len(engines), thread_name_prefix="chessdna-eval")
+        if len(engines) > 1
+        else None
+    )
 
-    # Cross-game player aggregates
-    agg_cpls: list[int] = []
-    agg_inacc = agg_mis = agg_blun = 0
-    games_total = 0
-    games_found = 0
+    book_path = opening_book_path() if engines else None
+    book = _open_book(book_path) if book_path else None
+
+    def read_next():
+        # Mainline only: variations are skipped and no GameNode tree is built.
+        # With an engine, SAN is left out of the parse and generated in a
+        # worker thread while the engines search (hidden behind engine time).
+        return chess.pgn.read_game(
+            pgn_io,
+            Visitor=lambda: _MainlineVisitor(
+                max_plies,
+                keys=cache_scope is not None,
+                san=not engines,
+                tactical=adaptive_time and bool(engines),
+                forced=bool(engines),
+                book=book,
+            ),
+        )
 
+    # With engines, the next game is parsed in the background while the
+    # current one is searched, so the engines don't idle during PGN parsing.
+    ahead: Future | None = None
     try:
         while True:
-            game = chess.pgn.read_game(pgn_io)
-            if game is None:
+            parsed = ahead.result() if ahead is not None else read_next()
+            ahead = None
+            if parsed is None:
                 break
+            if engines:
+                ahead = _PREP_EXECUTOR.submit(read_next)
+            game_headers, steps, hashes, moves, sharp, forced = parsed
+            ply_times = _adaptive_movetimes(movetime_ms, sharp) if adaptive_time else [movetime_ms] * len(steps)
 
-            board = game.board()
             plies: list[PlyReport] = []
-            moves_so_far: list[str] = []
-
-            ply_idx = 0
-            for move in game.mainline_moves():
-                if ply_idx >= max_plies:
-                    break
-
-                side = "white" if board.turn == chess.WHITE else "black"
-                movetime_ms = max(10, int(time_per_move * 1000))
-
-                san = board.san(move)
-                uci = move.uci()
-
-                if engine is not None:
-                    # Best eval at current position from side-to-move perspective
-                    best_cp, bestmove, pv = engine.eval_position(moves_so_far, movetime_ms=movetime_ms)
-
-                    # Played-move eval in the SAME position (avoid perspective flip issues)
-                    played_cp, _played_bestmove, _played_pv = engine.eval_position(
-                        moves_so_far,
-                        movetime_ms=movetime_ms,
-                        searchmoves=[uci],
-                    )
+            cache_keys: list[Hashable] | None = (
+                [(cache_scope, mt, h) for mt, h in zip(ply_times, hashes)] if cache_scope is not None else None
+            )
 
+            moves_uci = [uci for _side, _san, uci in steps]
+            evals = []
+            if engines:
+                sans = _PREP_EXECUTOR.submit(_san_list, game_headers.board(), moves)
+                evals = _eval_plies(
+                    engines,
+                    moves_uci,
+                    movetime_ms=ply_times,
+                    cache_keys=cache_keys,
+                    forced=forced,
+                    executor=eval_pool,
+                )
+                steps = [(side, san, uci) for (side, _san, uci), san in zip(steps, sans.result())]
+
+            # Per-side tallies ([white, black]) accumulated while the plies are
+            # built, so the game totals need no further passes over `plies`.
+            cpl_sum = [0, 0]
+            acc_sum = [0.0, 0.0]
+            n_eval = [0, 0]
+            n_label = [[0, 0, 0, 0], [0, 0, 0, 0]]  # per side, by _LABEL_SLOT
+
+            for ply_idx, (side, san, uci) in enumerate(steps):
+                if evals:
+                    best_cp, bestmove, pv, played_cp = evals[ply_idx]
                     cpl = max(0, best_cp - played_cp)
-                    acc = _lichess_accuracy_from_cpl(cpl)
-                    label = _cpl_label(cpl)
+                    acc, label = _ply_metrics(cpl)
+                    si = 0 if side == "white" else 1
+                    cpl_sum[si] += cpl
+                    acc_sum[si] += acc
+                    n_eval[si] += 1
+                    n_label[si][_LABEL_SLOT[label]] += 1
                 else:
                     best_cp = None
                     bestmove = None
@@ -175,12 +669,9 @@ def analyze_pgn_text(
                     acc = None
                     label = "ok"
 
-                # Now advance the game state
-                board.push(move)
-                moves_so_far.append(uci)
-
+                # Values are produced here with the right types: skip validation.
                 plies.append(
-                    PlyReport(
+                    PlyReport.model_construct(
                         ply=ply_idx + 1,
                         san=san,
                         uci=uci,
@@ -189,31 +680,21 @@ def analyze_pgn_text(
                         played_cp=played_cp,
                         cpl=cpl,
                         accuracy=acc,
-                        label=label,  # type: ignore[arg-type]
+                        label=label,
                         bestmove_uci=bestmove,
                         pv_uci=pv,
                     )
                 )
 
-                ply_idx += 1
-
-            cpls_w = [p.cpl for p in plies if p.side == "white" and p.cpl is not None]
-            cpls_b = [p.cpl for p in plies if p.side == "black" and p.cpl is not None]
-            avg_w = sum(cpls_w) / len(cpls_w) if cpls_w else None
-            avg_b = sum(cpls_b) / len(cpls_b) if cpls_b else None
-
-            acc_w = _lichess_accuracy_from_cpl(avg_w) if avg_w is not None else None
-            acc_b = _lichess_accuracy_from_cpl(avg_b) if avg_b is not None else None
+            avg_cpl = [cpl_sum[i] / n_eval[i] if n_eval[i] else None for i in (0, 1)]
+            # Mean per-ply accuracy (see GameReport.accuracy_white).
+            avg_acc = [acc_sum[i] / n_eval[i] if n_eval[i] else None for i in (0, 1)]
 
             # Turning points: top 5 CPL moves (any side)
-            tp = sorted(
-                [p for p in plies if p.cpl is not None],
-                key=lambda x: x.cpl,
-                reverse=True,
-            )[:5]
+            tp = heapq.nlargest(5, (p for p in plies if p.cpl is not None), key=lambda x: x.cpl)
             turning_points = [p.ply for p in tp if (p.cpl or 0) > 0]
 
-            headers = dict(game.headers)
+            headers = dict(game_headers)
 
             # Player-specific stats (optional)
             p_side = None
@@ -231,68 +712,94 @@ def analyze_pgn_text(
                     p_side = "black"
 
                 if p_side:
-                    games_found += 1
-                    p_plies = [p for p in plies if p.side == p_side and p.cpl is not None]
-                    p_cpls = [p.cpl for p in p_plies if p.cpl is not None]
-                    p_avg = sum(p_cpls) / len(p_cpls) if p_cpls else None
-                    p_acc = _lichess_accuracy_from_cpl(p_avg) if p_avg is not None else None
-
-                    p_inacc = sum(1 for p in p_plies if p.label == "inaccuracy")
-                    p_mis = sum(1 for p in p_plies if p.label == "mistake")
-                    p_blun = sum(1 for p in p_plies if p.label == "blunder")
-
-                    p_worst = [p.ply for p in sorted(p_plies, key=lambda x: x.cpl, reverse=True)[:5] if (p.cpl or 0) > 0]
-
-                    # aggregates
-                    agg_cpls.extend([int(x) for x in p_cpls])
-                    agg_inacc += p_inacc
-                    agg_mis += p_mis
-                    agg_blun += p_blun
-
-            games_total += 1
-            games.append(
-                GameReport(
-                    headers=headers,
-                    plies=plies,
-                    avg_cpl_white=avg_w,
-                    avg_cpl_black=avg_b,
-                    accuracy_white=acc_w,
-                    accuracy_black=acc_b,
-                    turning_points=turning_points,
-                    player_side=p_side,
-                    player_avg_cpl=p_avg,
-                    player_accuracy=p_acc,
-                    player_inaccuracy=p_inacc,
-                    player_mistake=p_mis,
-                    player_blunder=p_blun,
-                    player_worst=p_worst,
-                )
+                    si = 0 if p_side == "white" else 1
+                    p_avg = avg_cpl[si]
+                    p_acc = avg_acc[si]
+                    _ok, p_inacc, p_mis, p_blun = n_label[si]
+                    p_plies = (p for p in plies if p.side == p_side and p.cpl is not None)
+                    p_worst = [p.ply for p in heapq.nlargest(5, p_plies, key=lambda x: x.cpl) if (p.cpl or 0) > 0]
+
+            yield GameReport.model_construct(
+                headers=headers,
+                plies=plies,
+                avg_cpl_white=avg_cpl[0],
+                avg_cpl_black=avg_cpl[1],
+                accuracy_white=avg_acc[0],
+                accuracy_black=avg_acc[1],
+                turning_points=turning_points,
+                player_side=p_side,
+                player_avg_cpl=p_avg,
+                player_accuracy=p_acc,
+                player_inaccuracy=p_inacc,
+                player_mistake=p_mis,
+                player_blunder=p_blun,
+                player_worst=p_worst,
             )
 
     finally:
-        if engine is not None:
+        if ahead is not None:
+            # Generator closed early: let the read-ahead finish before the
+            # caller closes the PGN file under it.
+            try:
+                ahead.result()
+            except Exception:
+                pass
+        if eval_pool is not None:
+            eval_pool.shutdown(wait=True)
+        if owns_engine and engine is not None:
             engine.quit()
+        for e in owned_extra:
+            e.quit()
 
-    overview = None
-    if player_name:
-        avg = (sum(agg_cpls) / len(agg_cpls)) if agg_cpls else None
-        acc = _lichess_accuracy_from_cpl(avg) if avg is not None else None
-        overview = PlayerOverview(
-            player_name=player_name,
-            games_total=games_total,
-            games_found=games_found,
-            avg_cpl=avg,
-            accuracy=acc,
-            inaccuracy=agg_inacc,
-            mistake=agg_mis,
-            blunder=agg_blun,
-        )
 
-    return AnalyzeReport(
-        games=games,
+def write_report_json(
+    out: BinaryIO,
+    pgn_text: str | TextIO,
+    *,
+    engine_path: str,
+    time_per_move: float = 0.05,
+    max_plies: int = 200,
+    player_name: str | None = None,
+    workers: int = 1,
+    adaptive_time: bool = False,
+) -> AnalyzeReport:
+    """Analyze and write the report JSON to `out` one game at a time.
+
+    The bytes equal `to_json(analyze_pgn_text(...), indent=2)`, but only one
+    GameReport is in memory at a time (large PGN dumps). Returns the report
+    without its games (settings as clamped + player overview). If it raises,
+    `out` holds partial JSON: point it at a tmp file and rename on success.
+    """
+    time_per_move, max_plies = _clamp_settings(time_per_move, max_plies)
+    tally = _OverviewTally(player_name) if player_name else None
+
+    out.write(b'{\n  "games": [')
+    n = 0
+    for g in analyze_pgn_iter(
+        pgn_text,
+        engine_path=engine_path,
+        time_per_move=time_per_move,
+        max_plies=max_plies,
+        player_name=player_name,
+        workers=workers,
+        adaptive_time=adaptive_time,
+    ):
+        # Nest the game one level deeper (JSON strings never contain raw newlines).
+        out.write(b",\n    " if n else b"\n    ")
+        out.write(to_json(g, indent=2).replace(b"\n", b"\n    "))
+        n += 1
+        if tally is not None:
+            tally.add(g)
+
+    shell = AnalyzeReport(
+        games=[],
         engine_path=engine_path,
         time_per_move=time_per_move,
         max_plies=max_plies,
         player_name=player_name,
-        player_overview=overview,
+        player_overview=tally.overview() if tally is not None else None,
     )
+    # Everything after the (empty) games list of the shell report.
+    rest = to_json(shell, indent=2).split(b'"games": []', 1)[1]
+    out.write(b"\n  ]" + rest if n else b"]" + rest)
+    return shell
@@ -1,39 +1,81 @@
 from __future__ import annotations
 
+import math
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Any
 
 from .http import get_json
+from .http_cache import cached_get_json
+
+# Monthly archives fetched concurrently per round (they are independent GETs).
+MONTH_FETCH_WORKERS = 8
+# Rough games per archive month, used to guess how many months to ask for up front.
+GAMES_PER_MONTH_GUESS = 30
+
+
+def _get_month(url: str) -> Any:
+    # Past months never change: served from the on-disk cache after the first fetch.
+    return cached_get_json(url, headers={"User-Agent": "ChessDNA/0.1"}, max_retries=3)
+
+
+def _current_month_url(u: str, *, now: float | None = None) -> str:
+    t = time.gmtime(time.time() if now is None else now)
+    return f"https://api.chess.com/pub/player/{u}/games/{t.tm_year}/{t.tm_mon:02d}"
 
 
 def fetch_user_games_pgn(username: str, *, max_games: int = 50) -> str:
     """Fetch recent games from chess.com PubAPI and return concatenated PGN.
 
     Uses archives endpoint to discover monthly archives, then pulls games and
-    concatenates their 'pgn' fields.
+    concatenates their 'pgn' fields. Months are fetched a few at a time in
+    parallel (newest first), only as many rounds as needed for `max_games`.
+
+    The current month is usually the newest archive, so its download starts
+    alongside the archives request instead of waiting for it.
     """
     u = username.lower()
     archives_url = f"https://api.chess.com/pub/player/{u}/games/archives"
-    data: Any = get_json(archives_url, headers={"User-Agent": "ChessDNA/0.1"}, max_retries=3)
-    archives: list[str] = list(data.get("archives", []))
-    if not archives:
-        return ""
+    pgns: list[str] = []
+    with ThreadPoolExecutor(max_workers=MONTH_FETCH_WORKERS, thread_name_prefix="chessdna-chesscom") as ex:
+        cur_url = _current_month_url(u)
+        cur: Future | None = ex.submit(_get_month, cur_url)
 
-    # newest first
-    archives = list(reversed(archives))
+        data: Any = get_json(archives_url, headers={"User-Agent": "ChessDNA/0.1"}, max_retries=3)
+        archives: list[str] = list(data.get("archives", []))
+        if not archives:
+            return ""
 
-    pgns: list[str] = []
-    for a in archives:
-        if len(pgns) >= max_games:
-            break
-        month: Any = get_json(a, headers={"User-Agent": "ChessDNA/0.1"}, max_retries=3)
-        games = month.get("games", [])
-        # Sort newest-first by end_time when available.
-        games = sorted(games, key=lambda g: g.get("end_time", 0), reverse=True)
-        for g in games:
-            if len(pgns) >= max_games:
-                break
-            p = g.get("pgn")
-            if p:
-                pgns.append(p.strip())
+        # newest first
+        archives = list(reversed(archives))
+
+        # First round: enough months for max_games at a typical pace (+1 slack);
+        # later rounds (inactive users) take a full batch each.
+        batch = min(MONTH_FETCH_WORKERS, math.ceil(max_games / GAMES_PER_MONTH_GUESS) + 1)
+        pos = 0
+        while pos < len(archives) and len(pgns) < max_games:
+            urls = archives[pos : pos + batch]
+            pos += len(urls)
+            batch = MONTH_FETCH_WORKERS
+            futs: list[Future] = []
+            for url in urls:
+                if cur is not None and url == cur_url and cur.exception() is None:
+                    futs.append(cur)
+                else:
+                    futs.append(ex.submit(_get_month, url))
+            # Archive order is kept; a failed month raises when reached.
+            for fut in futs:
+                month = fut.result()
+                if len(pgns) >= max_games:
+                    break
+                games = month.get("games", [])
+                # Sort newest-first by end_time when available.
+                games = sorted(games, key=lambda g: g.get("end_time", 0), reverse=True)
+                for g in games:
+                    if len(pgns) >= max_games:
+                        break
+                    p = g.get("pgn")
+                    if p:
+                        pgns.append(p.strip())
 
     return "\n\n".join(pgns) + ("\n" if pgns else "")
@@ -0,0 +1,156 @@
+"""Bounded pool of warm UCI engine processes.
+
+Spawning Stockfish (hash allocation, NNUE load) costs hundreds of ms, which
+dominates short analyses. The web app borrows an engine per request from a
+per-binary pool instead of spawning one each time.
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import threading
+import time
+
+from .uci import UciEngine
+
+
+class EnginePool:
+    """Up to `size` UciEngine processes for one engine binary, spawned lazily."""
+
+    def __init__(self, engine_path: str, *, size: int | None = None):
+        self.engine_path = engine_path
+        self.size = max(1, int(size or os.cpu_count() or 1))
+        self._idle: queue.Queue[UciEngine] = queue.Queue(maxsize=self.size)
+        self._lock = threading.Lock()
+        # Signalled whenever an engine goes idle or a slot frees up (broken
+        # or failed engines), so waiters re-check instead of blocking on
+        # the idle queue alone.
+        self._cond = threading.Condition(self._lock)
+        self._created = 0
+        self._closed = False
+
+    def _forget(self) -> None:
+        """Give back one slot (engine quit or never started) and wake a waiter."""
+        with self._cond:
+            self._created -= 1
+            self._cond.notify()
+
+    def acquire(self, *, timeout: float | None = None) -> UciEngine:
+        """Borrow an engine; spawns one if below capacity, otherwise waits.
+
+        Raises queue.Empty if nothing became available within `timeout`.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                try:
+                    return self._idle.get_nowait()
+                except queue.Empty:
+                    pass
+                if self._created < self.size:
+                    self._created += 1
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise queue.Empty
+                self._cond.wait(remaining)
+
+        try:
+            return UciEngine(self.engine_path)
+        except Exception:
+            self._forget()
+            raise
+
+    def try_acquire(self) -> UciEngine | None:
+        """Borrow an engine only if one is idle or can be spawned right away."""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._created >= self.size:
+                return None
+            self._created += 1
+
+        try:
+            return UciEngine(self.engine_path)
+        except Exception:
+            self._forget()
+            return None
+
+    def warm(self, n: int = 1) -> int:
+        """Spawn up to `n` idle engines ahead of the first request (best-effort).
+
+        Returns how many were started; the pool's capacity is never exceeded.
+        """
+        started = 0
+        for _ in range(max(0, int(n))):
+            with self._lock:
+                if self._closed or self._created >= self.size:
+                    break
+                self._created += 1
+            try:
+                engine = UciEngine(self.engine_path)
+            except Exception:
+                self._forget()
+                break
+            with self._cond:
+                self._idle.put_nowait(engine)
+                self._cond.notify()
+            started += 1
+        return started
+
+    def release(self, engine: UciEngine, *, broken: bool = False) -> None:
+        """Return a borrowed engine; it is reset with `ucinewgame` before reuse."""
+        if not broken and not self._closed:
+            try:
+                engine.new_game()
+            except Exception:
+                broken = True
+
+        if broken or self._closed:
+            try:
+                engine.quit()
+            finally:
+                self._forget()
+            return
+
+        with self._cond:
+            self._idle.put_nowait(engine)
+            self._cond.notify()
+
+    def close(self) -> None:
+        """Quit idle engines (engines still borrowed are quit on release)."""
+        self._closed = True
+        while True:
+            try:
+                engine = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                engine.quit()
+            finally:
+                self._forget()
+
+
+_POOLS: dict[str, EnginePool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def get_pool(engine_path: str) -> EnginePool:
+    """Return the shared pool for an engine binary (created on first use)."""
+    with _POOLS_LOCK:
+        pool = _POOLS.get(engine_path)
+        if pool is None:
+            pool = _POOLS[engine_path] = EnginePool(engine_path)
+        return pool
+
+
+def close_pools() -> None:
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        pool.close()
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
 import time
+from collections.abc import Mapping
+from email.utils import parsedate_to_datetime
+from types import MappingProxyType
 from typing import Any
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from chessdna import __version__
 
@@ -12,6 +16,36 @@ class FetchError(RuntimeError):
     pass
 
 
+# One keep-alive session for the process: archive-by-archive fetches (and
+# repeated fetches from the web app) reuse TCP/TLS connections instead of a
+# fresh handshake per GET. requests already asks for gzip/deflate bodies.
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20))
+SESSION.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=20))
+
+# Some public APIs are picky about User-Agent; set a sane default.
+_DEFAULT_UA = f"ChessDNA/{__version__}"
+_DEFAULT_HEADERS: Mapping[str, str] = MappingProxyType({"User-Agent": _DEFAULT_UA})
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def _retry_after_seconds(value: str | None) -> float | None:
+    """Parse a Retry-After header: delay-seconds or an HTTP-date (RFC 7231)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
 def get(
     url: str,
     *,
@@ -20,37 +54,32 @@ def get(
     timeout: int = 60,
     max_retries: int = 3,
     backoff_seconds: float = 1.0,
-    retry_statuses: set[int] | None = None,
+    retry_statuses: set[int] | frozenset[int] | None = None,
+    stream: bool = False,
 ) -> requests.Response:
     """HTTP GET with small retry/backoff for flaky public APIs.
 
-    Retries on 429/5xx by default.
+    Retries on 429/5xx by default. With stream=True the body is not read yet
+    (use r.iter_content, then close the response); only the status is retried.
     """
 
     if retry_statuses is None:
-        retry_statuses = {429, 500, 502, 503, 504}
+        retry_statuses = _RETRY_STATUSES
 
-    # Some public APIs are picky about User-Agent; set a sane default.
-    if headers is None:
-        headers = {}
-    if "User-Agent" not in headers:
-        headers["User-Agent"] = f"ChessDNA/{__version__}"
+    # Caller headers win; the caller's dict is never modified.
+    merged = {**_DEFAULT_HEADERS, **headers} if headers else _DEFAULT_HEADERS
 
     last_exc: Exception | None = None
 
     for attempt in range(max_retries + 1):
+        r: requests.Response | None = None
         try:
-            r = requests.get(url, params=params, headers=headers, timeout=timeout)
+            r = SESSION.get(url, params=params, headers=merged, timeout=timeout, stream=stream)
             if r.status_code in retry_statuses and attempt < max_retries:
-                # Honor Retry-After when provided.
-                ra = r.headers.get("Retry-After")
-                sleep_s: float | None = None
-                if ra:
-                    try:
-                        # Usually seconds (e.g. "2"), sometimes can be non-int.
-                        sleep_s = float(ra)
-                    except ValueError:
-                        sleep_s = None
+                # Give a streamed connection back to the pool before waiting.
+                r.close()
+                # Honor Retry-After when provided (seconds or an HTTP-date).
+                sleep_s = _retry_after_seconds(r.headers.get("Retry-After"))
                 if sleep_s is None:
                     sleep_s = backoff_seconds * (2**attempt)
                 time.sleep(min(sleep_s, 10.0))
@@ -58,6 +87,8 @@ def get(
             r.raise_for_status()
             return r
         except (requests.RequestException, ValueError) as e:
+            if r is not None:
+                r.close()
             last_exc = e
             if attempt >= max_retries:
                 break
@@ -0,0 +1,130 @@
+"""On-disk cache for JSON GETs with conditional revalidation.
+
+chess.com monthly archives are immutable once the month is over, yet every
+fetch used to download them again. Responses are stored per URL with their
+ETag / Last-Modified:
+
+- closed months (URL ending in /YYYY/MM) fetched after the month ended are
+  served from disk without any request; a copy fetched while the month was
+  still running is revalidated once, then becomes immutable too;
+- anything else is reused for `ttl_s` seconds, then revalidated with
+  If-None-Match / If-Modified-Since (a 304 costs no body).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from pydantic_core import from_json
+
+from .http import get
+
+_MONTH_URL_RE = re.compile(r"/(\d{4})/(\d{2})/?$")
+
+
+def cache_dir() -> Path:
+    """Cache location (CHESSDNA_HTTP_CACHE_DIR, default <tempdir>/chessdna_http)."""
+    return Path(os.environ.get("CHESSDNA_HTTP_CACHE_DIR") or Path(tempfile.gettempdir()) / "chessdna_http")
+
+
+def _month_end(url: str) -> float | None:
+    """UTC timestamp at which a monthly-archive URL's month ends (None for other URLs)."""
+    m = _MONTH_URL_RE.search(url)
+    if not m:
+        return None
+    year, month = int(m.group(1)), int(m.group(2))
+    if not 1 <= month <= 12:
+        return None
+    year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return datetime(year, month, 1, tzinfo=timezone.utc).timestamp()
+
+
+def _write(p: Path, data: bytes) -> None:
+    """Write-then-rename, so concurrent readers never see a partial file."""
+    tmp = p.with_name(f"{p.name}.{os.getpid()}.{time.monotonic_ns()}.tmp")
+    try:
+        tmp.write_bytes(data)
+        os.replace(tmp, p)
+    except OSError:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+
+
+def cached_get_json(
+    url: str,
+    *,
+    headers: dict[str, str] | None = None,
+    ttl_s: float = 300.0,
+    max_retries: int = 3,
+) -> Any:
+    """get_json() through the on-disk cache (best-effort: cache errors fall back to the network).
+
+    Bodies (a month of chess.com games is often MBs) are decoded with
+    pydantic-core's Rust JSON parser straight from bytes.
+    """
+    root = cache_dir()
+    key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+    body_p = root / f"{key}.json"
+    meta_p = root / f"{key}.meta"
+
+    meta: dict[str, Any] = {}
+    body: bytes | None = None
+    try:
+        meta = json.loads(meta_p.read_bytes())
+        body = body_p.read_bytes()
+    except (OSError, ValueError):
+        meta, body = {}, None
+
+    if body is not None:
+        fetched_at = float(meta.get("fetched_at", 0))
+        now = time.time()
+        end = _month_end(url)
+        if end is not None and now >= end:
+            # Past month: final only if this copy was fetched after it ended.
+            usable = fetched_at >= end
+        else:
+            usable = now - fetched_at < ttl_s
+        if usable:
+            try:
+                # Refresh mtimes so age-based sweeps keep entries still in use.
+                os.utime(body_p)
+                os.utime(meta_p)
+            except OSError:
+                pass
+            return from_json(body)
+
+    req_headers = dict(headers or {})
+    if body is not None:
+        if meta.get("etag"):
+            req_headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            req_headers["If-Modified-Since"] = meta["last_modified"]
+
+    r = get(url, headers=req_headers, max_retries=max_retries)
+
+    if r.status_code == 304 and body is not None:
+        meta["fetched_at"] = time.time()
+    else:
+        body = r.content
+        meta = {
+            "etag": r.headers.get("ETag"),
+            "last_modified": r.headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+        }
+        try:
+            root.mkdir(parents=True, exist_ok=True)
+        except OSError:
+            return from_json(body)
+        _write(body_p, body)
+    _write(meta_p, json.dumps(meta).encode("utf-8"))
+    return from_json(body)
@@ -1,10 +1,16 @@
 from __future__ import annotations
 
-from .http import get
+from typing import BinaryIO
 
+import requests
 
-def fetch_user_games_pgn(username: str, *, max_games: int = 50) -> str:
-    """Fetch recent games as a single PGN string (public, no auth required)."""
+from .http import FetchError, get
+
+# Response body is copied to the caller's file in chunks of this size.
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def _games_request(username: str, max_games: int) -> tuple[str, dict[str, str], dict[str, str]]:
     url = f"https://lichess.org/api/games/user/{username}"
     params = {
         "max": str(max_games),
@@ -15,5 +21,35 @@ def fetch_user_games_pgn(username: str, *, max_games: int = 50) -> str:
         "moves": "true",
     }
     headers = {"Accept": "application/x-chess-pgn", "User-Agent": "ChessDNA/0.1"}
+    return url, params, headers
+
+
+def fetch_user_games_pgn(username: str, *, max_games: int = 50) -> str:
+    """Fetch recent games as a single PGN string (public, no auth required)."""
+    url, params, headers = _games_request(username, max_games)
     r = get(url, params=params, headers=headers, timeout=60, max_retries=3)
     return r.text
+
+
+def write_user_games_pgn(out: BinaryIO, username: str, *, max_games: int = 50) -> int:
+    """Stream recent games as PGN bytes into `out`; returns the bytes written.
+
+    The body goes to `out` chunk by chunk as it arrives (never held whole in
+    memory). Leading whitespace is dropped, so 0 means "no games".
+    """
+    url, params, headers = _games_request(username, max_games)
+    r = get(url, params=params, headers=headers, timeout=60, max_retries=3, stream=True)
+    n = 0
+    try:
+        for chunk in r.iter_content(STREAM_CHUNK_SIZE):
+            if not n:
+                chunk = chunk.lstrip()
+                if not chunk:
+                    continue
+            out.write(chunk)
+            n += len(chunk)
+    except requests.RequestException as e:
+        raise FetchError(f"GET failed while reading the body: {url}\n{e}") from e
+    finally:
+        r.close()
+    return n
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import io
+import re
 from dataclasses import dataclass
+from typing import Iterator, TextIO
 
 import chess.pgn
 
@@ -22,57 +24,194 @@ def _safe(h: dict, key: str) -> str:
     return v
 
 
-def split_pgn_games(pgn_text: str, *, max_games: int | None = None) -> list[str]:
-    """Split concatenated PGN into per-game PGN strings.
+def pgn_stream(pgn: str | TextIO) -> TextIO | None:
+    """Text stream for python-chess' reader (None for an empty string).
 
-    Uses python-chess PGN reader for robustness.
+    Accepts PGN text or an already-open text file; passing a file lets the
+    reader pull one game at a time instead of holding the whole PGN in memory.
     """
-    pgn_text = (pgn_text or "").strip()
-    if not pgn_text:
-        return []
+    if isinstance(pgn, str):
+        pgn = pgn.strip()
+        return io.StringIO(pgn) if pgn else None
+    return pgn
 
-    out: list[str] = []
-    f = io.StringIO(pgn_text)
-    while True:
+
+def _read_games(f: TextIO, *, max_games: int | None = None) -> Iterator[tuple[chess.pgn.Game, str]]:
+    """Yield (parsed game, exported PGN string) for each non-empty game in `f`."""
+    n = 0
+    while max_games is None or n < max_games:
         game = chess.pgn.read_game(f)
         if game is None:
             break
         exporter = chess.pgn.StringExporter(headers=True, variations=True, comments=True)
         s = game.accept(exporter).strip()
         if s:
-            out.append(s + "\n")
-        if max_games is not None and len(out) >= max_games:
+            n += 1
+            yield game, s + "\n"
+
+
+_RESULTS = frozenset({"1-0", "0-1", "1/2-1/2", "*"})
+
+
+def _raw_game_texts(f: TextIO) -> Iterator[str]:
+    """Yield the original text of each game: a new game starts at a tag line
+    ("[...") that follows movetext, or at any line after a result token.
+    Braced comments may span lines and are not mistaken for tags. Nothing is
+    parsed or re-serialized."""
+    buf: list[str] = []
+    in_moves = False
+    ended = False
+    depth = 0  # open "{" comments in movetext
+    for line in f:
+        s = line.strip()
+        if depth == 0 and s.startswith("["):
+            if in_moves:
+                yield "".join(buf)
+                buf = []
+                in_moves = ended = False
+        elif s:
+            if ended:
+                yield "".join(buf)
+                buf = []
+            in_moves = True
+            depth = max(0, depth + s.count("{") - s.count("}"))
+            ended = depth == 0 and s.rsplit(None, 1)[-1] in _RESULTS
+        buf.append(line)
+    if buf:
+        yield "".join(buf)
+
+
+def iter_pgn_games(pgn_text: str | TextIO, *, max_games: int | None = None) -> Iterator[str]:
+    """Lazily yield per-game PGN strings (one game in memory at a time).
+
+    Games are cut from the input text as-is (see _raw_game_texts); a chunk
+    that doesn't start with tags (e.g. tagless movetext) goes through the
+    python-chess reader instead.
+    """
+    f = pgn_stream(pgn_text)
+    if f is None:
+        return
+    n = 0
+    for chunk in _raw_game_texts(f):
+        text = chunk.strip()
+        if not text:
+            continue
+        parts = [text + "\n"] if text.startswith("[") else [s for _g, s in _read_games(io.StringIO(text))]
+        for part in parts:
+            if max_games is not None and n >= max_games:
+                return
+            n += 1
+            yield part
+
+
+def split_pgn_games(pgn_text: str | TextIO, *, max_games: int | None = None) -> list[str]:
+    """Split concatenated PGN into per-game PGN strings (see iter_pgn_games)."""
+    return list(iter_pgn_games(pgn_text, max_games=max_games))
+
+
+def _read_tags(game_text: str) -> dict[str, str]:
+    """Tag pairs of one game, read the way chess.pgn.read_headers() does.
+
+    read_headers() still tokenizes the whole movetext to find the end of the
+    game; here the game is already cut out, so scanning stops at the first
+    line that isn't a tag (only the header lines are sliced out of the text).
+    """
+    tags: dict[str, str] = {}
+    text = game_text.lstrip("\ufeff")
+    pos, end = 0, len(text)
+    started = False
+    blank = False
+    while pos < end:
+        nl = text.find("\n", pos)
+        nl = end if nl < 0 else nl + 1
+        line = text[pos:nl]
+        pos = nl
+        if line.startswith(("%", ";")):
+            continue
+        if line.isspace():
+            # Leading blank lines, and one blank line between tags, are skipped.
+            if started and blank:
+                break
+            blank = started
+            continue
+        if not line.startswith("["):
             break
+        started, blank = True, False
+        m = chess.pgn.TAG_REGEX.match(line)
+        if m:
+            tags[m.group(1)] = m.group(2)
+    return tags
 
-    return out
+
+def _preview(idx: int, h: dict[str, str]) -> GamePreview:
+    return GamePreview(
+        idx=idx,
+        white=_safe(h, "White") or "?",
+        black=_safe(h, "Black") or "?",
+        result=_safe(h, "Result") or "*",
+        date=_safe(h, "UTCDate") or _safe(h, "Date") or "?",
+        event=_safe(h, "Event") or "?",
+        site=_safe(h, "Site") or "?",
+    )
 
 
-def preview_games(pgn_text: str, *, max_games: int = 200) -> tuple[list[GamePreview], list[str]]:
-    """Return (previews, raw_games) for UI selection."""
-    raw_games = split_pgn_games(pgn_text, max_games=max_games)
+def preview_games(pgn_text: str | TextIO, *, max_games: int = 200) -> tuple[list[GamePreview], list[str]]:
+    """Return (previews, raw_games) for UI selection.
 
+    Only the tag lines of each game are read (see _read_tags); the movetext
+    is never scanned, and raw_games are the games' own text.
+    """
     previews: list[GamePreview] = []
-    for i, gtxt in enumerate(raw_games):
-        f = io.StringIO(gtxt)
-        game = chess.pgn.read_game(f)
-        if game is None:
-            continue
-        h = game.headers
-        previews.append(
-            GamePreview(
-                idx=i,
-                white=_safe(h, "White") or "?",
-                black=_safe(h, "Black") or "?",
-                result=_safe(h, "Result") or "*",
-                date=_safe(h, "UTCDate") or _safe(h, "Date") or "?",
-                event=_safe(h, "Event") or "?",
-                site=_safe(h, "Site") or "?",
-            )
-        )
+    raw_games: list[str] = []
+    for i, s in enumerate(iter_pgn_games(pgn_text, max_games=max_games)):
+        previews.append(_preview(i, _read_tags(s)))
+        raw_games.append(s)
 
     return previews, raw_games
 
 
+class _PlyCounter(chess.pgn.BaseVisitor):
+    """read_game() visitor counting mainline plies (no GameNode tree, variations skipped)."""
+
+    def begin_game(self) -> None:
+        self.plies = 0
+
+    def begin_variation(self):
+        return chess.pgn.SKIP
+
+    def visit_move(self, board: chess.Board, move: chess.Move) -> None:
+        self.plies += 1
+
+    def handle_error(self, error: Exception) -> None:
+        # Like read_game's default builder: moves after an illegal one are dropped.
+        pass
+
+    def result(self) -> int:
+        return self.plies
+
+
+_COMMENT_RE = re.compile(r"\{[^}]*\}|;[^\n]*")
+_VARIATION_RE = re.compile(r"\([^()]*\)")  # innermost first
+_MOVE_NO_RE = re.compile(r"^\d+\.*")
+_SAN_START = frozenset("abcdefghKQRBNO0")
+
+
+def _count_plies_raw(game_text: str) -> int:
+    """Mainline plies of one game's text, counted from SAN tokens (no legality check)."""
+    movetext = "".join(line for line in game_text.splitlines(keepends=True) if not line.lstrip().startswith("["))
+    movetext = _COMMENT_RE.sub(" ", movetext)
+    while True:
+        movetext, k = _VARIATION_RE.subn(" ", movetext)
+        if not k:
+            break
+    n = 0
+    for tok in movetext.split():
+        tok = _MOVE_NO_RE.sub("", tok)
+        if tok and tok[0] in _SAN_START and tok not in _RESULTS:
+            n += 1
+    return n
+
+
 @dataclass
 class PgnInfo:
     games: int
@@ -81,29 +220,32 @@ class PgnInfo:
     plies_avg: float | None = None
 
 
-def pgn_info(pgn_text: str, *, max_games: int | None = None) -> PgnInfo:
+def pgn_info(pgn_text: str | TextIO, *, max_games: int | None = None, fast: bool = False) -> PgnInfo:
     """Lightweight PGN validation/summary without engine.
 
-    Useful as a selftest when Stockfish isn't available.
+    Useful as a selftest when Stockfish isn't available. Moves are replayed on
+    a board, so plies stop at the first illegal move; fast=True instead counts
+    SAN tokens in the raw text (no python-chess parsing, no legality check).
     """
-    pgn_text = (pgn_text or "").strip()
-    if not pgn_text:
+    f = pgn_stream(pgn_text)
+    if f is None:
         return PgnInfo(games=0)
 
-    f = io.StringIO(pgn_text)
     plies: list[int] = []
     games = 0
-    while True:
-        game = chess.pgn.read_game(f)
-        if game is None:
-            break
-        games += 1
-        n = 0
-        for _mv in game.mainline_moves():
-            n += 1
-        plies.append(n)
-        if max_games is not None and games >= max_games:
-            break
+    if fast:
+        for text in iter_pgn_games(f, max_games=max_games):
+            games += 1
+            plies.append(_count_plies_raw(text))
+    else:
+        while True:
+            n = chess.pgn.read_game(f, Visitor=_PlyCounter)
+            if n is None:
+                break
+            games += 1
+            plies.append(n)
+            if max_games is not None and games >= max_games:
+                break
 
     if not plies:
         return PgnInfo(games=games)
@@ -2,15 +2,92 @@
 
 from __future__ import annotations
 
+import functools
 import os
+from pathlib import Path
 
+# Game sources accepted by the web form and `chessdna fetch --platform`.
+VALID_PLATFORMS = frozenset({"auto", "lichess", "chesscom"})
 
+
+@functools.cache
 def default_stockfish_path() -> str:
     """Return the Stockfish binary path.
 
     Uses the STOCKFISH_PATH env var if set; falls back to a common default.
+    The value is resolved once per process (call `.cache_clear()` after
+    changing STOCKFISH_PATH at runtime).
     """
     return os.environ.get(
         "STOCKFISH_PATH",
         r"D:\code\chess_train\stockfish\stockfish-windows-x86-64-avx2.exe",
     )
+
+
+def eval_multipv() -> int:
+    """Engine lines scored per position (CHESSDNA_MULTIPV, default 3, clamped to 1~8).
+
+    More lines means fewer extra searches for played moves that were not the
+    engine's first choice, at the cost of a slightly weaker search per line.
+    """
+    try:
+        n = int(os.environ.get("CHESSDNA_MULTIPV", "3"))
+    except ValueError:
+        n = 3
+    return max(1, min(n, 8))
+
+
+def engine_options() -> dict[str, str]:
+    """UCI options sent to every engine at start-up, from env vars.
+
+    CHESSDNA_ENGINE_HASH_MB -> Hash (MB per engine; Stockfish defaults to 16,
+    and the pool runs one engine per CPU, so keep this modest), and
+    CHESSDNA_SYZYGY_PATH -> SyzygyPath. Threads stays at the engine default (1):
+    parallelism comes from running several engines.
+    """
+    opts: dict[str, str] = {}
+    hash_mb = os.environ.get("CHESSDNA_ENGINE_HASH_MB", "").strip()
+    if hash_mb.isdigit() and int(hash_mb) > 0:
+        opts["Hash"] = hash_mb
+    syzygy = os.environ.get("CHESSDNA_SYZYGY_PATH", "").strip()
+    if syzygy:
+        opts["SyzygyPath"] = syzygy
+    return opts
+
+
+def opening_book_path() -> str | None:
+    """Polyglot opening book (.bin) from CHESSDNA_BOOK, or None when unset."""
+    return os.environ.get("CHESSDNA_BOOK") or None
+
+
+# Known-good engine binaries (path as typed -> resolved absolute path).
+_ENGINE_PATHS: dict[str, str] = {}
+_ENGINE_PATHS_MAX = 32
+
+
+def resolve_engine_path(path: str) -> str | None:
+    """Return the resolved absolute path of a usable engine binary, or None.
+
+    Usable = an existing, executable regular file. Successful lookups are
+    remembered per typed path (the form sends the same string on every
+    request); misses are not, so installing the engine later works without a
+    restart. Callers treat None as "analyze without an engine".
+    """
+    if not path:
+        return None
+    hit = _ENGINE_PATHS.get(path)
+    if hit is not None:
+        return hit
+
+    try:
+        p = Path(path)
+        if not p.is_file() or not os.access(p, os.X_OK):
+            return None
+        resolved = str(p.resolve())
+    except (OSError, ValueError):
+        return None
+
+    if len(_ENGINE_PATHS) >= _ENGINE_PATHS_MAX:
+        _ENGINE_PATHS.clear()
+    _ENGINE_PATHS[path] = resolved
+    return resolved
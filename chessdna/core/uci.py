@@ -2,8 +2,18 @@ from __future__ import annotations
 
 import re
 import subprocess
+from collections import deque
 from dataclasses import dataclass
-from typing import Iterable
+from typing import Iterable, Mapping
+
+from .settings import engine_options
+
+
+# Search output is parsed as bytes: no per-line decode of the info chatter
+# (depth/nodes/nps/currmove) a search prints, and regexes compiled once.
+_MULTIPV_RE = re.compile(rb"\bmultipv\s+(\d+)")
+_SCORE_RE = re.compile(rb"\bscore\s+(cp|mate)\s+(-?\d+)")
+_PV_RE = re.compile(rb"\bpv\s+(.+)$")
 
 
 @dataclass
@@ -29,43 +39,60 @@ def _parse_score(tokens: list[str]) -> UciScore | None:
 class UciEngine:
     """Minimal synchronous UCI driver (avoids asyncio issues on Windows)."""
 
-    def __init__(self, path: str):
+    def __init__(self, path: str, *, options: Mapping[str, str | int] | None = None):
+        """Start the engine; `options` are sent as setoption during the
+        handshake (default: engine_options() from the environment)."""
         self.path = path
+        self.options = dict(engine_options() if options is None else options)
         self.p = subprocess.Popen(
             [path],
             stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=1,
+            bufsize=64 * 1024,
         )
         assert self.p.stdin and self.p.stdout
+        # Moves (space-joined) of the last "position" command; the engine keeps it
+        # across "go" commands.
+        self._position: str | None = None
+        self._multipv = 1
         self._handshake()
 
     def _send(self, line: str) -> None:
         assert self.p.stdin
-        self.p.stdin.write(line + "\n")
+        self.p.stdin.write(line.encode() + b"\n")
         self.p.stdin.flush()
 
-    def _readline(self) -> str:
+    def _readline(self) -> bytes:
         assert self.p.stdout
         line = self.p.stdout.readline()
-        if line == "":
+        if not line:
             raise RuntimeError("engine stdout closed")
-        return line.rstrip("\r\n")
+        return line.rstrip(b"\r\n")
 
     def _handshake(self) -> None:
         self._send("uci")
         while True:
             line = self._readline()
-            if line == "uciok":
+            if line == b"uciok":
                 break
+        for name, value in self.options.items():
+            self._send(f"setoption name {name} value {value}")
+        self._wait_ready()
+
+    def _wait_ready(self) -> None:
         self._send("isready")
         while True:
             line = self._readline()
-            if line == "readyok":
+            if line == b"readyok":
                 break
 
+    def new_game(self) -> None:
+        """Reset engine state between unrelated analyses (pooled engines)."""
+        self._send("ucinewgame")
+        self._position = None
+        self._wait_ready()
+
     def quit(self) -> None:
         try:
             self._send("quit")
@@ -78,58 +105,122 @@ class UciEngine:
 
     def eval_position(
         self,
-        moves_uci: list[str],
+        moves_uci: list[str] | str,
         *,
         movetime_ms: int,
         searchmoves: list[str] | None = None,
     ) -> tuple[int, str, list[str]]:
         """Return (score_cp_from_side_to_move, bestmove_uci, pv_uci).
 
+        `moves_uci` is a list of UCI moves from the start position, or the same
+        moves already joined with spaces (saves a join per call in long games).
+
         If searchmoves is provided, restrict the search to those moves.
         This is useful to evaluate a specific played move in the *same* position.
         """
+        self.set_position(moves_uci)
+        return self.go(movetime_ms=movetime_ms, searchmoves=searchmoves)
+
+    def set_position(self, moves_uci: list[str] | str) -> None:
+        """Send `position startpos [moves ...]`, unless the engine is already there.
+
+        The engine keeps its position between searches, so a second search of the
+        same position (e.g. best move, then the played move via searchmoves)
+        doesn't resend and re-parse the whole move list.
+        """
+        moves = moves_uci if isinstance(moves_uci, str) else " ".join(moves_uci)
+        if moves == self._position:
+            return
         # Use startpos to keep it simple for standard chess.
-        if moves_uci:
-            self._send("position startpos moves " + " ".join(moves_uci))
+        if moves:
+            self._send("position startpos moves " + moves)
         else:
             self._send("position startpos")
+        self._position = moves
 
+    def eval_position_multipv(
+        self,
+        moves_uci: list[str] | str,
+        *,
+        movetime_ms: int,
+        multipv: int = 3,
+    ) -> tuple[int, str, list[str], dict[str, int]]:
+        """eval_position() with MultiPV: also return {first move: score_cp} of the top lines.
+
+        One search scores the best move and the runners-up, so a played move
+        among them needs no separate searchmoves search.
+        """
+        self.set_multipv(multipv)
+        self.set_position(moves_uci)
+        return self._go(movetime_ms, None)
+
+    def set_multipv(self, n: int) -> None:
+        """Set the MultiPV option (sent only when it changes)."""
+        n = max(1, int(n))
+        if n != self._multipv:
+            self._send(f"setoption name MultiPV value {n}")
+            self._wait_ready()
+            self._multipv = n
+
+    def go(self, *, movetime_ms: int, searchmoves: list[str] | None = None) -> tuple[int, str, list[str]]:
+        """Search the current position; same return value as eval_position()."""
+        score_cp, bestmove, pv, _lines = self._go(movetime_ms, searchmoves)
+        return score_cp, bestmove, pv
+
+    def _go(self, movetime_ms: int, searchmoves: list[str] | None) -> tuple[int, str, list[str], dict[str, int]]:
         if searchmoves:
             self._send(f"go movetime {movetime_ms} searchmoves " + " ".join(searchmoves))
         else:
             self._send(f"go movetime {movetime_ms}")
 
-        last_score: UciScore | None = None
-        pv: list[str] = []
+        # Only the last report of each MultiPV line matters, and the engine
+        # prints every line once per depth: keep the most recent score/PV lines
+        # (a few depths' worth) and parse just those once the search is over.
+        recent: deque[bytes] = deque(maxlen=4 * self._multipv + 4)
         bestmove = "0000"
 
         while True:
             line = self._readline()
-            if line.startswith("info "):
-                # Find "score cp X" or "score mate X" anywhere
-                m = re.search(r"\bscore\s+(cp|mate)\s+(-?\d+)", line)
-                if m:
-                    last_score = UciScore(m.group(1), int(m.group(2)))
+            if line.startswith(b"info "):
+                # Most info lines (currmove, nodes, strings) carry neither.
+                if b"score" in line or b" pv " in line:
+                    recent.append(line)
 
-                # Try to capture principal variation
-                pv_m = re.search(r"\bpv\s+(.+)$", line)
-                if pv_m:
-                    pv = pv_m.group(1).strip().split()
-
-            elif line.startswith("bestmove "):
+            elif line.startswith(b"bestmove "):
                 parts = line.split()
                 if len(parts) >= 2:
-                    bestmove = parts[1]
+                    bestmove = parts[1].decode(errors="replace")
                 break
 
-        # Convert to centipawn-ish for comparisons
-        if last_score is None:
-            score_cp = 0
-        elif last_score.kind == "cp":
-            score_cp = last_score.value
-        else:
-            # mate N: map to huge cp preserving sign
-            sign = 1 if last_score.value > 0 else -1 if last_score.value < 0 else 0
-            score_cp = sign * (100000 - 1000 * abs(last_score.value))
+        # Latest score / PV per MultiPV line (lines without "multipv" are line 1).
+        scores: dict[int, UciScore] = {}
+        pvs: dict[int, list[str]] = {}
+        for line in reversed(recent):
+            mpv_m = _MULTIPV_RE.search(line)
+            k = int(mpv_m.group(1)) if mpv_m else 1
 
-        return score_cp, bestmove, pv
+            # Find "score cp X" or "score mate X" anywhere
+            if k not in scores:
+                m = _SCORE_RE.search(line)
+                if m:
+                    scores[k] = UciScore(m.group(1).decode(), int(m.group(2)))
+
+            # Try to capture principal variation
+            if k not in pvs:
+                pv_m = _PV_RE.search(line)
+                if pv_m:
+                    pvs[k] = pv_m.group(1).decode(errors="replace").split()
+
+        lines = {pvs[k][0]: _score_to_cp(sc) for k, sc in scores.items() if pvs.get(k)}
+        return _score_to_cp(scores.get(1)), bestmove, pvs.get(1, []), lines
+
+
+def _score_to_cp(score: UciScore | None) -> int:
+    """Convert to centipawn-ish for comparisons."""
+    if score is None:
+        return 0
+    if score.kind == "cp":
+        return score.value
+    # mate N: map to huge cp preserving sign
+    sign = 1 if score.value > 0 else -1 if score.value < 0 else 0
+    return sign * (100000 - 1000 * abs(score.value))
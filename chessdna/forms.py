@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from .core.settings import VALID_PLATFORMS, default_stockfish_path
+
+
+# Stability guardrails for MVP: avoid huge fetch/preview payloads.
+FETCH_MAX_LIMIT = 50
+
+
+def clamp_analyze_settings(time_per_move: float, max_plies: int) -> tuple[float, int, str]:
+    """Clamp user-provided analyze settings to safe MVP ranges.
+
+    Returns (time_per_move, max_plies, warn_msg).
+
+    We intentionally clamp rather than hard-fail: the UI already provides
+    reasonable defaults, and clamping avoids accidental "hang" inputs.
+    """
+
+    warn: list[str] = []
+
+    # time_per_move: too small is pointless; too large can make web UI feel stuck.
+    try:
+        t = float(time_per_move)
+    except Exception:
+        t = 0.05
+        warn.append("time_per_move 非數字，已回復預設 0.05")
+
+    t2 = max(0.01, min(t, 1.0))
+    if t2 != t:
+        warn.append(f"time_per_move 已限制為 {t2:.2f}s（範圍 0.01~1.00）")
+
+    # max_plies: protect server from huge workloads (MVP).
+    try:
+        m = int(max_plies)
+    except Exception:
+        m = 200
+        warn.append("max_plies 非數字，已回復預設 200")
+
+    m2 = max(10, min(m, 800))
+    if m2 != m:
+        warn.append(f"max_plies 已限制為 {m2}（範圍 10~800）")
+
+    return t2, m2, "；".join(warn)
+
+
+@dataclass(slots=True)
+class SourceForm:
+    """Normalized "where do the games come from" form shared by /preview and /analyze.
+
+    Parsing never fails: bad numbers fall back to defaults and out-of-range
+    values are clamped (with a human-readable `warn`). Missing usernames are
+    reported by `validate()`.
+    """
+
+    platform: str = "auto"
+    lichess_user: str = ""
+    chesscom_user: str = ""
+    fetch_max: int = 10
+    player_name: str = ""
+    engine_path: str = ""
+    time_per_move: float = 0.05
+    max_plies: int = 200
+    warn: str = ""
+
+    @classmethod
+    def from_form(
+        cls,
+        *,
+        platform: str = "auto",
+        lichess_user: str = "",
+        chesscom_user: str = "",
+        fetch_max: object = 10,
+        player_name: str = "",
+        engine_path: str = "",
+        time_per_move: object = 0.05,
+        max_plies: object = 200,
+    ) -> SourceForm:
+        warn: list[str] = []
+
+        try:
+            fm = int(fetch_max)  # type: ignore[call-overload]
+        except Exception:
+            # Non-numeric fetch_max; keep quiet and use the default.
+            fm = 10
+        fm2 = max(1, min(fm, FETCH_MAX_LIMIT))
+        if fm2 != fm:
+            warn.append(f"fetch_max 已限制為 {fm2}（MVP 安全上限 {FETCH_MAX_LIMIT}）")
+
+        t, m, warn2 = clamp_analyze_settings(time_per_move, max_plies)  # type: ignore[arg-type]
+        if warn2:
+            warn.append(warn2)
+
+        req_platform = (platform or "auto").strip().lower()
+        if req_platform not in VALID_PLATFORMS:
+            req_platform = "auto"
+
+        return cls(
+            platform=req_platform,
+            lichess_user=(lichess_user or "").strip(),
+            chesscom_user=(chesscom_user or "").strip(),
+            fetch_max=fm2,
+            player_name=(player_name or "").strip(),
+            engine_path=(engine_path or "").strip() or default_stockfish_path(),
+            time_per_move=t,
+            max_plies=m,
+            warn="；".join(warn),
+        )
+
+    def validate(self, *, require_user: bool = False) -> str:
+        """Return an inline error message ("" if the form is usable).
+
+        If the user explicitly selects a platform, require its username.
+        require_user=True also rejects the auto case with no username at all
+        (client JS blocks these, but don't rely on it).
+        """
+        if require_user and self.platform == "auto" and not self.lichess_user and not self.chesscom_user:
+            return "要列出對局，請先輸入 Lichess 或 Chess.com username。"
+        if self.platform == "lichess" and not self.lichess_user:
+            return "你選了 Lichess，但沒有輸入 Lichess username。"
+        if self.platform == "chesscom" and not self.chesscom_user:
+            return "你選了 Chess.com，但沒有輸入 Chess.com username。"
+        return ""
+
+    def prefill(self) -> dict[str, object]:
+        """Values to re-populate the index form with."""
+        return {
+            "platform": self.platform,
+            "lichess_user": self.lichess_user,
+            "chesscom_user": self.chesscom_user,
+            "fetch_max": self.fetch_max,
+            "player_name": self.player_name,
+            "engine_path": self.engine_path,
+            "time_per_move": self.time_per_move,
+            "max_plies": self.max_plies,
+        }
+
+    def error_template_ctx(self, msg: str) -> dict[str, object]:
+        """index.html context showing `msg` inline, with the user's inputs kept (no request)."""
+        return {
+            "default_engine": default_stockfish_path(),
+            "default_time": 0.05,
+            "preview_token": "",
+            "preview_platform": "",
+            "games": [],
+            "inline_warn": self.warn,
+            "inline_err": msg,
+            "prefill": self.prefill(),
+        }
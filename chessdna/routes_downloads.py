@@ -1,13 +1,16 @@
 from __future__ import annotations
 
+import os
 from pathlib import Path
 
 from fastapi import HTTPException
 from fastapi.responses import FileResponse
 
+from .store import KVStore
+
 
 def download_file(
-    store: dict[str, dict[str, str]],
+    store: KVStore | dict[str, dict[str, str]],
     report_id: str,
     kind: str,
     *,
@@ -16,17 +19,15 @@ def download_file(
     """Download report artifacts.
 
     MVP note:
-    - The server keeps an in-memory map (store) from report_id -> file paths.
-    - Artifacts are also written to disk (temp dir). After a server restart,
-      the in-memory map is lost, but the files may still exist.
+    - The server keeps an index (store) from report_id -> {kind: file path}.
+    - Artifacts are written to disk (temp dir). If the index misses (e.g. its
+      entry was swept), the files may still exist.
 
     This helper supports a best-effort disk fallback when store misses.
     """
 
     # 1) Prefer store mapping (fast path)
-    path: str | None = None
-    if report_id in store and kind in store[report_id]:
-        path = store[report_id][kind]
+    path: str | None = (store.get(report_id) or {}).get(kind)
 
     # 2) Fallback to disk if requested
     if path is None and fallback_dir is not None:
@@ -38,9 +39,14 @@ def download_file(
     if path is None:
         raise HTTPException(status_code=404, detail="report_id not found")
 
-    if not Path(path).exists():
+    # Stat once here and hand it to FileResponse (it would otherwise stat again).
+    # FileResponse streams the file (sendfile where the server supports it)
+    # instead of reading it into memory.
+    try:
+        st = os.stat(path)
+    except OSError:
         raise HTTPException(status_code=404, detail="file missing")
 
     media_type = "application/json" if kind == "json" else "text/html"
     filename = f"chessdna_report_{report_id}.{kind}"
-    return FileResponse(path=path, media_type=media_type, filename=filename)
+    return FileResponse(path=path, media_type=media_type, filename=filename, stat_result=st)
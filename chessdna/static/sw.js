@@ -60,7 +60,8 @@ self.addEventListener('fetch', (event) => {
           }
           return response;
         })
-        .catch(() => caches.match(request))
+        // Templates add ?v=<hash> to asset URLs; fall back to any cached copy.
+        .catch(() => caches.match(request, { ignoreSearch: true }))
     );
   }
 });
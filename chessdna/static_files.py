@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import hashlib
+from functools import cache
+from pathlib import Path
+
+from starlette.staticfiles import StaticFiles
+
+
+# Versioned URLs (`?v=<content hash>`) never change content, so browsers may
+# keep them forever; plain URLs get a short lifetime and revalidate via ETag.
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+DEFAULT_CACHE = "public, max-age=3600"
+
+
+class CachedStatic(StaticFiles):
+    """StaticFiles with Cache-Control headers.
+
+    Files are still served by FileResponse, i.e. streamed / sendfile'd by the
+    server rather than read into Python.
+    """
+
+    async def get_response(self, path: str, scope):
+        resp = await super().get_response(path, scope)
+        if resp.status_code in (200, 304):
+            versioned = b"v=" in (scope.get("query_string") or b"")
+            resp.headers["Cache-Control"] = IMMUTABLE_CACHE if versioned else DEFAULT_CACHE
+        return resp
+
+
+def make_static_url(static_dir: str | Path, prefix: str = "/static"):
+    """Build a `static_url(path)` helper for templates: "/static/<path>?v=<hash8>".
+
+    Each asset is hashed once per process (first use); a missing file gets the
+    plain URL.
+    """
+    root = Path(static_dir)
+
+    @cache
+    def static_url(path: str) -> str:
+        url = f"{prefix}/{path}"
+        try:
+            digest = hashlib.blake2b((root / path).read_bytes(), digest_size=8).hexdigest()[:8]
+        except OSError:
+            return url
+        return f"{url}?v={digest}"
+
+    return static_url
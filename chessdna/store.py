@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import stat
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+
+def private_temp_dir(name: str = "chessdna") -> Path:
+    """Per-user 0700 directory under the temp dir: <tmp>/<name>-<uid>.
+
+    Like Jinja's bytecode cache directory: a fixed path in the shared temp dir
+    could be pre-created by another local user, so an existing directory that
+    is not ours (or is a symlink) raises PermissionError.
+    """
+    base = Path(tempfile.gettempdir())
+    if not hasattr(os, "getuid"):
+        # Windows: the temp dir is already per-user.
+        p = base / name
+        p.mkdir(exist_ok=True)
+        return p
+
+    p = base / f"{name}-{os.getuid()}"
+    try:
+        p.mkdir(mode=0o700)
+    except FileExistsError:
+        pass
+    st = os.lstat(p)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid():
+        raise PermissionError(f"{p} is not a directory owned by this user")
+    if stat.S_IMODE(st.st_mode) != 0o700:
+        os.chmod(p, 0o700)
+    return p
+
+
+class KVStore:
+    """Small token -> artifact path index backed by SQLite (WAL mode).
+
+    MVP note:
+    - Artifacts themselves (PGN / report JSON / report HTML) still live as files
+      in the temp dirs; this only records where they are.
+    - Unlike the old in-memory dicts, the mapping survives a server restart and
+      is shared between worker processes.
+
+    Schema: one row per (token, kind) -> (path, mtime).
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        # Paths from the index are served and read back, so never trust a DB
+        # someone else created.
+        if hasattr(os, "getuid"):
+            try:
+                owner = self.path.stat().st_uid
+            except FileNotFoundError:
+                owner = os.getuid()
+            if owner != os.getuid():
+                raise PermissionError(f"{self.path} is owned by another user")
+        self._lock = threading.Lock()
+        # Autocommit mode; every statement is its own short transaction.
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS artifacts ("
+            " token TEXT NOT NULL,"
+            " kind TEXT NOT NULL,"
+            " path TEXT NOT NULL,"
+            " mtime REAL NOT NULL,"
+            " PRIMARY KEY (token, kind))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS artifacts_mtime ON artifacts (mtime)")
+
+    def put(self, token: str, kind: str, path: str | Path, *, mtime: float | None = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO artifacts (token, kind, path, mtime) VALUES (?, ?, ?, ?)",
+                (token, kind, str(path), time.time() if mtime is None else float(mtime)),
+            )
+
+    def get(self, token: str) -> dict[str, str]:
+        """Return {kind: path} for a token (empty dict if unknown)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT kind, path FROM artifacts WHERE token = ?",
+                (token,),
+            ).fetchall()
+        return {kind: path for kind, path in rows}
+
+    def sweep(self, max_age_s: float, *, kinds: tuple[str, ...] | None = None) -> int:
+        """Drop entries older than max_age_s seconds. Returns number of deleted rows."""
+        cutoff = time.time() - float(max_age_s)
+        with self._lock:
+            if kinds:
+                marks = ",".join("?" for _ in kinds)
+                cur = self._conn.execute(
+                    f"DELETE FROM artifacts WHERE mtime < ? AND kind IN ({marks})",
+                    (cutoff, *kinds),
+                )
+            else:
+                cur = self._conn.execute("DELETE FROM artifacts WHERE mtime < ?", (cutoff,))
+            # No VACUUM: it rewrites the whole file under the lock, and the
+            # freed pages are reused by later inserts anyway.
+            deleted = cur.rowcount
+        return deleted
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class LRUStore(OrderedDict):
+    """dict with a size cap: inserting beyond `cap` evicts the least recently used entry.
+
+    Used for in-memory caches whose entries can be rebuilt from disk (e.g.
+    preview tokens), so eviction only costs a reload, never data.
+
+    get/set/delete hold a lock, so worker threads may share it with the loop.
+    """
+
+    def __init__(self, cap: int):
+        super().__init__()
+        self.cap = max(1, int(cap))
+        self._lock = threading.RLock()
+
+    def __getitem__(self, key):
+        with self._lock:
+            value = super().__getitem__(key)
+            self.move_to_end(key)
+            return value
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self:
+                return self[key]
+            return default
+
+    def __setitem__(self, key, value) -> None:
+        with self._lock:
+            super().__setitem__(key, value)
+            self.move_to_end(key)
+            while len(self) > self.cap:
+                self.popitem(last=False)
+
+    def __delitem__(self, key) -> None:
+        with self._lock:
+            super().__delitem__(key)
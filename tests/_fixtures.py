@@ -0,0 +1,40 @@
+"""PGN texts shared by the web tests (imported as `from _fixtures import ...`)."""
+
+from __future__ import annotations
+
+from functools import lru_cache
+
+ONE_GAME_PGN = """[Event "Test1"]
+[Site "https://example.com/1"]
+[Date "2026.02.12"]
+[Round "-"]
+[White "A"]
+[Black "B"]
+[Result "1-0"]
+
+1. e4 e5 2. Nf3 Nc6 1-0
+"""
+
+TWO_GAMES_PGN = (
+    ONE_GAME_PGN
+    + """
+[Event "Test2"]
+[Site "https://example.com/2"]
+[Date "2026.02.11"]
+[Round "-"]
+[White "C"]
+[Black "D"]
+[Result "0-1"]
+
+1. d4 d5 2. c4 e6 0-1
+"""
+)
+
+
+@lru_cache(maxsize=None)
+def two_games_preview():
+    """preview_games(TWO_GAMES_PGN), parsed once (tuples, so callers can't mutate the shared copy)."""
+    from chessdna.core.pgn_utils import preview_games
+
+    previews, raw_games = preview_games(TWO_GAMES_PGN, max_games=2)
+    return tuple(previews), tuple(raw_games)
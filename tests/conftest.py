@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import stat
+import sys
+from pathlib import Path
+
+import pytest
+
+SAMPLE_PGN = Path(__file__).resolve().parents[1] / "_sample_orange_bot.pgn"
+
+
+# Minimal UCI engine used by tests that need a real subprocess.
+# Scores are a deterministic function of the position and searchmoves, and every
+# received command is appended to "<engine>.log" so tests can count searches.
+_FAKE_ENGINE_SRC = r'''
+import hashlib
+import sys
+
+log = open(sys.argv[0] + ".log", "a", encoding="utf-8")
+pos = "position startpos"
+for line in sys.stdin:
+    line = line.strip()
+    log.write(line + "\n")
+    log.flush()
+    if line == "uci":
+        print("id name fake")
+        print("uciok", flush=True)
+    elif line == "isready":
+        print("readyok", flush=True)
+    elif line.startswith("position"):
+        pos = line
+    elif line.startswith("go"):
+        sm = line.split("searchmoves", 1)[1].split() if "searchmoves" in line else []
+        h = int(hashlib.md5((pos + " ".join(sm)).encode()).hexdigest(), 16)
+        cp = (h % 200) - 100
+        mv = sm[0] if sm else "0000"
+        print(f"info depth 1 score cp {cp} pv {mv}")
+        print(f"bestmove {mv}", flush=True)
+    elif line == "quit":
+        break
+'''
+
+
+def pytest_collection_modifyitems(config, items):
+    # Tests that start an engine process are the slow part of the suite;
+    # `pytest -m "not slow"` skips them during quick edit/test loops.
+    for item in items:
+        if "fake_engine" in getattr(item, "fixturenames", ()):
+            item.add_marker(pytest.mark.slow)
+
+
+@pytest.fixture(autouse=True)
+def _isolated_app_storage(tmp_path: Path, monkeypatch):
+    """Point the app's temp dirs, artifact index and caches at tmp_path.
+
+    Without this every test (and every xdist worker) shares the files under the
+    system temp dir, so fixed tokens and the SQLite index could collide.
+    """
+    import chessdna.app as appmod
+    from chessdna.core.analysis_cache import AnalysisCache
+    from chessdna.store import KVStore
+
+    reports = tmp_path / "_reports"
+    fetch = tmp_path / "_fetch"
+    reports.mkdir()
+    fetch.mkdir()
+    store = KVStore(tmp_path / "_artifacts.sqlite3")
+    monkeypatch.setattr(appmod, "REPORT_TMP_DIR", reports)
+    monkeypatch.setattr(appmod, "FETCH_TMP_DIR", fetch)
+    monkeypatch.setattr(appmod, "ARTIFACT_STORE", store)
+    monkeypatch.setattr(appmod, "ANALYSIS_CACHE_DIR", reports / "cache")
+    monkeypatch.setattr(appmod, "ANALYSIS_CACHE", AnalysisCache(reports / "cache"))
+    monkeypatch.setenv("CHESSDNA_HTTP_CACHE_DIR", str(tmp_path / "_http"))
+    yield
+    store.close()
+
+
+@pytest.fixture
+def fake_engine(tmp_path: Path) -> Path:
+    """Path to an executable fake UCI engine (POSIX only)."""
+    if sys.platform == "win32":
+        pytest.skip("fake engine relies on a #! script")
+    p = tmp_path / "fake_engine"
+    p.write_text(f"#!{sys.executable}\n" + _FAKE_ENGINE_SRC, encoding="utf-8")
+    p.chmod(p.stat().st_mode | stat.S_IXUSR)
+    return p
+
+
+@pytest.fixture(scope="session")
+def sample_pgn_text() -> str:
+    """_sample_orange_bot.pgn, read once per session."""
+    return SAMPLE_PGN.read_text(encoding="utf-8")
+
+
+@pytest.fixture(scope="session")
+def sample_previews(sample_pgn_text: str):
+    """preview_games(sample, max_games=50), parsed once per session (treat as read-only)."""
+    from chessdna.core.pgn_utils import preview_games
+
+    return preview_games(sample_pgn_text, max_games=50)
+
+
+@pytest.fixture(scope="session")
+def sample_pgn_file(sample_previews, tmp_path_factory) -> Path:
+    """The sample's games as split by sample_previews, written once per session.
+
+    CLI tests point --pgn here, so they read exactly the games the preview
+    tests see without splitting the sample again.
+    """
+    _previews, raw_games = sample_previews
+    p = tmp_path_factory.mktemp("sample") / "sample.pgn"
+    p.write_text("\n".join(raw_games), encoding="utf-8")
+    return p
+
+
+@pytest.fixture(scope="session")
+def client():
+    """One TestClient (and one app lifespan) shared by the web tests."""
+    from fastapi.testclient import TestClient
+
+    from chessdna.app import app
+
+    with TestClient(app) as c:
+        yield c
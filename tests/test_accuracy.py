@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from chessdna.core.analyze import _accuracy_formula, _cpl_label, _lichess_accuracy_from_cpl, _ply_metrics
+
+
+def test_accuracy_table_matches_formula():
+    for cpl in range(-3, 3000):
+        assert _lichess_accuracy_from_cpl(cpl) == _accuracy_formula(cpl)
+    for avg in (0.0, 12.5, 49.99, 81.3, 1e6):
+        assert _lichess_accuracy_from_cpl(avg) == _accuracy_formula(avg)
+    assert _lichess_accuracy_from_cpl(0) > 99.99
+    assert _lichess_accuracy_from_cpl(500) == 0.0
+
+
+def test_ply_metrics_match_scalar_functions():
+    for cpl in range(0, 1500):
+        assert _ply_metrics(cpl) == (_lichess_accuracy_from_cpl(cpl), _cpl_label(cpl))
+
+
+def test_label_slots_cover_every_label():
+    from chessdna.core.analyze import _LABEL_SLOT
+
+    labels = {_cpl_label(cpl) for cpl in range(400)}
+    assert labels == set(_LABEL_SLOT)
+    assert sorted(_LABEL_SLOT.values()) == [0, 1, 2, 3]
+
+
+def test_player_overview_accuracy_uses_per_ply_mean():
+    from chessdna.core.analyze import GameReport, PlyReport, _player_overview
+
+    def game(cpls):
+        plies = []
+        for i, cpl in enumerate(cpls):
+            acc, label = _ply_metrics(cpl)
+            plies.append(PlyReport(ply=i + 1, san="?", uci="0000", side="white", cpl=cpl, accuracy=acc, label=label))
+        accs = [p.accuracy for p in plies]
+        return GameReport(plies=plies, player_side="white", player_accuracy=sum(accs) / len(accs))
+
+    games = [game([0, 0, 0, 300]), game([20, 20])]
+    ov = _player_overview(games, "A")
+
+    accs = [p.accuracy for g in games for p in g.plies]
+    assert ov.accuracy == sum(accs) / len(accs)
+    # Within the range of the games it summarizes (the accuracy of the
+    # average CPL would fall below both here).
+    per_game = [g.player_accuracy for g in games]
+    assert min(per_game) <= ov.accuracy <= max(per_game)
+    assert _lichess_accuracy_from_cpl(ov.avg_cpl) < min(per_game)
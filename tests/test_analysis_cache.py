@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from chessdna.core.analysis_cache import AnalysisCache
+from chessdna.core.analyze import analyze_pgn_text
+
+
+GAME = """[Event "Cache"]
+[White "A"]
+[Black "B"]
+[Result "1-0"]
+
+1. e4 e5 2. Nf3 Nc6 1-0
+"""
+
+
+def _key(engine, **kw):
+    args = dict(engine_path=str(engine), time_per_move=0.01, max_plies=60, player_name=None)
+    args.update(kw)
+    return AnalysisCache.key(GAME, **args)
+
+
+def test_cache_key_depends_on_engine_and_settings(fake_engine, tmp_path, monkeypatch):
+    k = _key(fake_engine)
+    assert k is not None
+    assert _key(fake_engine) == k
+    assert _key(fake_engine, time_per_move=0.02) != k
+    assert _key(fake_engine, player_name="A") != k
+    monkeypatch.setenv("CHESSDNA_MULTIPV", "1")
+    assert _key(fake_engine) != k
+    # No engine -> degraded report -> never cached.
+    assert _key(tmp_path / "missing") is None
+
+
+def test_degraded_reports_are_not_stored(tmp_path):
+    # The file exists (so a key is built) but is not an engine.
+    bogus = tmp_path / "not_an_engine"
+    bogus.write_text("not executable", encoding="utf-8")
+    cache = AnalysisCache(tmp_path / "cache")
+    k = _key(bogus)
+    assert k is not None
+
+    report = analyze_pgn_text(GAME, engine_path=str(bogus), time_per_move=0.01, max_plies=60)
+    assert all(p.cpl is None for g in report.games for p in g.plies)
+    cache.put(k, report)
+    assert cache.get(k) is None
+
+
+def test_cache_roundtrip(fake_engine, tmp_path):
+    cache = AnalysisCache(tmp_path / "cache")
+    k = _key(fake_engine)
+    assert cache.get(k) is None
+
+    report = analyze_pgn_text(GAME, engine_path=str(fake_engine), time_per_move=0.01, max_plies=60)
+    cache.put(k, report)
+
+    assert cache.get(k).model_dump() == report.model_dump()
+
+
+def test_concurrent_puts_of_one_key_use_separate_tmp_files(fake_engine, tmp_path, monkeypatch):
+    import os
+    import threading
+
+    from chessdna.core import analysis_cache
+
+    cache = AnalysisCache(tmp_path / "cache")
+    k = _key(fake_engine)
+    report = analyze_pgn_text(GAME, engine_path=str(fake_engine), time_per_move=0.01, max_plies=60)
+
+    # Both writers have finished their tmp file before either renames it.
+    barrier = threading.Barrier(2)
+    renamed: list[str] = []
+    real_replace = os.replace
+
+    def _replace(src, dst):
+        barrier.wait(timeout=5)
+        renamed.append(os.path.basename(src))
+        real_replace(src, dst)
+
+    monkeypatch.setattr(analysis_cache.os, "replace", _replace)
+    threads = [threading.Thread(target=cache.put, args=(k, report)) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(renamed) == len(set(renamed)) == 2
+    assert cache.get(k).model_dump() == report.model_dump()
+
+
+def test_web_analyze_reuses_cached_games(fake_engine, tmp_path, monkeypatch, client):
+    import chessdna.app as appmod
+
+    monkeypatch.setattr(appmod, "ANALYSIS_CACHE", AnalysisCache(tmp_path / "cache"))
+    log = fake_engine.parent / (fake_engine.name + ".log")
+    data = {"pgn_text": GAME, "engine_path": str(fake_engine), "time_per_move": "0.01", "max_plies": "60"}
+
+    assert client.post("/analyze", data=data).status_code == 200
+    searches = log.read_text(encoding="utf-8").count("go ")
+    assert searches > 0
+
+    assert client.post("/analyze", data=data).status_code == 200
+    assert log.read_text(encoding="utf-8").count("go ") == searches
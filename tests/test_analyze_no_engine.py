@@ -43,3 +43,33 @@ def test_analyze_clamps_inputs_like_web_settings(tmp_path):
 
     assert report.time_per_move == 1.0
     assert report.max_plies == 800
+
+
+def test_analyze_ignores_variations_comments_and_nags(tmp_path):
+    annotated = """
+[Event "Annotated"]
+[White "Alice"]
+
+1. e4 {best by test} e5 $1 (1... c5 2. Nf3 (2. c3 d5) d6) 2. Nf3 Nc6 $6 3. Bb5 *
+"""
+    plain = '[Event "Annotated"]\n[White "Alice"]\n\n1. e4 e5 2. Nf3 Nc6 3. Bb5 *\n'
+    kw = dict(engine_path=str(tmp_path / "__missing_stockfish__"), max_plies=60)
+
+    a = analyze_pgn_text(annotated, **kw).games[0]
+    b = analyze_pgn_text(plain, **kw).games[0]
+
+    assert [p.san for p in a.plies] == ["e4", "e5", "Nf3", "Nc6", "Bb5"]
+    assert a.plies == b.plies
+    # Seven Tag Roster defaults are filled in like chess.pgn.read_game does.
+    assert a.headers["Black"] == "?"
+    assert a.headers == b.headers
+
+
+def test_san_is_the_same_with_and_without_engine(fake_engine, tmp_path):
+    kw = dict(time_per_move=0.01, max_plies=60)
+    without = analyze_pgn_text(SAMPLE_PGN, engine_path=str(tmp_path / "__missing_stockfish__"), **kw)
+    with_engine = analyze_pgn_text(SAMPLE_PGN, engine_path=str(fake_engine), **kw)
+
+    sans = [(p.side, p.san, p.uci) for p in without.games[0].plies]
+    assert sans == [(p.side, p.san, p.uci) for p in with_engine.games[0].plies]
+    assert ("white", "O-O", "e1g1") in sans
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import struct
+
+import chess
+import chess.polyglot
+
+from chessdna.core.analyze import EVAL_CACHE, AnalyzeReport, analyze_pgn_text
+from chessdna.core.uci import UciEngine
+
+
+SAMPLE_PGN = """[Event "Parallel"]
+[White "A"]
+[Black "B"]
+[Result "1-0"]
+
+1. e4 e5 2. Nf3 Nc6 3. Bb5 a6 4. Ba4 Nf6 5. O-O Be7 1-0
+"""
+
+
+def _plies(report):
+    return [(p.uci, p.best_cp, p.played_cp, p.cpl) for p in report.games[0].plies]
+
+
+def test_extra_engines_give_same_report_as_single_engine(fake_engine):
+    single = analyze_pgn_text(SAMPLE_PGN, engine_path=str(fake_engine), time_per_move=0.01, max_plies=60)
+    EVAL_CACHE.clear()  # make the parallel run search every ply again
+
+    engines = [UciEngine(str(fake_engine)) for _ in range(3)]
+    try:
+        parallel = analyze_pgn_text(
+            SAMPLE_PGN,
+            engine_path=str(fake_engine),
+            time_per_move=0.01,
+            max_plies=60,
+            engine=engines[0],
+            extra_engines=engines[1:],
+        )
+    finally:
+        for e in engines:
+            e.quit()
+
+    assert len(single.games[0].plies) == 10
+    assert all(p.cpl is not None for p in single.games[0].plies)
+    assert _plies(parallel) == _plies(single)
+
+
+SECOND_PGN = """[Event "Parallel"]
+[White "C"]
+[Black "A"]
+[Result "0-1"]
+
+1. d4 d5 2. c4 e6 3. Nc3 Nf6 0-1
+"""
+
+
+def test_merged_per_game_reports_match_one_pass(fake_engine):
+    kw = dict(engine_path=str(fake_engine), time_per_move=0.01, max_plies=60, player_name="A")
+    both = analyze_pgn_text(SAMPLE_PGN + "\n" + SECOND_PGN, **kw)
+    merged = AnalyzeReport.merge([analyze_pgn_text(SAMPLE_PGN, **kw), analyze_pgn_text(SECOND_PGN, **kw)])
+
+    assert [g.headers["White"] for g in merged.games] == ["A", "C"]
+    assert merged.player_overview.games_total == 2
+    assert merged.player_overview.games_found == 2
+    assert merged.model_dump() == both.model_dump()
+
+
+TRANSPOSED_PGN = """[Event "Transposition"]
+[White "A"]
+[Black "B"]
+[Result "1-0"]
+
+1. Nf3 Nc6 2. e4 e5 3. Bb5 a6 1-0
+"""
+
+
+def test_transposed_positions_reuse_best_move_evals(fake_engine):
+    EVAL_CACHE.clear()
+    log = fake_engine.with_name(fake_engine.name + ".log")
+    kw = dict(engine_path=str(fake_engine), time_per_move=0.01, max_plies=60)
+
+    def unrestricted() -> int:
+        lines = log.read_text(encoding="utf-8").splitlines()
+        return sum(line.startswith("go ") and "searchmoves" not in line for line in lines)
+
+    first = analyze_pgn_text(SAMPLE_PGN, **kw)
+    searched = unrestricted()
+    assert searched == 10
+
+    def restricted() -> int:
+        lines = log.read_text(encoding="utf-8").splitlines()
+        return sum(line.startswith("go ") and "searchmoves" in line for line in lines)
+
+    restricted_searched = restricted()
+
+    # Same game again: every search (best move and played move) is a cache hit.
+    again = analyze_pgn_text(SAMPLE_PGN, **kw)
+    assert unrestricted() == searched
+    assert restricted() == restricted_searched
+    assert _plies(again) == _plies(first)
+
+    # Start position + (1. Nf3 Nc6 2. e4 e5 == 1. e4 e5 2. Nf3 Nc6) and 3. Bb5:
+    # only the positions before plies 2-4 are new.
+    analyze_pgn_text(TRANSPOSED_PGN, **kw)
+    assert unrestricted() == searched + 3
+
+
+def test_workers_spawn_extra_engines(fake_engine):
+    log = fake_engine.with_name(fake_engine.name + ".log")
+    kw = dict(engine_path=str(fake_engine), time_per_move=0.01, max_plies=60)
+
+    single = analyze_pgn_text(SAMPLE_PGN, **kw)
+    EVAL_CACHE.clear()
+    log.write_text("", encoding="utf-8")
+
+    parallel = analyze_pgn_text(SAMPLE_PGN, workers=3, **kw)
+
+    lines = log.read_text(encoding="utf-8").splitlines()
+    assert lines.count("uci") == 3
+    assert _plies(parallel) == _plies(single)
+
+
+def test_game_accuracy_is_mean_of_ply_accuracies(fake_engine):
+    report = analyze_pgn_text(
+        SAMPLE_PGN, engine_path=str(fake_engine), time_per_move=0.01, max_plies=60, player_name="B"
+    )
+    g = report.games[0]
+    black = [p.accuracy for p in g.plies if p.side == "black"]
+
+    assert g.accuracy_black == sum(black) / len(black)
+    assert g.player_accuracy == g.accuracy_black
+
+
+def _write_book(path, board: chess.Board, moves: list[str]) -> None:
+    """Minimal Polyglot book: one entry per move from `board`."""
+    key = chess.polyglot.zobrist_hash(board)
+    entries = []
+    for uci in moves:
+        m = chess.Move.from_uci(uci)
+        entries.append(struct.pack(">QHHI", key, m.to_square | (m.from_square << 6), 1, 0))
+    path.write_bytes(b"".join(entries))
+
+
+def test_book_moves_skip_the_engine(fake_engine, tmp_path, monkeypatch):
+    from chessdna.core.analyze import _open_book
+
+    log = fake_engine.with_name(fake_engine.name + ".log")
+    book = tmp_path / "book.bin"
+    _write_book(book, chess.Board(), ["e2e4", "d2d4"])
+    kw = dict(engine_path=str(fake_engine), time_per_move=0.01, max_plies=60)
+
+    EVAL_CACHE.clear()
+    plain = analyze_pgn_text(SAMPLE_PGN, **kw)
+    searched = len([ln for ln in log.read_text(encoding="utf-8").splitlines() if ln.startswith("go ")])
+
+    EVAL_CACHE.clear()
+    log.write_text("", encoding="utf-8")
+    monkeypatch.setenv("CHESSDNA_BOOK", str(book))
+    _open_book.cache_clear()
+    booked = analyze_pgn_text(SAMPLE_PGN, **kw)
+    lines = log.read_text(encoding="utf-8").splitlines()
+
+    # 1. e4 is in the book: no search from the start position at all.
+    assert "position startpos" not in lines
+    assert len([ln for ln in lines if ln.startswith("go ")]) < searched
+    first = booked.games[0].plies[0]
+    assert (first.cpl, first.bestmove_uci) == (0, "e2e4")
+    assert first.best_cp == -booked.games[0].plies[1].best_cp
+    assert _plies(booked)[1:] == _plies(plain)[1:]
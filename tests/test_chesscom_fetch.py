@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from chessdna.core import chesscom
+
+
+def test_fetch_keeps_newest_first_and_stops_early(monkeypatch):
+    archives = [f"https://api.chess.com/pub/player/u/games/2025/{m:02d}" for m in range(1, 13)]
+    fetched: list[str] = []
+
+    def fake_get_json(url, headers=None, max_retries=3):
+        if url.endswith("/archives"):
+            return {"archives": archives}
+        fetched.append(url)
+        m = int(url.rsplit("/", 1)[1])
+        return {"games": [{"end_time": m * 100 + i, "pgn": f"[Event \"{m}-{i}\"]\n*"} for i in range(3)]}
+
+    monkeypatch.setattr(chesscom, "get_json", fake_get_json)
+    monkeypatch.setattr(chesscom, "cached_get_json", fake_get_json)
+    monkeypatch.setattr(chesscom, "_current_month_url", lambda u: archives[-1])
+
+    pgn = chesscom.fetch_user_games_pgn("U", max_games=5)
+
+    events = [line for line in pgn.splitlines() if line.startswith("[Event")]
+    assert events == ['[Event "12-2"]', '[Event "12-1"]', '[Event "12-0"]', '[Event "11-2"]', '[Event "11-1"]']
+    # max_games=5 -> one round of 2 months, not all 12 archives; the
+    # speculative current-month fetch is reused, not repeated.
+    assert sorted(fetched) == archives[-2:]
+
+
+def test_current_month_outside_archives_is_ignored(monkeypatch):
+    archives = ["https://api.chess.com/pub/player/u/games/2024/03"]
+    fetched: list[str] = []
+
+    def fake_get_json(url, headers=None, max_retries=3):
+        if url.endswith("/archives"):
+            return {"archives": archives}
+        fetched.append(url)
+        if url != archives[0]:
+            raise RuntimeError("no such month")
+        return {"games": [{"end_time": 1, "pgn": '[Event "old"]\n*'}]}
+
+    monkeypatch.setattr(chesscom, "get_json", fake_get_json)
+    monkeypatch.setattr(chesscom, "cached_get_json", fake_get_json)
+
+    pgn = chesscom.fetch_user_games_pgn("u", max_games=5)
+
+    assert pgn == '[Event "old"]\n*\n'
+    assert chesscom._current_month_url("u") in fetched
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import os
+import time
+
+from chessdna.app import _cleanup_tmp_dir
+
+
+def test_cleanup_tmp_dir_deletes_only_stale_matching_files(tmp_path):
+    old = time.time() - 10 * 3600
+
+    stale_json = tmp_path / "a.json"
+    stale_txt = tmp_path / "a.txt"
+    fresh_json = tmp_path / "b.json"
+    stale_dir = tmp_path / "c.json"
+    for p in (stale_json, stale_txt, fresh_json):
+        p.write_text("x", encoding="utf-8")
+    stale_dir.mkdir()
+    for p in (stale_json, stale_txt, stale_dir):
+        os.utime(p, (old, old))
+
+    deleted = _cleanup_tmp_dir(tmp_path, max_age_hours=1.0, suffixes=(".json", ".html"))
+
+    assert deleted == 1
+    assert not stale_json.exists()
+    assert stale_txt.exists()
+    assert fresh_json.exists()
+    assert stale_dir.exists()
+
+
+def test_cleanup_tmp_dir_missing_dir_is_noop(tmp_path):
+    assert _cleanup_tmp_dir(tmp_path / "nope", max_age_hours=1.0, suffixes=(".json",)) == 0
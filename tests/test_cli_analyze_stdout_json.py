@@ -1,10 +1,10 @@
 import json
-import subprocess
-import sys
 from pathlib import Path
 
+from chessdna.cli import main
 
-def test_cli_analyze_stdout_json(tmp_path: Path):
+
+def test_cli_analyze_stdout_json(tmp_path: Path, capsys):
     # Minimal valid PGN with one short game.
     pgn = """[Event \"Test\"]
 [Site \"?\"]
@@ -22,11 +22,8 @@ def test_cli_analyze_stdout_json(tmp_path: Path):
 
     missing_engine = tmp_path / "__missing_stockfish__"
 
-    out = subprocess.check_output(
+    rc = main(
         [
-            sys.executable,
-            "-m",
-            "chessdna",
             "analyze",
             "--pgn",
             str(p),
@@ -38,11 +35,33 @@ def test_cli_analyze_stdout_json(tmp_path: Path):
             "80",
             "--out",
             "-",
-        ],
-        text=True,
-    ).strip()
+        ]
+    )
+    out = capsys.readouterr().out.strip()
 
+    assert rc == 0
     data = json.loads(out)
     assert data["games"]
     assert data["time_per_move"] == 0.05
     assert data["max_plies"] == 80
+
+
+def test_cli_analyze_failure_leaves_no_partial_json(tmp_path: Path, monkeypatch):
+    import pytest
+
+    from chessdna.core import analyze
+
+    def _fail_midway(out, pgn_text, **kw):
+        out.write(b'{\n  "games": [')
+        raise RuntimeError("engine died")
+
+    monkeypatch.setattr(analyze, "write_report_json", _fail_midway)
+    p = tmp_path / "t.pgn"
+    p.write_text("1. e4 e5 1-0\n", encoding="utf-8")
+    out = tmp_path / "report.json"
+
+    with pytest.raises(RuntimeError):
+        main(["analyze", "--pgn", str(p), "--engine", str(tmp_path / "missing"), "--out", str(out)])
+
+    assert not out.exists()
+    assert list(tmp_path.glob("report.json*")) == []
@@ -1,10 +1,10 @@
 import json
-import subprocess
-import sys
 from pathlib import Path
 
+from chessdna.cli import main
 
-def test_cli_pgninfo_json(tmp_path: Path):
+
+def test_cli_pgninfo_json(tmp_path: Path, capsys):
     # Minimal valid PGN with one short game.
     pgn = """[Event \"Test\"]
 [Site \"?\"]
@@ -20,10 +20,8 @@ def test_cli_pgninfo_json(tmp_path: Path):
     p = tmp_path / "t.pgn"
     p.write_text(pgn, encoding="utf-8")
 
-    out = subprocess.check_output(
-        [sys.executable, "-m", "chessdna", "pgninfo", "--pgn", str(p), "--json"],
-        text=True,
-    ).strip()
+    assert main(["pgninfo", "--pgn", str(p), "--json"]) == 0
+    out = capsys.readouterr().out.strip()
 
     data = json.loads(out)
     assert data["games"] == 1
@@ -1,28 +1,21 @@
 from __future__ import annotations
 
 import json
-import subprocess
-import sys
 from pathlib import Path
 
+from chessdna.cli import main
 
-def test_cli_analyze_supports_player_flag(tmp_path: Path):
-    # Arrange
-    repo_root = Path(__file__).resolve().parents[1]
-    sample_pgn = repo_root / "_sample_orange_bot.pgn"
-    assert sample_pgn.exists()
 
+def test_cli_analyze_supports_player_flag(tmp_path: Path, sample_pgn_file: Path):
+    # Arrange
     out = tmp_path / "report.json"
 
-    # Act: run CLI as a module (uses installed deps in the same env running pytest)
+    # Act: run the CLI in-process.
     # Use --engine "" to force engine-less mode (should still compute player_side + games_found).
-    cmd = [
-        sys.executable,
-        "-m",
-        "chessdna",
+    argv = [
         "analyze",
         "--pgn",
-        str(sample_pgn),
+        str(sample_pgn_file),
         "--engine",
         "",
         "--player",
@@ -32,8 +25,7 @@ def test_cli_analyze_supports_player_flag(tmp_path: Path):
         "--out",
         str(out),
     ]
-    r = subprocess.run(cmd, capture_output=True, text=True)
-    assert r.returncode == 0, f"stdout={r.stdout}\nstderr={r.stderr}"
+    assert main(argv) == 0
 
     # Assert
     data = json.loads(out.read_text(encoding="utf-8"))
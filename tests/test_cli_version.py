@@ -1,13 +1,13 @@
-import subprocess
-import sys
+import pytest
 
 import chessdna
+from chessdna.cli import main
 
 
-def test_cli_version_flag():
-    # Use python -m to avoid depending on console_script installation.
-    out = subprocess.check_output(
-        [sys.executable, "-m", "chessdna", "--version"],
-        text=True,
-    ).strip()
+def test_cli_version_flag(capsys):
+    # argparse's version action prints and exits.
+    with pytest.raises(SystemExit) as exc:
+        main(["--version"])
+    assert exc.value.code == 0
+    out = capsys.readouterr().out.strip()
     assert out == f"chessdna {chessdna.__version__}"
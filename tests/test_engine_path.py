@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import os
+
+from chessdna.core.settings import resolve_engine_path
+
+
+def test_resolve_engine_path_returns_absolute_path(fake_engine, monkeypatch):
+    monkeypatch.chdir(fake_engine.parent)
+    resolved = resolve_engine_path(fake_engine.name)
+    assert resolved == str(fake_engine.resolve())
+    assert os.path.isabs(resolved)
+
+
+def test_resolve_engine_path_rejects_missing_and_non_executable(tmp_path):
+    assert resolve_engine_path("") is None
+    assert resolve_engine_path(str(tmp_path / "missing")) is None
+    assert resolve_engine_path(str(tmp_path)) is None  # a directory
+
+    plain = tmp_path / "not_an_engine.txt"
+    plain.write_text("hi", encoding="utf-8")
+    if os.name != "nt":  # Windows has no executable bit
+        assert resolve_engine_path(str(plain)) is None
+
+
+def test_resolve_engine_path_does_not_remember_misses(tmp_path):
+    p = tmp_path / "engine"
+    assert resolve_engine_path(str(p)) is None
+    p.write_text("#!/bin/sh\n", encoding="utf-8")
+    p.chmod(0o755)
+    assert resolve_engine_path(str(p)) == str(p.resolve())
+
+
+def test_eval_multipv_env(monkeypatch):
+    from chessdna.core.settings import eval_multipv
+
+    monkeypatch.delenv("CHESSDNA_MULTIPV", raising=False)
+    assert eval_multipv() == 3
+    monkeypatch.setenv("CHESSDNA_MULTIPV", "5")
+    assert eval_multipv() == 5
+    monkeypatch.setenv("CHESSDNA_MULTIPV", "99")
+    assert eval_multipv() == 8
+    monkeypatch.setenv("CHESSDNA_MULTIPV", "x")
+    assert eval_multipv() == 3
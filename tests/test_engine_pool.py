@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import queue
+import threading
+
+import pytest
+
+from chessdna.core.engine_pool import EnginePool
+
+
+def test_engine_pool_reuses_released_engine(fake_engine):
+    pool = EnginePool(str(fake_engine), size=1)
+    try:
+        e1 = pool.acquire()
+        pid = e1.p.pid
+        pool.release(e1)
+
+        e2 = pool.acquire()
+        assert e2.p.pid == pid
+        pool.release(e2)
+    finally:
+        pool.close()
+
+    log = (fake_engine.parent / (fake_engine.name + ".log")).read_text(encoding="utf-8")
+    # One process => one handshake; each release resets with ucinewgame.
+    assert log.count("uci\n") == 1
+    assert log.count("ucinewgame") == 2
+
+
+def test_engine_pool_is_bounded(fake_engine):
+    pool = EnginePool(str(fake_engine), size=1)
+    try:
+        e1 = pool.acquire()
+        with pytest.raises(queue.Empty):
+            pool.acquire(timeout=0.05)
+        pool.release(e1)
+    finally:
+        pool.close()
+
+
+def test_engine_pool_drops_broken_engine(fake_engine):
+    pool = EnginePool(str(fake_engine), size=1)
+    try:
+        e1 = pool.acquire()
+        pool.release(e1, broken=True)
+
+        e2 = pool.acquire()
+        assert e2 is not e1
+        pool.release(e2)
+    finally:
+        pool.close()
+
+
+def test_engine_pool_warm_prespawns_idle_engines(fake_engine):
+    pool = EnginePool(str(fake_engine), size=2)
+    try:
+        # Never more than the pool size.
+        assert pool.warm(5) == 2
+        e1 = pool.acquire(timeout=0.05)
+        e2 = pool.acquire(timeout=0.05)
+        assert e1 is not e2
+        pool.release(e1)
+        pool.release(e2)
+    finally:
+        pool.close()
+
+
+def test_waiter_spawns_when_borrowed_engines_come_back_broken(fake_engine):
+    pool = EnginePool(str(fake_engine), size=2)
+    try:
+        e1, e2 = pool.acquire(), pool.acquire()
+        got: list = []
+        waiter = threading.Thread(target=lambda: got.append(pool.acquire(timeout=5)))
+        waiter.start()
+
+        # The waiter can't be served from the idle queue; freed slots must wake it.
+        pool.release(e1, broken=True)
+        pool.release(e2, broken=True)
+        waiter.join(timeout=5)
+
+        assert not waiter.is_alive()
+        assert got and got[0] not in (e1, e2)
+        pool.release(got[0])
+    finally:
+        pool.close()
+
+
+def test_analyze_with_pool_returns_engines_when_borrowing_fails(fake_engine, monkeypatch):
+    import chessdna.app as appmod
+    from chessdna.core import engine_pool
+
+    def _boom(self):
+        raise RuntimeError("spawn failed")
+
+    monkeypatch.setattr(EnginePool, "try_acquire", _boom)
+    pool = EnginePool(str(fake_engine), size=2)
+    monkeypatch.setitem(engine_pool._POOLS, str(fake_engine), pool)
+    try:
+        report = appmod._analyze_with_pool(
+            "1. e4 e5 *",
+            engine_path=str(fake_engine),
+            time_per_move=0.01,
+            max_plies=10,
+            player_name=None,
+        )
+        assert report.games
+        # The engine borrowed before the failure went back to the idle queue.
+        assert pool._created == pool._idle.qsize() == 1
+    finally:
+        pool.close()
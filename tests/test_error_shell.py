@@ -0,0 +1,37 @@
+import chessdna.app as appmod
+
+
+def test_error_shell_matches_template_render():
+    ctx = {
+        "error": "ValueError('preview_token expired')",
+        "hint": "請回到首頁 <重新> 抓取",
+        "engine_path": "C:\\sf & \"co\" __CHESSDNA_HINT__",
+        "trace": "",
+    }
+    expected = appmod.ERROR_TPL.render(ctx)
+
+    r = appmod._error_shell(ctx["error"], hint=ctx["hint"], engine_path=ctx["engine_path"])
+
+    assert r.status_code == 400
+    assert r.body.decode("utf-8") == expected
+
+
+def test_dev_mode_renders_edited_templates(monkeypatch):
+    from jinja2 import DictLoader
+
+    monkeypatch.setattr(appmod, "TEMPLATE_DEV", True)
+    monkeypatch.setattr(appmod.TEMPLATES.env, "loader", DictLoader({"error.html": "edited {{ error }}"}))
+
+    r = appmod._error_shell("boom", hint="h", engine_path="e")
+
+    assert r.body == b"edited boom"
+
+
+def test_dev_mode_bypasses_the_cached_landing_page(monkeypatch, client):
+    from jinja2 import DictLoader
+
+    client.get("/")  # fill the per-process cache
+    monkeypatch.setattr(appmod, "TEMPLATE_DEV", True)
+    monkeypatch.setattr(appmod.TEMPLATES.env, "loader", DictLoader({"index.html": "edited index"}))
+
+    assert client.get("/").text == "edited index"
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import chess
+
+from chessdna.core.analyze import (
+    ADAPTIVE_OPENING_PLIES,
+    _adaptive_movetimes,
+    _eval_cache_scope,
+    _eval_plies,
+    _only_move,
+    _position_key,
+)
+
+
+class StubEngine:
+    """Engine double: suggests `best` (score 50) with runner-up `alt` (score 30); restricted searches score 10."""
+
+    def __init__(self, best: dict[int, str]):
+        self.best = best
+        self.calls: list[tuple[int, list[str] | None]] = []
+        self.movetimes: list[int] = []
+        self.multipvs: list[int] = []
+
+    def eval_position(self, moves_uci, *, movetime_ms, searchmoves=None):
+        i = len(moves_uci.split()) if isinstance(moves_uci, str) else len(moves_uci)
+        self.calls.append((i, searchmoves))
+        self.movetimes.append(movetime_ms)
+        if searchmoves:
+            return 10, searchmoves[0], list(searchmoves)
+        mv = self.best.get(i, "a1a2")
+        return 50, mv, [mv]
+
+    def eval_position_multipv(self, moves_uci, *, movetime_ms, multipv):
+        self.multipvs.append(multipv)
+        best_cp, mv, pv = self.eval_position(moves_uci, movetime_ms=movetime_ms)
+        return best_cp, mv, pv, {mv: best_cp, "e7e6": 30}
+
+
+def test_played_best_move_skips_second_search():
+    moves = ["e2e4", "e7e5", "g1f3"]
+    # Ply 0 and 2 match the engine's best move; ply 1 does not.
+    eng = StubEngine({0: "e2e4", 1: "c7c5", 2: "g1f3"})
+
+    evals = _eval_plies([eng], moves, movetime_ms=10)
+
+    assert [played for _b, _m, _pv, played in evals] == [50, 10, 50]
+    assert eng.calls == [(0, None), (1, None), (1, ["e7e5"]), (2, None)]
+
+
+def test_played_runner_up_uses_multipv_score():
+    moves = ["e2e4", "e7e6"]
+    eng = StubEngine({0: "d2d4", 1: "e7e5"})
+
+    evals = _eval_plies([eng], moves, movetime_ms=10)
+
+    # Ply 0: not among the top lines -> restricted search; ply 1: runner-up score.
+    assert [played for _b, _m, _pv, played in evals] == [10, 30]
+    assert eng.calls == [(0, None), (0, ["e2e4"]), (1, None)]
+
+
+def test_multipv_is_read_at_search_time_like_the_cache_keys(fake_engine, monkeypatch):
+    # Set after import: the search and the cache scope must both see it.
+    monkeypatch.setenv("CHESSDNA_MULTIPV", "5")
+    eng = StubEngine({0: "e2e4"})
+
+    _eval_plies([eng], ["e2e4"], movetime_ms=10)
+
+    assert eng.multipvs == [5]
+    assert _eval_cache_scope(str(fake_engine))[-1] == 5
+
+
+def test_per_ply_movetime():
+    moves = ["e2e4", "e7e5"]
+    eng = StubEngine({0: "e2e4", 1: "c7c5"})
+
+    _eval_plies([eng], moves, movetime_ms=[20, 70])
+
+    # Ply 1's restricted search uses the same budget as its best-move search.
+    assert eng.movetimes == [20, 70, 70]
+
+
+def test_adaptive_movetimes_profile():
+    n = ADAPTIVE_OPENING_PLIES
+    times = _adaptive_movetimes(100, [True] * n + [False, True])
+    assert times[:n] == [30] * n
+    assert times[n:] == [100, 150]
+    assert min(_adaptive_movetimes(10, [False])) >= 10
+
+
+def test_forced_ply_skips_engine():
+    moves = ["e2e4", "e7e5", "g1f3"]
+    eng = StubEngine({0: "e2e4", 1: "e7e5", 2: "g1f3"})
+
+    evals = _eval_plies([eng], moves, movetime_ms=10, forced=[False, True, False])
+
+    # Ply 1 is never searched: CPL 0, eval taken from ply 2 (other side to move).
+    assert [i for i, _sm in eng.calls] == [0, 2]
+    assert evals[1] == (-50, "e7e5", ["e7e5", "g1f3"], -50)
+
+
+def test_forced_last_ply_is_searched():
+    moves = ["e2e4", "e7e5"]
+    eng = StubEngine({0: "e2e4", 1: "e7e5"})
+
+    evals = _eval_plies([eng], moves, movetime_ms=10, forced=[True, True])
+
+    assert [i for i, _sm in eng.calls] == [1]
+    assert [played for _b, _m, _pv, played in evals] == [-50, 50]
+
+
+def test_position_key_matches_transpositions_only():
+    a = chess.Board()
+    b = chess.Board()
+    for m in ["e2e4", "e7e5", "g1f3", "b8c6"]:
+        a.push_uci(m)
+    for m in ["g1f3", "b8c6", "e2e4", "e7e5"]:
+        b.push_uci(m)
+    assert _position_key(a) == _position_key(b)
+
+    # Same pieces, castling rights lost by a king walk.
+    c = a.copy()
+    for m in ["e1e2", "g8f6", "e2e1", "f6g8"]:
+        c.push_uci(m)
+    assert c.board_fen() == a.board_fen()
+    assert _position_key(c) != _position_key(a)
+
+
+def test_only_move():
+    assert not _only_move(chess.Board())
+    # Black king in the corner, checked by a rook: b8 is the only escape...
+    assert _only_move(chess.Board("k7/8/1K6/8/8/8/8/R7 b - - 0 1"))
+    # ...unless the white king doesn't cover b7.
+    assert not _only_move(chess.Board("k7/8/8/8/8/8/8/RK6 b - - 0 1"))
@@ -0,0 +1,35 @@
+from chessdna.forms import SourceForm
+
+
+def test_source_form_normalizes_and_clamps():
+    f = SourceForm.from_form(
+        platform=" LICHESS ",
+        lichess_user="  someone ",
+        fetch_max="999",
+        engine_path="/x/stockfish",
+        time_per_move="5",
+        max_plies="nope",
+    )
+    assert f.platform == "lichess"
+    assert f.lichess_user == "someone"
+    assert f.fetch_max == 50
+    assert (f.time_per_move, f.max_plies) == (1.0, 200)
+    assert "fetch_max" in f.warn and "time_per_move" in f.warn and "max_plies" in f.warn
+    assert f.prefill()["engine_path"] == "/x/stockfish"
+
+    assert SourceForm.from_form(platform="bogus").platform == "auto"
+
+
+def test_source_form_validate_requires_username():
+    assert SourceForm.from_form(platform="lichess").validate()
+    assert SourceForm.from_form(platform="chesscom", lichess_user="a").validate()
+    assert SourceForm.from_form(platform="lichess", lichess_user="a").validate() == ""
+
+    # auto + no username is only an error when a username is mandatory (/preview).
+    auto = SourceForm.from_form(platform="auto")
+    assert auto.validate() == ""
+    assert auto.validate(require_user=True)
+
+    ctx = auto.error_template_ctx("boom")
+    assert ctx["inline_err"] == "boom"
+    assert ctx["games"] == []
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timezone
+
+from chessdna.core import http_cache
+
+
+class _Resp:
+    def __init__(self, status_code: int, body: bytes = b"", headers: dict[str, str] | None = None):
+        self.status_code = status_code
+        self.content = body
+        self.headers = headers or {}
+
+
+def _fake_get(calls: list[dict], responses: list[_Resp]):
+    def fake_get(url, headers=None, max_retries=3):
+        calls.append(dict(headers or {}))
+        return responses.pop(0)
+
+    return fake_get
+
+
+def test_closed_month_is_served_from_disk(tmp_path, monkeypatch):
+    monkeypatch.setenv("CHESSDNA_HTTP_CACHE_DIR", str(tmp_path))
+    calls: list[dict] = []
+    body = json.dumps({"games": [1]}).encode()
+    monkeypatch.setattr(http_cache, "get", _fake_get(calls, [_Resp(200, body, {"ETag": '"v1"'})]))
+
+    url = "https://api.chess.com/pub/player/u/games/2020/01"
+    assert http_cache.cached_get_json(url, ttl_s=0) == {"games": [1]}
+    assert http_cache.cached_get_json(url, ttl_s=0) == {"games": [1]}
+    assert len(calls) == 1
+
+
+def test_current_data_is_revalidated_with_etag(tmp_path, monkeypatch):
+    monkeypatch.setenv("CHESSDNA_HTTP_CACHE_DIR", str(tmp_path))
+    calls: list[dict] = []
+    body = json.dumps({"games": [1]}).encode()
+    responses = [_Resp(200, body, {"ETag": '"v1"'}), _Resp(304)]
+    monkeypatch.setattr(http_cache, "get", _fake_get(calls, responses))
+
+    url = "https://api.chess.com/pub/player/u/games/archives"
+    assert http_cache.cached_get_json(url, ttl_s=0) == {"games": [1]}
+    # Expired (ttl 0): conditional GET, 304 -> cached body.
+    assert http_cache.cached_get_json(url, ttl_s=0) == {"games": [1]}
+    assert calls[1]["If-None-Match"] == '"v1"'
+    # Within the TTL: no request at all.
+    assert http_cache.cached_get_json(url, ttl_s=300) == {"games": [1]}
+    assert len(calls) == 2
+
+
+def test_month_cached_before_it_ended_is_revalidated_once(tmp_path, monkeypatch):
+    monkeypatch.setenv("CHESSDNA_HTTP_CACHE_DIR", str(tmp_path))
+    calls: list[dict] = []
+    early = json.dumps({"games": [1]}).encode()
+    full = json.dumps({"games": [1, 2]}).encode()
+    responses = [_Resp(200, early, {"ETag": '"v1"'}), _Resp(200, full, {"ETag": '"v2"'})]
+    monkeypatch.setattr(http_cache, "get", _fake_get(calls, responses))
+
+    url = "https://api.chess.com/pub/player/u/games/2026/10"
+    clock = [datetime(2026, 10, 20, tzinfo=timezone.utc).timestamp()]
+    monkeypatch.setattr(http_cache.time, "time", lambda: clock[0])
+
+    assert http_cache.cached_get_json(url, ttl_s=300) == {"games": [1]}
+
+    # After the month ends the mid-month copy is revalidated, even within the TTL...
+    clock[0] = datetime(2026, 11, 1, 0, 1, tzinfo=timezone.utc).timestamp()
+    assert http_cache.cached_get_json(url, ttl_s=3600) == {"games": [1, 2]}
+    assert calls[1]["If-None-Match"] == '"v1"'
+
+    # ...and the refreshed copy is final.
+    clock[0] = datetime(2026, 12, 2, tzinfo=timezone.utc).timestamp()
+    assert http_cache.cached_get_json(url, ttl_s=0) == {"games": [1, 2]}
+    assert len(calls) == 2
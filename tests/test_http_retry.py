@@ -9,6 +9,10 @@ class _Resp:
     def __init__(self, status_code: int, headers: dict[str, str] | None = None):
         self.status_code = status_code
         self.headers = headers or {}
+        self.closed = False
+
+    def close(self) -> None:
+        self.closed = True
 
     def raise_for_status(self) -> None:
         if 400 <= self.status_code:
@@ -19,7 +23,7 @@ def test_get_retries_on_429_then_succeeds(monkeypatch):
     calls: list[int] = []
     sleeps: list[float] = []
 
-    def fake_get(url, params=None, headers=None, timeout=None):
+    def fake_get(url, params=None, headers=None, timeout=None, stream=False):
         calls.append(1)
         # 1st call: rate limited
         if len(calls) == 1:
@@ -30,7 +34,7 @@ def test_get_retries_on_429_then_succeeds(monkeypatch):
     def fake_sleep(s: float):
         sleeps.append(float(s))
 
-    monkeypatch.setattr(http.requests, "get", fake_get)
+    monkeypatch.setattr(http.SESSION, "get", fake_get)
     monkeypatch.setattr(http.time, "sleep", fake_sleep)
 
     r = http.get("https://example.com", max_retries=3, backoff_seconds=0.5)
@@ -40,16 +44,33 @@ def test_get_retries_on_429_then_succeeds(monkeypatch):
     assert sleeps == [0.0]
 
 
+def test_get_closes_streamed_responses_it_does_not_return(monkeypatch):
+    resps = [_Resp(503, headers={"Retry-After": "0"}), _Resp(503, headers={"Retry-After": "0"})]
+    it = iter(resps)
+
+    monkeypatch.setattr(http.SESSION, "get", lambda *a, **k: next(it))
+    monkeypatch.setattr(http.time, "sleep", lambda s: None)
+
+    try:
+        http.get("https://example.com", max_retries=1, stream=True)
+        assert False, "expected FetchError"
+    except http.FetchError:
+        pass
+
+    # The retried response and the final failing one are both released.
+    assert [r.closed for r in resps] == [True, True]
+
+
 def test_get_raises_fetcherror_after_retries(monkeypatch):
     sleeps: list[float] = []
 
-    def fake_get(url, params=None, headers=None, timeout=None):
+    def fake_get(url, params=None, headers=None, timeout=None, stream=False):
         raise requests.ConnectionError("boom")
 
     def fake_sleep(s: float):
         sleeps.append(float(s))
 
-    monkeypatch.setattr(http.requests, "get", fake_get)
+    monkeypatch.setattr(http.SESSION, "get", fake_get)
     monkeypatch.setattr(http.time, "sleep", fake_sleep)
 
     try:
@@ -62,3 +83,28 @@ def test_get_raises_fetcherror_after_retries(monkeypatch):
 
     # sleep called once per retry (not after final attempt)
     assert len(sleeps) == 2
+
+
+def test_get_reuses_one_session(monkeypatch):
+    seen: list[object] = []
+
+    def fake_get(url, params=None, headers=None, timeout=None, stream=False):
+        seen.append(url)
+        return _Resp(200)
+
+    monkeypatch.setattr(http.SESSION, "get", fake_get)
+
+    http.get("https://example.com/a")
+    http.get("https://example.com/b")
+    assert seen == ["https://example.com/a", "https://example.com/b"]
+    assert http.SESSION.get_adapter("https://example.com")._pool_maxsize >= 8
+
+
+def test_retry_after_accepts_http_date(monkeypatch):
+    monkeypatch.setattr(http.time, "time", lambda: 1_700_000_000.0)
+    # 1_700_000_000 == Tue, 14 Nov 2023 22:13:20 GMT
+    assert http._retry_after_seconds("Tue, 14 Nov 2023 22:13:25 GMT") == 5.0
+    assert http._retry_after_seconds("Tue, 14 Nov 2023 22:00:00 GMT") == 0.0
+    assert http._retry_after_seconds("2") == 2.0
+    assert http._retry_after_seconds("soon") is None
+    assert http._retry_after_seconds(None) is None
@@ -17,12 +17,12 @@ class _Resp:
 def test_http_sets_default_user_agent(monkeypatch: pytest.MonkeyPatch) -> None:
     seen: dict[str, object] = {}
 
-    def _fake_get(url: str, params=None, headers=None, timeout=60):
+    def _fake_get(url: str, params=None, headers=None, timeout=60, stream=False):
         seen["url"] = url
         seen["headers"] = dict(headers or {})
         return _Resp(200)
 
-    monkeypatch.setattr(http.requests, "get", _fake_get)
+    monkeypatch.setattr(http.SESSION, "get", _fake_get)
 
     http.get("https://example.com/api")
     assert "User-Agent" in seen["headers"]
@@ -32,11 +32,26 @@ def test_http_sets_default_user_agent(monkeypatch: pytest.MonkeyPatch) -> None:
 def test_http_respects_custom_user_agent(monkeypatch: pytest.MonkeyPatch) -> None:
     seen: dict[str, object] = {}
 
-    def _fake_get(url: str, params=None, headers=None, timeout=60):
+    def _fake_get(url: str, params=None, headers=None, timeout=60, stream=False):
         seen["headers"] = dict(headers or {})
         return _Resp(200)
 
-    monkeypatch.setattr(http.requests, "get", _fake_get)
+    monkeypatch.setattr(http.SESSION, "get", _fake_get)
 
     http.get("https://example.com/api", headers={"User-Agent": "my-agent"})
     assert seen["headers"]["User-Agent"] == "my-agent"
+
+
+def test_http_does_not_modify_caller_headers(monkeypatch: pytest.MonkeyPatch) -> None:
+    seen: dict[str, object] = {}
+
+    def _fake_get(url: str, params=None, headers=None, timeout=60, stream=False):
+        seen["headers"] = dict(headers or {})
+        return _Resp(200)
+
+    monkeypatch.setattr(http.SESSION, "get", _fake_get)
+
+    mine = {"Accept": "application/json"}
+    http.get("https://example.com/api", headers=mine)
+    assert mine == {"Accept": "application/json"}
+    assert seen["headers"] == {"Accept": "application/json", "User-Agent": http._DEFAULT_UA}
@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+import sys
+
+
+def test_single_app_module_with_all_routes():
+    import chessdna.app as appmod
+
+    # Exactly one app module: `chessdna.app:app` (uvicorn / run_dev.ps1 / cli selftest).
+    assert [m for m in sys.modules if m.startswith("chessdna.app")] == ["chessdna.app"]
+
+    paths = {getattr(r, "path", None) for r in appmod.app.routes}
+    assert {"/", "/preview", "/analyze", "/download/{report_id}/{kind}"} <= paths
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import io
+
+import pytest
+import requests
+
+from chessdna.core import http, lichess
+
+
+class _StreamResp:
+    def __init__(self, chunks: list[bytes], fail: bool = False):
+        self.chunks = chunks
+        self.fail = fail
+        self.closed = False
+
+    def iter_content(self, size):
+        yield from self.chunks
+        if self.fail:
+            raise requests.ConnectionError("reset")
+
+    def close(self):
+        self.closed = True
+
+
+def test_write_user_games_pgn_streams_chunks(monkeypatch):
+    resp = _StreamResp([b"\n\n", b'  [Event "a"]\n', b"\n1. e4 *\n"])
+    seen: dict[str, object] = {}
+
+    def fake_get(url, **kw):
+        seen.update(kw)
+        return resp
+
+    monkeypatch.setattr(lichess, "get", fake_get)
+    out = io.BytesIO()
+
+    n = lichess.write_user_games_pgn(out, "someone", max_games=5)
+
+    assert seen["stream"] is True
+    assert out.getvalue() == b'[Event "a"]\n\n1. e4 *\n'
+    assert n == len(out.getvalue())
+    assert resp.closed
+
+
+def test_write_user_games_pgn_empty_and_broken(monkeypatch):
+    monkeypatch.setattr(lichess, "get", lambda url, **kw: _StreamResp([b"\n"]))
+    assert lichess.write_user_games_pgn(io.BytesIO(), "nobody") == 0
+
+    monkeypatch.setattr(lichess, "get", lambda url, **kw: _StreamResp([b"1. e4"], fail=True))
+    with pytest.raises(http.FetchError):
+        lichess.write_user_games_pgn(io.BytesIO(), "someone")
@@ -1,22 +1,21 @@
 from __future__ import annotations
 
-from pathlib import Path
+import io
 
-from chessdna.core.pgn_utils import pgn_info, preview_games, split_pgn_games
+import chess.pgn
+import pytest
 
+from chessdna.core.pgn_utils import _read_tags, iter_pgn_games, pgn_info, preview_games, split_pgn_games
 
-def test_split_pgn_games_smoke():
-    sample = Path(__file__).resolve().parents[1] / "_sample_orange_bot.pgn"
-    txt = sample.read_text(encoding="utf-8")
-    games = split_pgn_games(txt, max_games=50)
+
+def test_split_pgn_games_smoke(sample_pgn_text):
+    games = split_pgn_games(sample_pgn_text, max_games=50)
     assert len(games) >= 1
     assert all(g.strip().startswith("[") for g in games)
 
 
-def test_preview_games_indices_and_fields():
-    sample = Path(__file__).resolve().parents[1] / "_sample_orange_bot.pgn"
-    txt = sample.read_text(encoding="utf-8")
-    previews, raw = preview_games(txt, max_games=20)
+def test_preview_games_indices_and_fields(sample_previews):
+    previews, raw = sample_previews
     assert len(previews) == len(raw)
     assert [p.idx for p in previews] == list(range(len(previews)))
     # basic fields populated
@@ -29,12 +28,113 @@ def test_preview_games_indices_and_fields():
         assert p.site
 
 
-def test_pgn_info_counts_games_and_plies():
-    sample = Path(__file__).resolve().parents[1] / "_sample_orange_bot.pgn"
-    txt = sample.read_text(encoding="utf-8")
-    info = pgn_info(txt, max_games=50)
+def test_pgn_info_counts_games_and_plies(sample_pgn_text):
+    info = pgn_info(sample_pgn_text, max_games=50)
     assert info.games >= 1
     assert info.plies_min is None or info.plies_min >= 0
     assert info.plies_max is None or info.plies_max >= 0
     if info.plies_min is not None and info.plies_max is not None:
         assert info.plies_min <= info.plies_max
+
+
+def test_file_stream_input_matches_text(tmp_path):
+    txt = '[White "A"]\n[Black "B"]\n\n1. e4 e5 1-0\n\n[White "C"]\n[Black "D"]\n\n1. d4 0-1\n'
+    p = tmp_path / "two.pgn"
+    p.write_text(txt, encoding="utf-8")
+
+    with p.open(encoding="utf-8") as f:
+        assert pgn_info(f) == pgn_info(txt)
+    with p.open(encoding="utf-8") as f:
+        assert preview_games(f, max_games=1) == preview_games(txt, max_games=1)
+
+
+INLINE_PGN = """[Event "A"]
+
+1. e4 e5 (1... c5 2. Nf3) 2. Nf3 Nc6 *
+
+[Event "B"]
+
+1. d4 d5 *
+"""
+
+
+def test_pgn_info_counts_mainline_only():
+    info = pgn_info(INLINE_PGN)
+    assert info.games == 2
+    assert (info.plies_min, info.plies_max) == (2, 4)
+
+
+def test_iter_pgn_games_is_lazy():
+    it = iter_pgn_games(INLINE_PGN)
+    first = next(it)
+    assert '[Event "A"]' in first
+    assert list(it) == split_pgn_games(INLINE_PGN)[1:]
+
+
+def test_split_pgn_games_keeps_raw_text():
+    txt = """[Event "A"]
+
+1. e4 { long comment
+[%clk 0:01:00] } e5 1-0
+
+[Event "B"]
+
+1. d4 *
+1. c4 *
+"""
+    games = split_pgn_games(txt)
+    assert games[0] == '[Event "A"]\n\n1. e4 { long comment\n[%clk 0:01:00] } e5 1-0\n'
+    assert games[1] == '[Event "B"]\n\n1. d4 *\n'
+    # Tagless movetext after a result: parsed by python-chess (Seven Tag Roster added).
+    assert games[2].startswith('[Event "?"]') and "1. c4 *" in games[2]
+    assert split_pgn_games(txt, max_games=2) == games[:2]
+
+
+def test_preview_games_reads_headers_only():
+    txt = """[Event "Blitz"]
+[White "w1"]
+[Black "b1"]
+[Result "1-0"]
+
+1. e4 e5 2. Qh5 Nc6 3. Bc4 Nf6 4. Qxf7# 1-0
+
+[White "w2"]
+[Black "b2"]
+[UTCDate "2024.01.02"]
+
+1. d4 d5 (1... Nf6 2. c4) 2. Kd3 *
+"""
+    previews, raw = preview_games(txt)
+    assert [(p.idx, p.white, p.black, p.result, p.event) for p in previews] == [
+        (0, "w1", "b1", "1-0", "Blitz"),
+        (1, "w2", "b2", "*", "?"),
+    ]
+    assert previews[1].date == "2024.01.02"
+    assert raw == split_pgn_games(txt)
+
+
+@pytest.mark.parametrize(
+    "txt",
+    [
+        '\ufeff[Event "A"]\n[White "x \\"q\\""]\n\n1. e4 *\n',
+        '\n\n% escape\n[Event "A"]\n\n[Site "s"]\n;c\n[bad tag]\n[Black "b"]\n1. e4 [White "no"] *\n',
+        '[Event "A"]\n\n\n[White "late"]\n1. e4 *\n',
+        '1. e4 e5 *\n',
+    ],
+)
+def test_read_tags_matches_python_chess(txt):
+    assert _read_tags(txt) == dict(chess.pgn.read_headers(io.StringIO(txt)) or {})
+
+
+def test_pgn_info_fast_matches_replay():
+    txt = INLINE_PGN + """
+[Event "C"]
+
+1.e4 {[%clk 0:03:00]} 1...c5 $1 2. Nf3 (2. c3 d5 (2... Nf6)) 2...d6 3. O-O-O?! ; odd
+Nc6 4. exd6=Q+ 1-0
+"""
+    fast = pgn_info(txt, fast=True)
+    assert fast.games == 3
+    assert (fast.plies_min, fast.plies_max) == (2, 7)
+    assert pgn_info(INLINE_PGN, fast=True) == pgn_info(INLINE_PGN)
+    assert pgn_info(txt, fast=True, max_games=1).games == 1
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import io
+
+import pytest
+from pydantic_core import to_json
+
+from chessdna.core.analyze import AnalyzeReport, analyze_pgn_iter, analyze_pgn_text, write_report_json
+
+
+PGN = """[Event "Stream"]
+[White "A"]
+[Black "B"]
+[Result "1-0"]
+
+1. e4 e5 2. Nf3 Nc6 1-0
+
+[Event "Stream"]
+[White "C"]
+[Black "A"]
+[Result "0-1"]
+
+1. d4 d5 2. c4 0-1
+"""
+
+
+@pytest.mark.parametrize("pgn", [PGN, ""])
+@pytest.mark.parametrize("player", [None, "A"])
+def test_streamed_json_matches_full_report(fake_engine, pgn, player):
+    kw = dict(engine_path=str(fake_engine), time_per_move=0.01, max_plies=999, player_name=player)
+
+    buf = io.BytesIO()
+    shell = write_report_json(buf, pgn, **kw)
+
+    full = analyze_pgn_text(pgn, **kw)
+    assert buf.getvalue() == to_json(full, indent=2)
+    assert shell.games == []
+    assert shell.max_plies == full.max_plies == 800
+    assert shell.player_overview == full.player_overview
+
+
+def test_analyze_pgn_iter_is_lazy(tmp_path):
+    it = analyze_pgn_iter(io.StringIO(PGN), engine_path=str(tmp_path / "missing"))
+    first = next(it)
+    assert first.headers["White"] == "A"
+    assert [g.headers["White"] for g in it] == ["C"]
+
+
+def test_constructed_report_round_trips_through_validation(fake_engine):
+    report = analyze_pgn_text(PGN, engine_path=str(fake_engine), time_per_move=0.01, player_name="A")
+    assert report.games[0].plies[0].cpl is not None
+
+    again = AnalyzeReport.model_validate_json(report.model_dump_json())
+    assert again == report
+    assert again.model_dump_json() == report.model_dump_json()
+
+
+def test_report_html_stream_closes_page_on_render_error(monkeypatch):
+    import chessdna.app as appmod
+
+    class _FailingStream:
+        def enable_buffering(self, size):
+            pass
+
+        def __iter__(self):
+            yield "<html><body><div>first chunk"
+            raise RuntimeError("boom")
+
+    class _Tpl:
+        def stream(self, ctx):
+            return _FailingStream()
+
+    monkeypatch.setattr(appmod, "REPORT_TPL", _Tpl())
+
+    chunks = list(appmod._stream_report_html(None, report_id="rep_fail", json_path="x.json"))
+
+    assert chunks[0] == b"<html><body><div>first chunk"
+    assert b"RuntimeError(&#39;boom&#39;)" in chunks[-1]
+    assert chunks[-1].endswith(b"</html>")
+    # A half-rendered page is not kept as the HTML artifact.
+    assert list(appmod.REPORT_TMP_DIR.glob("rep_fail.html*")) == []
+    assert appmod.ARTIFACT_STORE.get("rep_fail") == {}
+
+
+def test_report_html_disconnect_finishes_render_off_the_closing_thread(monkeypatch):
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    import chessdna.app as appmod
+
+    render_threads: list[str] = []
+
+    class _Stream:
+        # Like jinja2.TemplateStream: an iterator, resumable after a partial read.
+        def __init__(self):
+            self._it = self._render()
+
+        def enable_buffering(self, size):
+            pass
+
+        def __iter__(self):
+            return self
+
+        def __next__(self):
+            return next(self._it)
+
+        def _render(self):
+            yield "<html><body>"
+            for _ in range(3):
+                render_threads.append(threading.current_thread().name)
+                yield "<p>row</p>"
+            yield "</body></html>"
+
+    class _Tpl:
+        def stream(self, ctx):
+            return _Stream()
+
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="test-io")
+    monkeypatch.setattr(appmod, "REPORT_TPL", _Tpl())
+    monkeypatch.setattr(appmod, "IO_EXECUTOR", executor)
+
+    gen = appmod._stream_report_html(None, report_id="rep_gone", json_path="x.json")
+    assert next(gen) == b"<html><body>"
+    gen.close()  # client disconnected
+    executor.shutdown(wait=True)
+
+    assert render_threads and all(name.startswith("test-io") for name in render_threads)
+    html_path = appmod.REPORT_TMP_DIR / "rep_gone.html"
+    assert html_path.read_text(encoding="utf-8") == "<html><body>" + "<p>row</p>" * 3 + "</body></html>"
+    assert appmod.ARTIFACT_STORE.get("rep_gone") == {"html": str(html_path)}
@@ -0,0 +1,28 @@
+import pytest
+from fastapi import HTTPException
+from fastapi.responses import FileResponse
+
+from chessdna.routes_downloads import download_file
+
+
+def test_download_file_streams_from_index_and_fallback(tmp_path):
+    p = tmp_path / "r1.json"
+    p.write_text("{}", encoding="utf-8")
+
+    r = download_file({"r1": {"json": str(p)}}, "r1", "json")
+    assert isinstance(r, FileResponse)
+    assert r.headers["content-length"] == "2"
+    assert r.media_type == "application/json"
+
+    # Index miss -> conventional path in fallback_dir.
+    r2 = download_file({}, "r1", "json", fallback_dir=tmp_path)
+    assert r2.path == str(p)
+
+
+def test_download_file_missing_is_404(tmp_path):
+    with pytest.raises(HTTPException) as ei:
+        download_file({"r1": {"html": str(tmp_path / "gone.html")}}, "r1", "html")
+    assert ei.value.status_code == 404
+
+    with pytest.raises(HTTPException):
+        download_file({}, "r1", "html", fallback_dir=tmp_path)
@@ -1,4 +1,4 @@
-from chessdna.app import _clamp_analyze_settings
+from chessdna.forms import clamp_analyze_settings as _clamp_analyze_settings
 
 
 def test_clamp_analyze_settings_defaults_and_ranges():
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+import re
+
+from chessdna.static_files import DEFAULT_CACHE, IMMUTABLE_CACHE
+
+
+def test_index_links_versioned_assets_served_immutable(client):
+    html = client.get("/").text
+    m = re.search(r'href="(/static/manifest\.json\?v=[0-9a-f]{8})"', html)
+    assert m, "manifest link should carry a content hash"
+
+    r = client.get(m.group(1))
+    assert r.status_code == 200
+    assert r.headers["cache-control"] == IMMUTABLE_CACHE
+
+
+def test_unversioned_static_gets_short_cache(client):
+    r = client.get("/static/manifest.json")
+    assert r.status_code == 200
+    assert r.headers["cache-control"] == DEFAULT_CACHE
+    assert client.get("/static/nope.css").status_code == 404
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import os
+import stat
+import tempfile
+import time
+
+import pytest
+
+from chessdna.store import KVStore, LRUStore, private_temp_dir
+
+
+def test_kvstore_put_get_roundtrip(tmp_path):
+    kv = KVStore(tmp_path / "idx.sqlite3")
+    kv.put("tok", "json", tmp_path / "tok.json")
+    kv.put("tok", "html", tmp_path / "tok.html")
+
+    assert kv.get("tok") == {"json": str(tmp_path / "tok.json"), "html": str(tmp_path / "tok.html")}
+    assert kv.get("missing") == {}
+
+    # Same (token, kind) overwrites.
+    kv.put("tok", "json", tmp_path / "other.json")
+    assert kv.get("tok")["json"] == str(tmp_path / "other.json")
+
+
+def test_kvstore_survives_reopen(tmp_path):
+    db = tmp_path / "idx.sqlite3"
+    kv = KVStore(db)
+    kv.put("tok", "pgn", "/x/tok.pgn")
+    kv.close()
+
+    assert KVStore(db).get("tok") == {"pgn": "/x/tok.pgn"}
+
+
+def test_kvstore_sweep_by_age_and_kind(tmp_path):
+    kv = KVStore(tmp_path / "idx.sqlite3")
+    old = time.time() - 3600
+    kv.put("old_report", "json", "/r.json", mtime=old)
+    kv.put("old_fetch", "pgn", "/f.pgn", mtime=old)
+    kv.put("new_report", "json", "/n.json")
+
+    assert kv.sweep(60, kinds=("json", "html")) == 1
+    assert kv.get("old_report") == {}
+    assert kv.get("old_fetch") == {"pgn": "/f.pgn"}
+    assert kv.get("new_report") == {"json": "/n.json"}
+
+    assert kv.sweep(60) == 1
+    assert kv.get("old_fetch") == {}
+
+
+def test_lru_store_evicts_least_recently_used():
+    s = LRUStore(2)
+    s["a"] = 1
+    s["b"] = 2
+    assert s.get("a") == 1  # touch "a" -> "b" is now the oldest
+    s["c"] = 3
+
+    assert list(s) == ["a", "c"]
+    assert s.get("b") is None
+    assert len(s) == 2
+
+
+
+posix_only = pytest.mark.skipif(not hasattr(os, "getuid"), reason="POSIX ownership checks")
+
+
+@posix_only
+def test_private_temp_dir_is_per_user_and_0700(tmp_path, monkeypatch):
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+
+    p = private_temp_dir("cdna")
+
+    assert p == tmp_path / f"cdna-{os.getuid()}"
+    assert stat.S_IMODE(p.stat().st_mode) == 0o700
+    assert private_temp_dir("cdna") == p
+
+
+@posix_only
+def test_foreign_private_dir_and_db_are_refused(tmp_path, monkeypatch):
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    other_uid = os.getuid() + 1
+    # Pre-created by "another user" (us, from the patched uid's point of view).
+    (tmp_path / f"cdna-{other_uid}").mkdir(mode=0o700)
+    db = tmp_path / "idx.sqlite3"
+    KVStore(db).close()
+
+    monkeypatch.setattr(os, "getuid", lambda: other_uid)
+    with pytest.raises(PermissionError):
+        private_temp_dir("cdna")
+    with pytest.raises(PermissionError):
+        KVStore(db)
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import stat
+import sys
+
+import pytest
+
+from chessdna.core.uci import UciEngine
+
+
+def test_same_position_is_sent_once_per_ply(fake_engine):
+    log = fake_engine.with_name(fake_engine.name + ".log")
+    e = UciEngine(str(fake_engine))
+    try:
+        e.eval_position(["e2e4"], movetime_ms=10)
+        e.eval_position(["e2e4"], movetime_ms=10, searchmoves=["e7e5"])
+        e.eval_position(["e2e4", "e7e5"], movetime_ms=10)
+        e.new_game()
+        e.eval_position(["e2e4", "e7e5"], movetime_ms=10)
+    finally:
+        e.quit()
+        e.p.wait(timeout=5)
+
+    lines = log.read_text(encoding="utf-8").splitlines()
+    assert [l for l in lines if l.startswith("position")] == [
+        "position startpos moves e2e4",
+        "position startpos moves e2e4 e7e5",
+        # ucinewgame forgets the position, so it is sent again.
+        "position startpos moves e2e4 e7e5",
+    ]
+    assert sum(l.startswith("go ") for l in lines) == 4
+
+
+_MULTIPV_ENGINE_SRC = r"""
+import sys
+
+for line in sys.stdin:
+    line = line.strip()
+    if line == "uci":
+        print("uciok", flush=True)
+    elif line == "isready":
+        print("readyok", flush=True)
+    elif line.startswith("go"):
+        print("info string NNUE evaluation enabled")
+        print("info depth 1 multipv 1 score cp 10 pv d2d4 d7d5")
+        print("info depth 1 currmove e2e4 currmovenumber 1")
+        print("info depth 1 multipv 2 score cp 5 pv e2e4")
+        print("info depth 2 multipv 1 score cp 40 pv e2e4 e7e5")
+        print("info depth 2 multipv 2 score mate -3 pv g2g4")
+        print("info depth 2 nodes 1200 nps 600000 hashfull 1")
+        print("bestmove e2e4 ponder e7e5", flush=True)
+    elif line == "quit":
+        break
+"""
+
+
+@pytest.mark.slow
+def test_multipv_lines_are_parsed(tmp_path):
+    if sys.platform == "win32":
+        pytest.skip("fake engine relies on a #! script")
+    p = tmp_path / "multipv_engine"
+    p.write_text(f"#!{sys.executable}\n" + _MULTIPV_ENGINE_SRC, encoding="utf-8")
+    p.chmod(p.stat().st_mode | stat.S_IXUSR)
+
+    e = UciEngine(str(p))
+    try:
+        best_cp, bestmove, pv, top = e.eval_position_multipv([], movetime_ms=10, multipv=2)
+    finally:
+        e.quit()
+
+    assert (best_cp, bestmove, pv) == (40, "e2e4", ["e2e4", "e7e5"])
+    assert top == {"e2e4": 40, "g2g4": -97000}
+
+
+def test_engine_options_are_sent_in_handshake(fake_engine, monkeypatch):
+    monkeypatch.setenv("CHESSDNA_ENGINE_HASH_MB", "64")
+    monkeypatch.delenv("CHESSDNA_SYZYGY_PATH", raising=False)
+    e = UciEngine(str(fake_engine))
+    e.quit()
+    e2 = UciEngine(str(fake_engine), options={"Threads": 2})
+    e2.quit()
+
+    log = fake_engine.with_name(fake_engine.name + ".log").read_text(encoding="utf-8").splitlines()
+    assert log.count("setoption name Hash value 64") == 1
+    assert log.count("setoption name Threads value 2") == 1
+    # Options come before the first isready.
+    assert log.index("setoption name Hash value 64") < log.index("isready")
+
+
+_DEEP_ENGINE_SRC = r"""
+import sys
+
+for line in sys.stdin:
+    line = line.strip()
+    if line == "uci":
+        print("uciok", flush=True)
+    elif line == "isready":
+        print("readyok", flush=True)
+    elif line.startswith("go"):
+        for d in range(1, 41):
+            print(f"info depth {d} multipv 1 score cp {d} pv e2e4 e7e5")
+            print(f"info depth {d} currmove e2e4 currmovenumber 1")
+            print(f"info depth {d} multipv 2 score cp {-d} upperbound pv d2d4")
+        print("info depth 40 multipv 2 score cp -7")
+        print("bestmove e2e4", flush=True)
+    elif line == "quit":
+        break
+"""
+
+
+@pytest.mark.slow
+def test_only_the_latest_line_per_multipv_counts(tmp_path):
+    if sys.platform == "win32":
+        pytest.skip("fake engine relies on a #! script")
+    p = tmp_path / "deep_engine"
+    p.write_text(f"#!{sys.executable}\n" + _DEEP_ENGINE_SRC, encoding="utf-8")
+    p.chmod(p.stat().st_mode | stat.S_IXUSR)
+
+    e = UciEngine(str(p))
+    try:
+        best_cp, bestmove, pv, top = e.eval_position_multipv([], movetime_ms=10, multipv=2)
+    finally:
+        e.quit()
+
+    assert (best_cp, bestmove, pv) == (40, "e2e4", ["e2e4", "e7e5"])
+    # Line 2's last score came without a PV; its PV is from the line before.
+    assert top == {"e2e4": 40, "d2d4": -7}
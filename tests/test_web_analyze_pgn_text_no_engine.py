@@ -1,9 +1,5 @@
 from __future__ import annotations
 
-from fastapi.testclient import TestClient
-
-from chessdna.app import app
-
 
 SAMPLE_PGN = """
 [Event \"Casual Game\"]
@@ -18,14 +14,13 @@ SAMPLE_PGN = """
 """
 
 
-def test_web_analyze_accepts_pgn_text_even_without_engine():
+def test_web_analyze_accepts_pgn_text_even_without_engine(client):
     """Smoke test the /analyze route (pgn_text path).
 
     Even if Stockfish is missing, the app should still return an HTML report page.
     """
 
-    c = TestClient(app)
-    r = c.post(
+    r = client.post(
         "/analyze",
         data={
             "pgn_text": SAMPLE_PGN,
@@ -39,3 +34,20 @@ def test_web_analyze_accepts_pgn_text_even_without_engine():
     # report.html should include download links (report_id is embedded in the URL).
     assert "Download JSON" in r.text
     assert "/download/" in r.text
+
+
+def test_web_analyze_streams_report_and_saves_same_html(client):
+    import re
+
+    r = client.post(
+        "/analyze",
+        data={"pgn_text": SAMPLE_PGN, "engine_path": "__missing_stockfish__", "max_plies": "30"},
+    )
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/html")
+
+    m = re.search(r"/download/([A-Za-z0-9_-]+)/html", r.text)
+    assert m
+    d = client.get(f"/download/{m.group(1)}/html")
+    assert d.status_code == 200
+    assert d.text == r.text
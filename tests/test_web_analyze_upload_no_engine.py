@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from chessdna.app import UPLOAD_CHUNK_SIZE
+
+
+GAME_PGN = """[Event \"Upload\"]
+[Site \"?\"]
+[Date \"2026.02.20\"]
+[Round \"-\"]
+[White \"A\"]
+[Black \"B\"]
+[Result \"1-0\"]
+
+1. e4 e5 2. Nf3 Nc6 3. Bb5 a6 1-0
+
+"""
+
+
+def test_web_analyze_accepts_uploaded_pgn_larger_than_one_chunk(client):
+    """Uploads are read in chunks; a multi-chunk PGN must still be analyzed in full."""
+
+    n_games = UPLOAD_CHUNK_SIZE // len(GAME_PGN) + 2
+    data = (GAME_PGN * n_games).encode("utf-8")
+    assert len(data) > UPLOAD_CHUNK_SIZE
+
+    r = client.post(
+        "/analyze",
+        files={"pgn": ("games.pgn", data, "application/x-chess-pgn")},
+        data={
+            "engine_path": "__missing_stockfish__",
+            "time_per_move": "0.01",
+            "max_plies": "10",
+        },
+    )
+
+    assert r.status_code == 200
+    assert "Download JSON" in r.text
+    assert r.text.count('id="gameSection-') == n_games
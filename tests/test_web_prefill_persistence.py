@@ -3,32 +3,10 @@ from __future__ import annotations
 import re
 
 import pytest
-from fastapi.testclient import TestClient
 
-from chessdna.app import FETCH_STORE, app
-from chessdna.core.pgn_utils import preview_games
+from _fixtures import two_games_preview
 
-
-SAMPLE_PGN = """[Event \"Test1\"]
-[Site \"https://example.com/1\"]
-[Date \"2026.02.12\"]
-[Round \"-\"]
-[White \"A\"]
-[Black \"B\"]
-[Result \"1-0\"]
-
-1. e4 e5 2. Nf3 Nc6 1-0
-
-[Event \"Test2\"]
-[Site \"https://example.com/2\"]
-[Date \"2026.02.11\"]
-[Round \"-\"]
-[White \"C\"]
-[Black \"D\"]
-[Result \"0-1\"]
-
-1. d4 d5 2. c4 e6 0-1
-"""
+from chessdna.app import FETCH_STORE
 
 
 @pytest.fixture(autouse=True)
@@ -38,13 +16,12 @@ def _clear_fetch_store():
     FETCH_STORE.clear()
 
 
-def test_analyze_selection_error_keeps_user_settings_in_form():
-    previews, raw_games = preview_games(SAMPLE_PGN, max_games=2)
+def test_analyze_selection_error_keeps_user_settings_in_form(client):
+    previews, raw_games = two_games_preview()
     token = "t123"
     FETCH_STORE[token] = {"platform": "lichess", "previews": previews, "games": raw_games}
 
-    c = TestClient(app)
-    r = c.post(
+    r = client.post(
         "/analyze",
         data={
             "preview_token": token,
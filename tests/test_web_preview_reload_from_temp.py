@@ -3,22 +3,10 @@ from __future__ import annotations
 import json
 
 import pytest
-from fastapi.testclient import TestClient
 
-import chessdna.app as appmod
-from chessdna.app import app
-
-
-SAMPLE_PGN = """[Event \"Test\"]
-[Site \"https://example.com\"]
-[Date \"2026.02.12\"]
-[Round \"-\"]
-[White \"A\"]
-[Black \"B\"]
-[Result \"1-0\"]
+from _fixtures import ONE_GAME_PGN
 
-1. e4 e5 2. Nf3 Nc6 1-0
-"""
+import chessdna.app as appmod
 
 
 @pytest.fixture(autouse=True)
@@ -28,21 +16,20 @@ def _clear_fetch_store():
     appmod.FETCH_STORE.clear()
 
 
-def test_analyze_can_reload_preview_token_from_temp(tmp_path, monkeypatch):
+def test_analyze_can_reload_preview_token_from_temp(tmp_path, monkeypatch, client):
     """If FETCH_STORE is empty (e.g., server restart), preview_token can reload from temp."""
 
     # Redirect temp dir to a test-local folder.
     monkeypatch.setattr(appmod, "FETCH_TMP_DIR", tmp_path)
 
     token = "tok_reload"
-    (tmp_path / f"{token}.pgn").write_text(SAMPLE_PGN, encoding="utf-8")
+    (tmp_path / f"{token}.pgn").write_text(ONE_GAME_PGN, encoding="utf-8")
     (tmp_path / f"{token}.json").write_text(
         json.dumps({"platform": "lichess", "created_at": 0, "fetch_max": 1}, ensure_ascii=False),
         encoding="utf-8",
     )
 
-    c = TestClient(app)
-    r = c.post(
+    r = client.post(
         "/analyze",
         data={
             "preview_token": token,
@@ -57,3 +44,69 @@ def test_analyze_can_reload_preview_token_from_temp(tmp_path, monkeypatch):
     assert r.status_code == 200
     assert "Download JSON" in r.text
     assert "/download/" in r.text
+
+
+def test_reload_uses_sidecar_offsets_without_reparsing(tmp_path, monkeypatch, client):
+    """Tokens written by /preview reload from the sidecar (previews + byte ranges), not by re-parsing."""
+
+    monkeypatch.setattr(appmod, "FETCH_TMP_DIR", tmp_path)
+    import chessdna.core.lichess as lichess_mod
+
+    two_games = ONE_GAME_PGN + "\n" + ONE_GAME_PGN.replace('[White \"A\"]', '[White \"C\"]')
+    monkeypatch.setattr(lichess_mod, "fetch_user_games_pgn", lambda *a, **k: two_games)
+
+    r = client.post("/preview", data={"platform": "lichess", "lichess_user": "someone", "fetch_max": "2"})
+    assert r.status_code == 200
+    (token,) = appmod.FETCH_STORE.keys()
+    games = appmod._selected_games(appmod.FETCH_STORE[token], [0, 1])
+
+    meta = json.loads((tmp_path / f"{token}.json").read_text(encoding="utf-8"))
+    assert [p["white"] for p in meta["previews"]] == ["A", "C"]
+    assert len(meta["game_offsets"]) == 2
+
+    appmod.FETCH_STORE.clear()
+
+    def _no_parse(*a, **k):
+        raise AssertionError("reload should not re-parse the PGN")
+
+    monkeypatch.setattr(appmod, "preview_games", _no_parse)
+    store = appmod._reload_token(token, max_games=2)
+    assert store["platform"] == "lichess"
+    assert "games" not in store
+    assert appmod._selected_games(store, [0, 1]) == games
+    assert [p.white for p in store["previews"]] == ["A", "C"]
+
+
+def test_reloaded_token_is_kept_in_memory(monkeypatch, client):
+    """The disk fallback runs once per token; later requests are served from FETCH_STORE."""
+    calls: list[str] = []
+
+    def _fake_reload(token, *, max_games):
+        calls.append(token)
+        previews, games = appmod.preview_games(ONE_GAME_PGN, max_games=max_games)
+        return {"platform": "lichess", "previews": previews, "games": games}
+
+    monkeypatch.setattr(appmod, "_reload_token", _fake_reload)
+
+    data = {
+        "preview_token": "tok_mem",
+        "game_idx": "0",
+        "fetch_max": "1",
+        "engine_path": "__missing_stockfish__",
+        "time_per_move": "0.01",
+        "max_plies": "10",
+    }
+    for _ in range(2):
+        r = client.post("/analyze", data=data)
+        assert r.status_code == 200
+        assert "Download JSON" in r.text
+    assert calls == ["tok_mem"]
+
+
+def test_selected_games_from_truncated_pgn_is_empty(tmp_path):
+    """A temp .pgn emptied since the preview yields no games instead of mmap's ValueError."""
+    pgn_path = tmp_path / "tok_empty.pgn"
+    pgn_path.write_bytes(b"")
+    store = {"pgn_path": str(pgn_path), "offsets": [(0, 10)]}
+
+    assert appmod._selected_games(store, [0]) == []
@@ -3,31 +3,11 @@ from __future__ import annotations
 import re
 
 import pytest
-from fastapi.testclient import TestClient
 
-from chessdna.app import app, FETCH_STORE
+from _fixtures import TWO_GAMES_PGN
 
-
-SAMPLE_PGN = """[Event \"Test1\"]
-[Site \"https://example.com/1\"]
-[Date \"2026.02.12\"]
-[Round \"-\"]
-[White \"A\"]
-[Black \"B\"]
-[Result \"1-0\"]
-
-1. e4 e5 2. Nf3 Nc6 1-0
-
-[Event \"Test2\"]
-[Site \"https://example.com/2\"]
-[Date \"2026.02.11\"]
-[Round \"-\"]
-[White \"C\"]
-[Black \"D\"]
-[Result \"0-1\"]
-
-1. d4 d5 2. c4 e6 0-1
-"""
+import chessdna.app as appmod
+from chessdna.app import FETCH_STORE
 
 
 @pytest.fixture(autouse=True)
@@ -37,25 +17,23 @@ def _clear_fetch_store():
     FETCH_STORE.clear()
 
 
-def test_preview_requires_username_when_platform_selected():
-    c = TestClient(app)
-    r = c.post("/preview", data={"platform": "lichess", "lichess_user": "", "fetch_max": "5"})
+def test_preview_requires_username_when_platform_selected(client):
+    r = client.post("/preview", data={"platform": "lichess", "lichess_user": "", "fetch_max": "5"})
     assert r.status_code == 400
 
 
-def test_preview_returns_token_and_game_list(monkeypatch):
+def test_preview_returns_token_and_game_list(monkeypatch, client):
     # Patch lichess fetch to avoid network.
     import chessdna.core.lichess as lichess
 
     def fake_fetch(username: str, *, max_games: int = 50) -> str:
         assert username == "someone"
         assert max_games == 2
-        return SAMPLE_PGN
+        return TWO_GAMES_PGN
 
     monkeypatch.setattr(lichess, "fetch_user_games_pgn", fake_fetch)
 
-    c = TestClient(app)
-    r = c.post(
+    r = client.post(
         "/preview",
         data={
             "platform": "lichess",
@@ -66,30 +44,32 @@ def test_preview_returns_token_and_game_list(monkeypatch):
 
     assert r.status_code == 200
     # Should include a preview_token hidden input.
-    m = re.search(r"name=\"preview_token\" value=\"([a-f0-9]+)\"", r.text)
+    m = re.search(r"name=\"preview_token\" value=\"([A-Za-z0-9_-]{16})\"", r.text)
     assert m, "preview_token not found in HTML"
     token = m.group(1)
     assert token in FETCH_STORE
 
     store = FETCH_STORE[token]
     previews = list(store.get("previews") or [])
-    games = list(store.get("games") or [])
+    offsets = list(store.get("offsets") or [])
 
     assert len(previews) == 2
-    assert len(games) == 2
+    # Game text stays in the temp .pgn; the store only keeps byte ranges.
+    assert "games" not in store
+    assert len(offsets) == 2
+    assert len(appmod._selected_games(store, [0, 1])) == 2
 
 
-def test_preview_keeps_user_settings_in_form(monkeypatch):
+def test_preview_keeps_user_settings_in_form(monkeypatch, client):
     # Preview is a UX step; it should not reset engine/time/max/player settings.
     import chessdna.core.lichess as lichess
 
     def fake_fetch(username: str, *, max_games: int = 50) -> str:
-        return SAMPLE_PGN
+        return TWO_GAMES_PGN
 
     monkeypatch.setattr(lichess, "fetch_user_games_pgn", fake_fetch)
 
-    c = TestClient(app)
-    r = c.post(
+    r = client.post(
         "/preview",
         data={
             "platform": "lichess",